@@ -0,0 +1,71 @@
+import time
+from collections import deque
+
+# 按时间预算轮转执行的AI任务调度器：逐个病毒的AI工作（避障兜底、标量寻路等）以病毒为键提交，
+# 每次run()按提交顺序执行，用完预算就停下，剩余任务留到下一次；
+# 同一病毒在排队期间重复提交只更新任务参数、不改变排队位置，所以大批病毒涌入时
+# 每只病毒都会按顺序轮到，帧耗时不会随病毒数量突增，代价是部分病毒的AI延后几帧（记为“等待帧数”）
+class AIScheduler:
+    def __init__(self, budget_ms=2.0):
+        self.budget_ms = budget_ms
+        self.queue = deque()  # 排队顺序（病毒键）
+        self.jobs = {}  # 病毒键 -> [函数, 参数, 提交时的轮次]
+        self.staleness = {}  # 病毒键 -> 该病毒的任务最多等待过的帧数
+        self.round = 0
+        # 最近一次run()的统计
+        self.executed = 0
+        self.deferred = 0
+        self.max_staleness = 0
+        self.elapsed_ms = 0.0
+
+    def submit(self, key, func, *args):
+        """提交（或更新）某个病毒的AI任务"""
+        job = self.jobs.get(key)
+        if job is None:
+            self.jobs[key] = [func, args, self.round]
+            self.queue.append(key)
+        else:
+            job[0] = func
+            job[1] = args
+
+    def discard(self, key):
+        """病毒被移出游戏时丢弃它的任务和统计（队列中的键在轮到时跳过）"""
+        self.jobs.pop(key, None)
+        self.staleness.pop(key, None)
+
+    def clear(self):
+        self.queue.clear()
+        self.jobs.clear()
+        self.staleness.clear()
+
+    def run(self):
+        """在预算内按顺序执行任务，至少执行一个以保证进度；返回本次执行的任务数"""
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000.0
+        executed = 0
+        worst = 0
+        while self.queue:
+            key = self.queue.popleft()
+            job = self.jobs.pop(key, None)
+            if job is None:
+                continue
+            func, args, submitted = job
+            waited = self.round - submitted
+            if waited > worst:
+                worst = waited
+            if waited > self.staleness.get(key, 0):
+                self.staleness[key] = waited
+            func(*args)
+            executed += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.round += 1
+        self.executed = executed
+        self.deferred = len(self.jobs)
+        self.max_staleness = worst
+        self.elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return executed
+
+    def worst_staleness(self):
+        """所有在场病毒中最久的一次等待（帧）"""
+        return max(self.staleness.values(), default=0)
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+# 缓存格式版本：像素格式、缩放方式或文件头变化时加1，旧版本目录直接作废
+ASSET_CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct('<II')  # 宽、高，后面跟RGBA像素
+
+# 资源管理：图片在线程池里并行解码和缩放，结果以RGBA像素写进按版本分目录的磁盘缓存，
+# 之后启动时直接读像素、跳过PNG解码和缩放；缓存键包含源文件路径、大小、修改时间和目标尺寸，
+# 图片一改动就自动失效。不是第一帧就要用的资源（图鉴贴图、大号字体）通过image()/font()按需加载。
+# 解码和缩放不依赖显示模式，可在工作线程中进行；convert_alpha()必须在主线程调用
+class AssetManager:
+    def __init__(self, cache_dir=None, max_workers=4):
+        """cache_dir: 磁盘缓存根目录（None为不使用磁盘缓存）"""
+        self.cache_dir = None
+        if cache_dir:
+            self.cache_dir = os.path.join(cache_dir, f"v{ASSET_CACHE_VERSION}")
+        self.max_workers = max_workers
+        self.images = {}  # (路径, 尺寸, 平滑缩放, 是否转换格式) -> Surface（None为加载失败）
+        self.font_data = {}  # 字体路径 -> 文件内容（同一字体的不同字号共用，只读一次磁盘）
+        self.fonts = {}  # (路径, 字号) -> Font
+        self.lock = threading.Lock()
+        # 统计
+        self.cache_hits = 0
+        self.decoded = 0
+        self.load_ms = 0.0
+
+    # ---- 磁盘缓存 ----
+    def _cache_path(self, path, size, smooth):
+        if self.cache_dir is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{size}|{smooth}|{pygame.version.ver}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.rgba')
+
+    def _read_cache(self, cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < CACHE_HEADER.size:
+            return None
+        width, height = CACHE_HEADER.unpack_from(data)
+        if len(data) != CACHE_HEADER.size + width * height * 4:
+            return None
+        return pygame.image.frombytes(data[CACHE_HEADER.size:], (width, height), 'RGBA')
+
+    def _write_cache(self, cache_path, surface):
+        """先写临时文件再改名，多个进程同时启动也不会读到写了一半的文件"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(CACHE_HEADER.pack(*surface.get_size()))
+                f.write(pygame.image.tobytes(surface, 'RGBA'))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # 缓存目录不可写时只是下次仍需解码
+
+    # ---- 图片 ----
+    def _decode(self, path, size, smooth):
+        """工作线程：读缓存或解码 + 缩放，返回(未转换格式的Surface, 是否命中缓存)"""
+        cache_path = self._cache_path(path, size, smooth)
+        if cache_path is not None:
+            surface = self._read_cache(cache_path)
+            if surface is not None:
+                return surface, True
+        surface = pygame.image.load(path)
+        if surface.get_bitsize() != 32:
+            # 调色板/24位图片先转成32位RGBA，smoothscale和缓存都按32位处理
+            rgba = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+            rgba.blit(surface, (0, 0))
+            surface = rgba
+        if size is not None and surface.get_size() != tuple(size):
+            scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+            surface = scale(surface, size)
+        if cache_path is not None:
+            self._write_cache(cache_path, surface)
+        return surface, False
+
+    def _finish(self, key, result, convert):
+        surface, cached = result
+        if convert:
+            surface = surface.convert_alpha()
+        with self.lock:
+            if cached:
+                self.cache_hits += 1
+            else:
+                self.decoded += 1
+            self.images[key] = surface
+        return surface
+
+    def load_images(self, requests):
+        """
+        并行加载一批图片，requests为 {名称: (路径, 尺寸或None, 是否平滑缩放)}
+        返回 {名称: Surface}，加载失败的为None；结果同时进入内存缓存，之后image()直接命中
+        """
+        start = time.perf_counter()
+        keys = {name: (path, tuple(size) if size else None, smooth, True)
+                for name, (path, size, smooth) in requests.items()}
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='asset') as executor:
+            futures = {name: executor.submit(self._decode, *key[:3]) for name, key in keys.items()
+                       if key not in self.images}
+            for name, key in keys.items():
+                future = futures.get(name)
+                if future is None:
+                    results[name] = self.images[key]
+                    continue
+                try:
+                    results[name] = self._finish(key, future.result(), True)
+                except (pygame.error, OSError):
+                    self.images[key] = None
+                    results[name] = None
+        self.load_ms += (time.perf_counter() - start) * 1000.0
+        return results
+
+    def decode(self, path, size=None, smooth=False):
+        """读缓存或解码成一张新的Surface（不转换格式、不进内存缓存），失败返回None；可在任意线程调用"""
+        try:
+            return self._decode(path, tuple(size) if size else None, smooth)[0]
+        except (pygame.error, OSError):
+            return None
+
+    def image(self, path, size=None, smooth=False, convert=True):
+        """
+        按需加载单张图片（内存缓存 -> 磁盘缓存 -> 解码），失败返回None；convert=False可在工作线程调用。
+        转换与未转换格式的结果分开缓存，互不串用
+        """
+        key = (path, tuple(size) if size else None, smooth, convert)
+        if key in self.images:
+            return self.images[key]
+        start = time.perf_counter()
+        try:
+            surface = self._finish(key, self._decode(*key[:3]), convert)
+        except (pygame.error, OSError):
+            surface = None
+            self.images[key] = None
+        self.load_ms += (time.perf_counter() - start) * 1000.0
+        return surface
+
+    # ---- 字体 ----
+    def font(self, path, size):
+        """按需创建字体（path为None时用默认字体）；字体文件只读一次，各字号从内存里的同一份数据创建"""
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None and path is None:
+            font = self.fonts[key] = pygame.font.Font(None, size)  # pygame默认字体
+        if font is None:
+            data = self.font_data.get(path)
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self.font_data[path] = data
+            font = pygame.font.Font(io.BytesIO(data), size)
+            self.fonts[key] = font
+        return font
+
+    def summary(self):
+        return f"缓存命中 {self.cache_hits}，解码 {self.decoded}，用时 {self.load_ms:.0f} ms"
@@ -0,0 +1,7 @@
+# 性能测试包：声明式场景（scenarios.py）+ 无窗口运行器（runner.py）
+# 用法：
+#   python -m benchmarks list
+#   python -m benchmarks run --output results.json
+#   python -m benchmarks compare baseline.json results.json --threshold 0.1
+from .scenarios import SCENARIOS
+from .runner import run_scenario, run_all, save_results, load_results, compare_results, machine_metadata
@@ -0,0 +1,78 @@
+import argparse
+import sys
+
+from .scenarios import SCENARIOS, DEFAULT_WARMUP, DEFAULT_ALLOC_FRAMES
+from .runner import run_all, save_results, load_results, compare_results
+
+
+def _print_results(results):
+    for name, result in results['scenarios'].items():
+        print(f"{name}  ({result['description']})")
+        for metric, stats in result['metrics'].items():
+            print(f"    {metric:<10} mean {stats['mean']:8.3f}  p50 {stats['p50']:8.3f}  "
+                  f"p95 {stats['p95']:8.3f}  max {stats['max']:8.3f}")
+        alloc = result['alloc']
+        if alloc:
+            print(f"    内存分配   峰值 {alloc['peak_kib']:.1f} KiB  净增长 {alloc['net_kib_per_frame']:.2f} KiB/帧  "
+                  f"gc第0代回收 {result['gc_gen0_collections']} 次")
+
+
+def _print_comparison(rows, threshold):
+    regressions = [row for row in rows if row['regressed']]
+    for row in rows:
+        flag = '回退' if row['regressed'] else ''
+        print(f"{row['scenario']:<30} {row['metric']:<18} {row['baseline']:10.3f} -> {row['current']:10.3f}  "
+              f"{row['change'] * 100:+7.1f}%  {flag}")
+    print(f"阈值 {threshold * 100:.0f}%，回退 {len(regressions)} 项")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='游戏性能测试场景')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help='列出所有场景')
+
+    run_parser = commands.add_parser('run', help='运行场景并输出JSON结果')
+    run_parser.add_argument('scenarios', nargs='*', help='场景名（默认全部）')
+    run_parser.add_argument('--frames', type=int, default=None, help='计时帧数（默认按场景配置）')
+    run_parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='预热帧数')
+    run_parser.add_argument('--alloc-frames', type=int, default=DEFAULT_ALLOC_FRAMES, help='内存分配统计帧数')
+    run_parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    run_parser.add_argument('--output', '-o', default=None, help='结果JSON路径')
+    run_parser.add_argument('--baseline', default=None, help='运行后与该基准JSON对比')
+    run_parser.add_argument('--threshold', type=float, default=0.10, help='回退阈值（相对值）')
+
+    compare_parser = commands.add_parser('compare', help='对比两次结果')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='回退阈值（相对值）')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, config in SCENARIOS.items():
+            print(f"{name:<30} [{config['kind']}] {config['description']}")
+        return 0
+
+    if args.command == 'run':
+        unknown = [name for name in args.scenarios if name not in SCENARIOS]
+        if unknown:
+            parser.error(f"未知场景: {', '.join(unknown)}")
+        results = run_all(args.scenarios or None, args.frames, args.seed, args.warmup, args.alloc_frames,
+                          progress=lambda name: print(f"运行 {name} ...", file=sys.stderr))
+        _print_results(results)
+        if args.output:
+            save_results(results, args.output)
+            print(f"结果已保存到 {args.output}")
+        if args.baseline:
+            return 1 if _print_comparison(compare_results(load_results(args.baseline), results,
+                                                          args.threshold), args.threshold) else 0
+        return 0
+
+    rows = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    return 1 if _print_comparison(rows, args.threshold) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
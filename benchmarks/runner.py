@@ -0,0 +1,495 @@
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 无窗口运行：必须在导入pygame之前指定dummy视频/音频驱动
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from game_world import GameWorld, GAME_WIDTH, GAME_HEIGHT, MAX_MONSTERS, MONSTER_TRACKING_RANGE
+from graphics_enhancement import ParticleSystem, LightingSystem, FogOfWar
+
+from .scenarios import SCENARIOS, DEFAULT_WARMUP, DEFAULT_ALLOC_FRAMES
+
+VIEW_WIDTH = 1000
+VIEW_HEIGHT = 900
+
+
+class StopBenchmark(Exception):
+    """录制完成，用于跳出main.py的主循环"""
+
+
+class FrameRecorder:
+    """
+    按帧记录耗时：先预热warmup帧，再计时frames帧（同时统计gc第0代回收次数），
+    最后用tracemalloc统计alloc_frames帧的内存分配峰值和净增长
+    """
+    def __init__(self, frames, warmup=DEFAULT_WARMUP, alloc_frames=DEFAULT_ALLOC_FRAMES):
+        self.frames = frames
+        self.warmup = warmup
+        self.alloc_frames = alloc_frames
+        self.frame_index = 0
+        self.samples = {}  # 指标名 -> 每帧毫秒数列表
+        self.gc_collections = 0
+        self.gc_start = 0
+        self.alloc = None
+
+    @property
+    def done(self):
+        return self.frame_index >= self.warmup + self.frames + self.alloc_frames
+
+    def record(self, **timings):
+        """记录一帧，timings为 指标名=秒数"""
+        index = self.frame_index
+        self.frame_index += 1
+        timed_end = self.warmup + self.frames
+        if index < self.warmup:
+            if index == self.warmup - 1:
+                self.gc_start = gc.get_stats()[0]['collections']
+            return
+        if index < timed_end:
+            for name, seconds in timings.items():
+                self.samples.setdefault(name, []).append(seconds * 1000.0)
+            if index == timed_end - 1:
+                self.gc_collections = gc.get_stats()[0]['collections'] - self.gc_start
+                if self.alloc_frames > 0:
+                    tracemalloc.start()
+            return
+        if index == timed_end + self.alloc_frames - 1:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.alloc = {
+                'frames': self.alloc_frames,
+                'peak_kib': round(peak / 1024.0, 1),
+                'net_kib': round(current / 1024.0, 1),
+                'net_kib_per_frame': round(current / 1024.0 / self.alloc_frames, 2),
+            }
+
+    def results(self):
+        metrics = {name: summarize(values) for name, values in self.samples.items()}
+        return {
+            'frames': self.frames,
+            'warmup': self.warmup,
+            'metrics': metrics,
+            'gc_gen0_collections': self.gc_collections,
+            'alloc': self.alloc,
+        }
+
+
+def summarize(samples_ms):
+    """每帧毫秒数 -> 均值和分位数"""
+    values = np.asarray(samples_ms, dtype=np.float64)
+    if values.size == 0:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    p50, p95 = np.percentile(values, (50, 95)).tolist()
+    return {
+        'mean': round(float(values.mean()), 4),
+        'p50': round(p50, 4),
+        'p95': round(p95, 4),
+        'max': round(float(values.max()), 4),
+    }
+
+
+class BenchmarkCamera:
+    """与main.py的Camera接口一致（x、y、apply）"""
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+
+    def apply(self, x, y):
+        return x - self.x, y - self.y
+
+
+# ---- kind = "world" ----
+def _cluster_around_player(world, monsters, rng):
+    """把病毒放到玩家追踪范围内随机的通道格中心"""
+    cell_size = world.cell_size
+    rows, cols = np.nonzero(~world.walls)
+    centers_x = cols * cell_size + cell_size / 2
+    centers_y = rows * cell_size + cell_size / 2
+    distance = np.hypot(centers_x - world.player_x, centers_y - world.player_y)
+    nearby = np.flatnonzero(distance < MONSTER_TRACKING_RANGE - cell_size)
+    if nearby.size == 0:
+        return
+    for monster, cell in zip(monsters, rng.choice(nearby, len(monsters)).tolist()):
+        monster.x = centers_x[cell]
+        monster.y = centers_y[cell]
+
+
+def _setup_world(config, seed):
+    world = GameWorld(view_width=VIEW_WIDTH, view_height=VIEW_HEIGHT, seed=seed)
+    world.player_x, world.player_y = world.find_safe_spawn_position(world.width // 2, world.height // 2,
+                                                                    world.player_size)
+    # generate_monsters单次最多生成MAX_MONSTERS只（还可能多一只Boss），分批生成后截断
+    target = config.get('monsters', 0)
+    monsters = []
+    while len(monsters) < target:
+        batch = world.generate_monsters(min(MAX_MONSTERS, target - len(monsters)))
+        if not batch:
+            break
+        monsters.extend(batch)
+    for monster in monsters[target:]:
+        monster.release()
+    monsters = monsters[:target]
+    if config.get('cluster'):
+        _cluster_around_player(world, monsters, np.random.default_rng(seed))
+    world.replace_monsters(monsters)
+    return world
+
+
+def _world_frames(config, seed):
+    world = _setup_world(config, seed)
+    surface = pygame.Surface((VIEW_WIDTH, VIEW_HEIGHT)) if config.get('render') else None
+    orbit = config.get('player_orbit', 0)
+    volley_size = config.get('volley_size', 0)
+    volley_interval = config.get('volley_interval', 1)
+    scalar_move = config.get('scalar_move', False)
+    tick = 0
+
+    def simulate():
+        if scalar_move:
+            # 标量路径：逐个病毒的Monster.move_towards_player提交给AI调度器，按预算轮转执行
+            world.flow_field.update(world.player_x, world.player_y)
+            for monster in world.monsters:
+                world.ai_scheduler.submit(monster, monster.move_towards_player,
+                                          world.player_x, world.player_y, world.maze)
+            world.ai_scheduler.run()
+            return
+        if volley_size and tick % volley_interval == 0:
+            angles = np.arange(volley_size) * (math.pi * 2 / volley_size) + tick * 0.1
+            world.bullets.spawn_batch(world.player_x, world.player_y,
+                                      np.cos(angles) * 15, np.sin(angles) * 15, 40, 120)
+        inputs = {}
+        if orbit:
+            angle = (tick % orbit) / orbit * math.pi * 2
+            inputs = {'move_x': math.cos(angle), 'move_y': math.sin(angle)}
+        world.step(inputs)
+
+    while True:
+        start = time.perf_counter()
+        simulate()
+        sim_end = time.perf_counter()
+        if surface is not None:
+            world.render(surface)
+            yield {'sim_ms': sim_end - start, 'render_ms': time.perf_counter() - sim_end}
+        else:
+            yield {'sim_ms': sim_end - start}
+        tick += 1
+
+
+# ---- kind = "effects" ----
+class MovingLightOwner:
+    """带光源的移动对象（匀速直线，碰到地图边界反弹）"""
+    def __init__(self, x, y, angle, speed=3.0):
+        self.x = x
+        self.y = y
+        self.dx = math.cos(angle) * speed
+        self.dy = math.sin(angle) * speed
+
+    def update(self):
+        self.x += self.dx
+        self.y += self.dy
+        if not 0 <= self.x <= GAME_WIDTH:
+            self.dx = -self.dx
+        if not 0 <= self.y <= GAME_HEIGHT:
+            self.dy = -self.dy
+
+
+def _effects_frames(config, seed):
+    rng = random.Random(seed)
+    surface = pygame.Surface((VIEW_WIDTH, VIEW_HEIGHT))
+    camera = BenchmarkCamera()
+    particle_system = ParticleSystem()
+    particle_target = min(config.get('particles', 0), particle_system.max_particles)
+    lighting_system = LightingSystem(VIEW_WIDTH, VIEW_HEIGHT)
+    for _ in range(config.get('lights', 0)):
+        lighting_system.add_light(rng.uniform(0, VIEW_WIDTH), rng.uniform(0, VIEW_HEIGHT),
+                                  rng.choice((60, 80, 100)), (255, 220, 150))
+    # 跟随移动对象的光源：对象分布在整张地图上，每帧移动
+    movers = []
+    for _ in range(config.get('moving_lights', 0)):
+        mover = MovingLightOwner(rng.uniform(0, GAME_WIDTH), rng.uniform(0, GAME_HEIGHT), rng.uniform(0, math.tau))
+        lighting_system.add_light(mover.x, mover.y, rng.choice((40, 60, 80)), (255, 180, 120), owner=mover)
+        movers.append(mover)
+    fog_of_war = FogOfWar(VIEW_WIDTH, VIEW_HEIGHT, 300) if config.get('fog') else None
+    center_x = VIEW_WIDTH // 2
+    center_y = VIEW_HEIGHT // 2
+    tick = 0
+
+    while True:
+        start = time.perf_counter()
+        # 补满粒子（爆炸式喷发），摄像机每帧移动使光照缓存失效，与跟随玩家时一致
+        missing = particle_target - particle_system.count
+        if missing > 0:
+            particle_system.add_burst(missing, center_x + camera.x, center_y + camera.y, (255, 150, 50),
+                                      speed=(1, 4), lifetime=(20, 60), size=(2, 5), spawn_distance=(0, 200))
+        particle_system.update()
+        for mover in movers:
+            mover.update()
+        camera.x = math.cos(tick * 0.05) * 40
+        camera.y = math.sin(tick * 0.05) * 40
+        sim_end = time.perf_counter()
+
+        surface.fill((30, 30, 30))
+        particle_system.draw(surface, camera)
+        lighting_system.draw(surface, camera)
+        if fog_of_war is not None:
+            fog_of_war.draw(surface, center_x, center_y)
+        yield {'sim_ms': sim_end - start, 'render_ms': time.perf_counter() - sim_end}
+        tick += 1
+
+
+def _drive(frames, recorder):
+    for timings in frames:
+        recorder.record(**timings)
+        if recorder.done:
+            break
+
+
+# ---- kind = "game" ----
+class _FakeClock:
+    """不等待的时钟，让主循环全速运行"""
+    def tick(self, *args):
+        return 16
+
+    def get_fps(self):
+        return 60.0
+
+    def get_time(self):
+        return 16
+
+
+class _ScriptedKeys:
+    """模拟按键：来回移动，定期触发技能"""
+    def __init__(self, state):
+        self.state = state
+
+    def __getitem__(self, key):
+        frame = self.state['frame']
+        if key in (pygame.K_d, pygame.K_s):
+            return (frame // 40) % 2 == 0
+        if key in (pygame.K_a, pygame.K_w):
+            return (frame // 40) % 2 == 1
+        if key in (pygame.K_r, pygame.K_b):
+            return frame % 50 == 0
+        return False
+
+
+def _run_game(config, recorder, seed):
+    """
+    无窗口运行main.py：替换时钟、事件、按键和flip，在每次flip时记录整帧耗时；
+    主循环和绘制代码与正常游戏完全相同，录制完成后抛出StopBenchmark结束
+    """
+    state = {'frame': 0, 'last': None}
+    real_clock = pygame.time.Clock
+    real_get = pygame.event.get
+    real_pressed = pygame.key.get_pressed
+    real_flip = pygame.display.flip
+    open_codex = config.get('open_codex', False)
+
+    def fake_get(*args, **kwargs):
+        real_get()
+        events = []
+        if state['frame'] % 7 == 0 and not open_codex:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(VIEW_WIDTH // 2, 200)))
+        return events
+
+    def fake_flip():
+        real_flip()
+        now = time.perf_counter()
+        game_globals = sys._getframe(1).f_globals
+        if open_codex:
+            game_globals['virus_codex_active'] = True
+        if state['last'] is not None:
+            recorder.record(frame_ms=now - state['last'])
+        state['frame'] += 1
+        state['last'] = time.perf_counter()
+        if recorder.done:
+            raise StopBenchmark()
+
+    pygame.time.Clock = _FakeClock
+    pygame.event.get = fake_get
+    pygame.key.get_pressed = lambda: _ScriptedKeys(state)
+    pygame.display.flip = fake_flip
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(os.path.join(REPO_ROOT, 'main.py'), run_name='__main__')
+    except StopBenchmark:
+        pass
+    finally:
+        pygame.time.Clock = real_clock
+        pygame.event.get = real_get
+        pygame.key.get_pressed = real_pressed
+        pygame.display.flip = real_flip
+
+
+# ---- kind = "startup" ----
+# 子进程里运行的启动探针：从解释器就绪开始计时，main.py第一次flip时输出用时并立即退出
+STARTUP_PROBE = """
+import os, runpy, sys, time
+start = time.perf_counter()
+import pygame
+def first_flip():
+    print('FIRST_FRAME_MS', (time.perf_counter() - start) * 1000.0, flush=True)
+    os._exit(0)
+pygame.display.flip = first_flip
+repo_root = sys.argv[1]
+sys.path.insert(0, repo_root)
+sys.argv = ['main.py']
+runpy.run_path(os.path.join(repo_root, 'main.py'), run_name='__main__')
+"""
+
+
+def _run_startup(config):
+    """用临时资源缓存目录连续启动launches次：第一次为冷启动（解码并写缓存），之后命中缓存"""
+    samples = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, IMMUNE_ASSET_CACHE=cache_dir, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+        for _ in range(config.get('launches', 5)):
+            completed = subprocess.run([sys.executable, '-c', STARTUP_PROBE, REPO_ROOT], cwd=REPO_ROOT, env=env,
+                                       capture_output=True, text=True, timeout=300)
+            lines = [line for line in completed.stdout.splitlines() if line.startswith('FIRST_FRAME_MS')]
+            if not lines:
+                raise RuntimeError(f"启动失败：{completed.stderr.strip()[-500:]}")
+            samples.append(float(lines[-1].split()[1]))
+    return {
+        'frames': len(samples),
+        'warmup': 0,
+        'metrics': {'cold_ms': summarize(samples[:1]), 'warm_ms': summarize(samples[1:])},
+        'gc_gen0_collections': 0,
+        'alloc': None,
+    }
+
+
+def run_scenario(name, frames=None, seed=1, warmup=DEFAULT_WARMUP, alloc_frames=DEFAULT_ALLOC_FRAMES):
+    """运行单个场景，返回结果字典"""
+    config = SCENARIOS[name]
+    if config['kind'] == 'startup':
+        result = _run_startup(config)
+        result['description'] = config['description']
+        result['kind'] = config['kind']
+        return result
+    recorder = FrameRecorder(frames or config.get('frames', 300), warmup, alloc_frames)
+    pygame.init()
+    if config['kind'] != 'game':
+        pygame.display.set_mode((VIEW_WIDTH, VIEW_HEIGHT))
+    random.seed(seed)
+    np.random.seed(seed)
+    gc.collect()
+
+    if config['kind'] == 'world':
+        _drive(_world_frames(config, seed), recorder)
+    elif config['kind'] == 'effects':
+        _drive(_effects_frames(config, seed), recorder)
+    elif config['kind'] == 'game':
+        _run_game(config, recorder, seed)
+    else:
+        raise ValueError(f"未知的场景类型: {config['kind']}")
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+    result = recorder.results()
+    result['description'] = config['description']
+    result['kind'] = config['kind']
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def machine_metadata():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'pygame': pygame.version.ver,
+        'sdl': '.'.join(str(part) for part in pygame.get_sdl_version()),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+    }
+
+
+def run_all(names=None, frames=None, seed=1, warmup=DEFAULT_WARMUP, alloc_frames=DEFAULT_ALLOC_FRAMES,
+            progress=None):
+    """运行多个场景（默认全部），返回可直接写成JSON的结果"""
+    results = {'metadata': machine_metadata(), 'seed': seed, 'scenarios': {}}
+    for name in names or list(SCENARIOS):
+        if progress is not None:
+            progress(name)
+        results['scenarios'][name] = run_scenario(name, frames, seed, warmup, alloc_frames)
+    return results
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, threshold=0.10, min_delta_ms=0.05, statistics=('p50', 'p95')):
+    """
+    对比两次结果，返回每个(场景, 指标, 统计量)的变化
+    变慢超过threshold（相对值）且绝对差值超过min_delta_ms时标记为回退；内存峰值按同样的相对阈值比较
+    """
+    rows = []
+    for name, current_result in current['scenarios'].items():
+        baseline_result = baseline['scenarios'].get(name)
+        if baseline_result is None:
+            continue
+        for metric, current_stats in current_result['metrics'].items():
+            baseline_stats = baseline_result['metrics'].get(metric)
+            if baseline_stats is None:
+                continue
+            for statistic in statistics:
+                before = baseline_stats[statistic]
+                after = current_stats[statistic]
+                change = (after - before) / before if before > 0 else 0.0
+                rows.append({
+                    'scenario': name, 'metric': f'{metric}.{statistic}',
+                    'baseline': before, 'current': after, 'change': change,
+                    'regressed': change > threshold and after - before > min_delta_ms,
+                })
+        if baseline_result.get('alloc') and current_result.get('alloc'):
+            before = baseline_result['alloc']['peak_kib']
+            after = current_result['alloc']['peak_kib']
+            change = (after - before) / before if before > 0 else 0.0
+            rows.append({
+                'scenario': name, 'metric': 'alloc.peak_kib',
+                'baseline': before, 'current': after, 'change': change,
+                'regressed': change > threshold and after - before > 1.0,
+            })
+    return rows
@@ -0,0 +1,72 @@
+# 性能测试场景（声明式）：每个场景只描述“测什么”，由runner.py按kind搭建并驱动
+#   kind = "world"   : GameWorld模拟（迷宫、病毒、子弹），可选离屏绘制
+#   kind = "effects" : 粒子 + 光照 + 战争迷雾
+#   kind = "game"    : 无窗口运行main.py的完整主循环（HUD、图鉴等界面）
+#   kind = "startup" : 在子进程中启动main.py，测量到第一帧画面的用时（launches次，第一次为空缓存）
+# frames为计时帧数，warmup为预热帧数（不计入结果），alloc_frames为内存分配统计帧数
+SCENARIOS = {
+    "monsters_chase_800": {
+        "description": "800只病毒在75×75迷宫中追踪玩家",
+        "kind": "world",
+        "monsters": 800,
+        "cluster": True,  # 全部放在玩家追踪范围内
+        "player_orbit": 120,  # 玩家每120帧绕一圈移动，流场持续重算
+        "render": True,
+        "frames": 300,
+    },
+    "monsters_scalar_move_300": {
+        "description": "300只病毒逐个调用Monster.move_towards_player（标量回退路径，经AI调度器按预算执行）",
+        "kind": "world",
+        "monsters": 300,
+        "cluster": True,
+        "scalar_move": True,
+        "render": False,
+        "frames": 300,
+    },
+    "multishot_volleys_300": {
+        "description": "多重射击（每次10发）连续齐射，场上300只病毒",
+        "kind": "world",
+        "monsters": 300,
+        "cluster": True,
+        "volley_size": 10,
+        "volley_interval": 1,
+        "render": True,
+        "frames": 300,
+    },
+    "particles_lighting_fog_1000": {
+        "description": "1000个粒子 + 光照 + 战争迷雾",
+        "kind": "effects",
+        "particles": 1000,
+        "lights": 8,
+        "fog": True,
+        "frames": 300,
+    },
+    "dynamic_lights_500": {
+        "description": "500个跟随移动的光源（分布在整张地图，屏幕内只有少数）+ 光照",
+        "kind": "effects",
+        "particles": 0,
+        "lights": 0,
+        "moving_lights": 500,
+        "frames": 300,
+    },
+    "hud_codex_open": {
+        "description": "完整HUD + 打开病毒图鉴（main.py主循环）",
+        "kind": "game",
+        "open_codex": True,
+        "frames": 120,
+    },
+    "startup_first_frame": {
+        "description": "启动到第一帧画面（第一次启动为空资源缓存，其余命中磁盘缓存）",
+        "kind": "startup",
+        "launches": 5,
+    },
+    "game_full_frame": {
+        "description": "main.py主循环正常游戏（自动移动、攻击）",
+        "kind": "game",
+        "open_codex": False,
+        "frames": 300,
+    },
+}
+
+DEFAULT_WARMUP = 10
+DEFAULT_ALLOC_FRAMES = 30
@@ -16,6 +16,24 @@ datas = [
     ('logo.png', '.'),  # 窗口图标
     ('STHeiti Light.ttc', '.'),
     ('graphics_enhancement.py', '.'),
+    ('spatial_grid.py', '.'),
+    ('pathfinding.py', '.'),
+    ('monster_pool.py', '.'),
+    ('bullet_pool.py', '.'),
+    ('maze_renderer.py', '.'),
+    ('text_cache.py', '.'),
+    ('profiler.py', '.'),
+    ('walkability.py', '.'),
+    ('spawner.py', '.'),
+    ('monster_lod.py', '.'),
+    ('ai_scheduler.py', '.'),
+    ('level_preloader.py', '.'),
+    ('asset_manager.py', '.'),
+    ('sprite_registry.py', '.'),
+    ('field_of_view.py', '.'),
+    ('minimap.py', '.'),
+    ('game_world.py', '.'),
+    ('headless.py', '.'),
     ('images', 'images'),  # 病毒图片目录
 ]
 
@@ -15,7 +15,7 @@ cd "$(dirname "$0")"
 
 # 安装依赖
 echo "[1/3] 安装依赖..."
-pip3 install pygame pyinstaller pillow -q
+pip3 install pygame numpy pyinstaller pillow -q
 
 # 清理旧文件
 echo "[2/3] 清理旧文件..."
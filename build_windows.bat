@@ -14,7 +14,7 @@ if errorlevel 1 (
 
 :: 安装依赖
 echo [1/3] 安装依赖...
-pip install pygame pyinstaller pillow -q
+pip install pygame numpy pyinstaller pillow -q
 
 :: 切换到脚本所在目录
 cd /d "%~dp0"
@@ -0,0 +1,172 @@
+import numpy as np
+import pygame
+
+# 子弹缓冲区：固定容量的NumPy数组，前count个元素为存活子弹；
+# 删除时把末尾的子弹交换到空位（交换删除），始终保持数组紧凑
+class BulletPool:
+    FIELDS = ('x', 'y', 'dx', 'dy', 'damage', 'lifetime')
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.dx = np.zeros(capacity, dtype=np.float64)
+        self.dy = np.zeros(capacity, dtype=np.float64)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.sprite = None
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn_batch(self, x, y, dx, dy, damage, lifetime):
+        """从(x, y)一次发射多颗子弹，dx/dy为速度数组；超出容量的子弹直接丢弃"""
+        dx = np.atleast_1d(np.asarray(dx, dtype=np.float64))
+        dy = np.atleast_1d(np.asarray(dy, dtype=np.float64))
+        amount = min(dx.size, self.capacity - self.count)
+        if amount <= 0:
+            return 0
+        start = self.count
+        end = start + amount
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.dx[start:end] = dx[:amount]
+        self.dy[start:end] = dy[:amount]
+        self.damage[start:end] = damage
+        self.lifetime[start:end] = lifetime
+        self.count = end
+        return amount
+
+    def remove(self, indices):
+        """交换删除：用末尾仍存活的子弹填补被删除的位置"""
+        indices = np.unique(np.asarray(indices, dtype=np.intp))
+        if indices.size == 0:
+            return
+        count = self.count
+        new_count = count - indices.size
+        removed = np.zeros(count, dtype=np.bool_)
+        removed[indices] = True
+        holes = indices[indices < new_count]
+        tail = np.flatnonzero(~removed[new_count:]) + new_count
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[holes] = array[tail]
+        self.count = new_count
+
+    def update(self, world_width, world_height):
+        """所有子弹前进一帧，移除越界或生命周期结束的子弹"""
+        count = self.count
+        if count == 0:
+            return
+        x = self.x[:count]
+        y = self.y[:count]
+        x += self.dx[:count]
+        y += self.dy[:count]
+        lifetime = self.lifetime[:count]
+        lifetime -= 1
+        dead = (x < 0) | (x > world_width) | (y < 0) | (y > world_height) | (lifetime <= 0)
+        if dead.any():
+            self.remove(np.flatnonzero(dead))
+
+    def collide(self, monster_pool):
+        """
+        批量检测子弹与病毒的碰撞
+        病毒按“最大半径”大小的格子计数排序分桶，每颗子弹只和周围3x3个桶里的病毒做距离判断。
+        返回所有重叠的(子弹下标数组, 病毒槽位数组)，按子弹下标、再按槽位编号升序；
+        同一颗子弹可能对应多个病毒，由调用方挑第一个仍然存活的
+        """
+        empty = np.empty(0, dtype=np.intp)
+        count = self.count
+        if count == 0:
+            return empty, empty
+        slots = np.flatnonzero(monster_pool.alive)
+        if slots.size == 0:
+            return empty, empty
+
+        monster_x = monster_pool.x[slots]
+        monster_y = monster_pool.y[slots]
+        monster_radius = monster_pool.radius[slots]
+        # 格子边长不小于最大半径，命中的病毒一定在子弹所在格子的相邻格内
+        grid_size = float(max(int(monster_radius.max()), 1))
+        # 稠密格子表，四周各留一圈（越界的病毒归到边缘格，只会多出候选不会漏判）
+        grid_cols = int(monster_pool.world_width // grid_size) + 1
+        grid_rows = int(monster_pool.world_height // grid_size) + 1
+        table_cols = grid_cols + 3
+
+        def cell_index(xs, ys):
+            cell_x = np.clip(np.floor_divide(xs, grid_size), -1, grid_cols).astype(np.intp) + 1
+            cell_y = np.clip(np.floor_divide(ys, grid_size), -1, grid_rows).astype(np.intp) + 1
+            return cell_y * table_cols + cell_x
+
+        monster_cells = cell_index(monster_x, monster_y)
+        order = np.argsort(monster_cells, kind='stable')
+        cell_counts = np.bincount(monster_cells, minlength=(grid_rows + 3) * table_cols)
+        cell_starts = np.cumsum(cell_counts) - cell_counts
+
+        bullet_x = self.x[:count]
+        bullet_y = self.y[:count]
+        bullet_cells = cell_index(bullet_x, bullet_y)
+        bullet_ids = np.arange(count)
+
+        pair_bullets = []
+        pair_monsters = []
+        for offset_y in (-1, 0, 1):
+            for offset_x in (-1, 0, 1):
+                cells = bullet_cells + offset_y * table_cols + offset_x
+                counts = cell_counts[cells]
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                # 展开成(子弹, 候选病毒)对
+                ramp = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                pair_bullets.append(np.repeat(bullet_ids, counts))
+                pair_monsters.append(order[np.repeat(cell_starts[cells], counts) + ramp])
+        if not pair_bullets:
+            return empty, empty
+
+        bullets = np.concatenate(pair_bullets)
+        monsters = np.concatenate(pair_monsters)
+        dx = bullet_x[bullets] - monster_x[monsters]
+        dy = bullet_y[bullets] - monster_y[monsters]
+        radius = monster_radius[monsters]
+        hit = dx * dx + dy * dy < radius * radius
+        if not hit.any():
+            return empty, empty
+        bullets = bullets[hit]
+        hit_slots = slots[monsters[hit]]
+        order = np.lexsort((hit_slots, bullets))
+        return bullets[order], hit_slots[order]
+
+    def _create_sprite(self):
+        """预渲染子弹贴图：黄色弹芯 + 半透明光晕"""
+        sprite = pygame.Surface((16, 16), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (255, 255, 0), (8, 8), 4)
+        glow_surface = pygame.Surface((16, 16), pygame.SRCALPHA)
+        for radius in range(8, 0, -2):
+            alpha = int(100 * (radius / 8))
+            pygame.draw.circle(glow_surface, (255, 255, 100, alpha), (8, 8), radius)
+        sprite.blit(glow_surface, (0, 0))
+        return sprite
+
+    def draw(self, window, camera_x, camera_y, alpha=1.0):
+        """
+        只绘制屏幕内的子弹，用一次blits批量提交
+        alpha: 上一tick到当前tick之间的插值比例（子弹匀速直线飞行，上一tick位置即x - dx）
+        """
+        count = self.count
+        if count == 0:
+            return
+        if self.sprite is None:
+            self.sprite = self._create_sprite()
+        lag = 1.0 - alpha
+        screen_x = (self.x[:count] - self.dx[:count] * lag - camera_x).astype(np.int32) - 8
+        screen_y = (self.y[:count] - self.dy[:count] * lag - camera_y).astype(np.int32) - 8
+        width, height = window.get_size()
+        visible = (screen_x > -16) & (screen_x < width) & (screen_y > -16) & (screen_y < height)
+        sprite = self.sprite
+        window.blits([(sprite, position) for position in
+                      zip(screen_x[visible].tolist(), screen_y[visible].tolist())], doreturn=False)
@@ -0,0 +1,132 @@
+import math
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# 八个卦限的坐标变换(xx, xy, yx, yy)：卦限内的(列, 行)偏移 -> 迷宫上的(dx, dy)
+OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+# 视野（FOV）：在迷宫格子上做递归阴影投射（recursive shadowcasting），墙挡住视线，墙本身可见。
+# 结果是以玩家所在格为中心、边长2r+1格的布尔窗口（r为视野半径对应的格数再加一格，
+# 保证玩家在格内任意位置时圆形视野都落在窗口里）；迷宫不变，所以同一格的结果按格子缓存（LRU），
+# 玩家换格时才取一次，回到走过的格子直接命中缓存
+class FieldOfView:
+    def __init__(self, walls, cell_size, radius, max_cached=1024):
+        """
+        walls: 迷宫墙壁布尔表（行=y，列=x）
+        radius: 视野半径（像素）
+        """
+        self.walls = walls.tolist()  # 逐格访问时Python列表比NumPy下标快得多
+        self.maze_height, self.maze_width = walls.shape
+        self.cell_size = cell_size
+        self.radius_cells = int(math.ceil(radius / cell_size)) + 1
+        self.max_cached = max_cached
+        self.cache = OrderedDict()  # (格x, 格y) -> 可见窗口
+        # 当前玩家格的结果
+        self.cell = None
+        self.mask = None
+        self.origin_x = 0  # 窗口左上角的格子坐标
+        self.origin_y = 0
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.last_compute_ms = 0.0
+
+    def _is_wall(self, x, y):
+        if 0 <= x < self.maze_width and 0 <= y < self.maze_height:
+            return self.walls[y][x]
+        return True  # 迷宫外视为墙
+
+    def _cast(self, visible, size, cx, cy, row, start, end, xx, xy, yx, yy):
+        """在一个卦限内从第row行开始投射，(start, end)为仍然可见的斜率区间"""
+        if start < end:
+            return
+        radius = self.radius_cells
+        radius_sq = radius * radius
+        is_wall = self._is_wall
+        new_start = start
+        for distance in range(row, radius + 1):
+            dy = -distance
+            blocked = False
+            for dx in range(-distance, 1):
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                offset_x = dx * xx + dy * xy
+                offset_y = dx * yx + dy * yy
+                if dx * dx + dy * dy <= radius_sq:
+                    visible[(offset_y + radius) * size + offset_x + radius] = 1
+                wall = is_wall(cx + offset_x, cy + offset_y)
+                if blocked:
+                    if wall:
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif wall and distance < radius:
+                    # 墙把视线分成两段：墙左边的那段递归投射，继续扫描墙右边
+                    blocked = True
+                    self._cast(visible, size, cx, cy, distance + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+
+    def compute(self, cell_x, cell_y):
+        """计算某一格的可见窗口（不查缓存）：布尔数组[行, 列]，窗口左上角为(cell_x - r, cell_y - r)"""
+        radius = self.radius_cells
+        size = radius * 2 + 1
+        visible = bytearray(size * size)
+        visible[radius * size + radius] = 1
+        for xx, xy, yx, yy in OCTANTS:
+            self._cast(visible, size, cell_x, cell_y, 1, 1.0, 0.0, xx, xy, yx, yy)
+        return np.frombuffer(bytes(visible), dtype=np.uint8).reshape(size, size).astype(bool)
+
+    def visible_cells(self, cell_x, cell_y):
+        """某一格的可见窗口（LRU缓存）"""
+        key = (cell_x, cell_y)
+        mask = self.cache.get(key)
+        if mask is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return mask
+        self.misses += 1
+        start = time.perf_counter()
+        mask = self.cache[key] = self.compute(cell_x, cell_y)
+        self.last_compute_ms = (time.perf_counter() - start) * 1000.0
+        if len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+        return mask
+
+    def update(self, x, y):
+        """玩家移动到像素坐标(x, y)；换格时取新格的可见窗口并返回True"""
+        cell = (int(x // self.cell_size), int(y // self.cell_size))
+        if cell == self.cell:
+            return False
+        self.cell = cell
+        self.mask = self.visible_cells(*cell)
+        self.origin_x = cell[0] - self.radius_cells
+        self.origin_y = cell[1] - self.radius_cells
+        return True
+
+    def is_visible(self, x, y, half_size=0):
+        """以(x, y)为中心、半边长half_size的方形是否有任何一格可见（窗口外一律不可见）"""
+        if self.mask is None:
+            return True
+        cell_size = self.cell_size
+        size = self.mask.shape[0]
+        left = max(int((x - half_size) // cell_size) - self.origin_x, 0)
+        right = min(int((x + half_size) // cell_size) - self.origin_x, size - 1)
+        top = max(int((y - half_size) // cell_size) - self.origin_y, 0)
+        bottom = min(int((y + half_size) // cell_size) - self.origin_y, size - 1)
+        if left > right or top > bottom:
+            return False
+        if left == right and top == bottom:
+            return bool(self.mask[top, left])
+        return bool(self.mask[top:bottom + 1, left:right + 1].any())
@@ -0,0 +1,1055 @@
+import math
+import random
+
+import numpy as np
+import pygame
+
+from spatial_grid import SpatialHashGrid
+from pathfinding import FlowField
+from monster_pool import MonsterPool
+from bullet_pool import BulletPool
+from maze_renderer import MazeChunkRenderer, create_wall_texture
+from walkability import WalkabilityGrid
+from spawner import Spawner
+from monster_lod import MonsterLOD
+from ai_scheduler import AIScheduler
+
+# 游戏世界：迷宫、病毒、子弹、回血包和玩家的模拟状态都归GameWorld所有。
+# step(inputs)只推进模拟，render(surface)只负责绘制，两者互不依赖，
+# 因此可以在没有窗口的情况下（SDL dummy驱动）批量推进，用于性能测试和自动化测试
+
+# 迷宫与世界尺寸
+CELL_SIZE = 40
+MAZE_WIDTH = 75  # 迷宫宽度（格子数）
+MAZE_HEIGHT = 75  # 迷宫高度（格子数）
+GAME_WIDTH = MAZE_WIDTH * CELL_SIZE
+GAME_HEIGHT = MAZE_HEIGHT * CELL_SIZE
+
+# 病毒相关常量
+MONSTER_ATTACK_RANGE = CELL_SIZE * 1  # 病毒攻击范围（1格距离）
+MONSTER_TRACKING_RANGE = CELL_SIZE * 8  # 病毒追踪范围（8格）
+MAX_MONSTERS = 300 # 设置最大病毒数量（翻倍）
+MIN_MONSTERS = 40   # 最小病毒数量（翻倍）
+MONSTER_SPAWN_COOLDOWN = 180  # 刷新冷却时间（180帧，约3秒）
+MONSTER_LOD_MID_RANGE = CELL_SIZE * 20  # 视野外20格内为中档（低频更新），更远为远档（统计推进）
+MONSTER_LOD_MID_INTERVAL = 6  # 中档最短每6帧更新一次
+MONSTER_LOD_FAR_INTERVAL = 30  # 远档每30帧推进一次
+MONSTER_LOD_TICK_BUDGET = 400  # 每帧近档 + 中档最多更新的病毒数
+MONSTER_AI_BUDGET_MS = 2.0  # 每帧逐个病毒AI（避障兜底等）的时间预算（毫秒）
+MAX_HEALTH_PACKS = 40   # 场上最大回血包数量
+HEALTH_PACK_SPAWN_COOLDOWN = 100  # 回血包刷新冷却时间（?秒）
+HEALTH_RESTORE_AMOUNT = 20  # 回血包恢复量
+PINK = (255, 2, 2)  # 回血包颜色
+
+# 病毒类型定义
+MONSTER_TYPES = [
+    {"name": "感冒病毒", "hp": 40, "attack": 12, "defense": 2, "color": (100, 200, 100)},
+    {"name": "流感病毒", "hp": 55, "attack": 15, "defense": 4, "color": (255, 150, 50)},
+    {"name": "蛀牙细菌", "hp": 35, "attack": 14, "defense": 1, "color": (200, 200, 180)},
+    {"name": "鼻涕虫菌", "hp": 30, "attack": 10, "defense": 1, "color": (180, 220, 100)},
+    {"name": "肚子疼菌", "hp": 85, "attack": 18, "defense": 6, "color": (139, 90, 43)},
+    {"name": "熬夜菌", "hp": 45, "attack": 16, "defense": 0, "color": (180, 150, 220)},
+    {"name": "咳嗽病毒", "hp": 25, "attack": 8, "defense": 0, "color": (100, 100, 120)},
+    {"name": "懒惰菌", "hp": 99, "attack": 14, "defense": 15, "color": (169, 169, 169)},
+    {"name": "坏情绪菌", "hp": 50, "attack": 22, "defense": 3, "color": (100, 50, 150)},
+    {"name": "发烧病毒", "hp": 60, "attack": 20, "defense": 4, "color": (255, 80, 50)}
+]
+
+# Boss病毒类型定义
+BOSS_TYPES = [
+    {
+        "name": "超级流感",
+        "hp": 300,
+        "attack": 30,
+        "defense": 15,
+        "color": (180, 30, 30),  # 深红色
+        "size_multiplier": 5,  # Boss体型翻倍
+        "exp_multiplier": 10    # 免疫力奖励翻10倍
+    },
+    {
+        "name": "病毒之王",
+        "hp": 250,
+        "attack": 35,
+        "defense": 12,
+        "color": (100, 20, 120),  # 紫黑色
+        "size_multiplier": 1.8,
+        "exp_multiplier": 2.5
+    }
+]
+
+# 病毒类型编号（数据池中按编号存放类型，便于批量统计）
+MONSTER_TYPE_IDS = {name: index for index, name in
+                    enumerate([monster_type["name"] for monster_type in MONSTER_TYPES + BOSS_TYPES])}
+
+# 最大病毒半径（Boss体型），用于网格查询时扩大搜索范围
+MAX_MONSTER_RADIUS = int((CELL_SIZE - 10) * max(boss["size_multiplier"] for boss in BOSS_TYPES)) // 2
+
+# 所有病毒体型的半径（普通病毒 + 各Boss），世界生成时为它们预先计算可通行表
+ENTITY_RADII = sorted({(CELL_SIZE - 10) // 2} |
+                      {int((CELL_SIZE - 10) * boss["size_multiplier"]) // 2 for boss in BOSS_TYPES})
+
+# 无窗口模拟时的玩家参数（与main.py中的默认值一致）
+PLAYER_SIZE = CELL_SIZE - 10
+PLAYER_ACCELERATION = 12.0
+PLAYER_MAX_SPEED = 5
+PLAYER_FRICTION = 0.9
+PLAYER_FIRE_COOLDOWN = 10  # 自动射击间隔（帧）
+PLAYER_BULLET_SPEED = 10
+PLAYER_BULLET_LIFETIME = 120
+
+
+def generate_maze(width, height, rng=random):
+    """rng: random.Random实例（默认用random模块）"""
+    # 初始化迷宫，1表示墙，0表示通道
+    maze = [[1 for _ in range(width)] for _ in range(height)]
+
+    # 使用深度优先搜索算法生成迷宫（改用栈避免递归深度问题）
+    def carve_passages(x, y):
+        # 使用栈代替递归
+        stack = [(x, y)]
+        maze[y][x] = 0  # 标记起点为通道
+
+        while stack:
+            cx, cy = stack[-1]  # 获取当前单元格
+
+            # 随机选择方向：上、右、下、左
+            directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+            rng.shuffle(directions)
+
+            moved = False
+            for dx, dy in directions:
+                nx, ny = cx + dx*2, cy + dy*2
+                if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == 1:
+                    # 在两个单元格之间挖通道
+                    maze[cy + dy][cx + dx] = 0
+                    maze[ny][nx] = 0
+                    stack.append((nx, ny))
+                    moved = True
+                    break
+
+            # 如果没有可移动的方向，回溯
+            if not moved:
+                stack.pop()
+
+    # 从随机点开始生成
+    start_x = rng.randrange(1, width, 2)
+    start_y = rng.randrange(1, height, 2)
+
+    # 确保起点是奇数坐标
+    if start_x % 2 == 0:
+        start_x -= 1
+    if start_y % 2 == 0:
+        start_y -= 1
+
+    carve_passages(start_x, start_y)
+
+    # 确保入口和出口
+    maze[1][1] = 0  # 入口附近
+    maze[height-2][width-2] = 0  # 出口附近
+
+    # 添加一些额外的通道，使迷宫不那么复杂
+    for _ in range(width * height // 20):  # 添加约5%的额外通道
+        x = rng.randrange(1, width-1)
+        y = rng.randrange(1, height-1)
+        maze[y][x] = 0
+
+    return maze
+
+
+class MonsterEntity:
+    """病毒的数据与行为：逐帧变化的数据存放在世界的monster_pool槽位里，这里只保留静态属性"""
+    def __init__(self, world, x, y, name, hp, attack, defense, color, size_multiplier=1, exp_multiplier=1,
+                 pool=None, rng=None, walkability=None):
+        """pool/rng/walkability: 后台准备关卡时传入新的数据池、准备线程的随机数和快照的可通行表（默认用世界的）"""
+        self.world = world
+        self.pool = world.monster_pool if pool is None else pool  # 后台准备关卡时放进新的数据池
+        self.slot = self.pool.allocate(self)
+        self.x = x
+        self.y = y
+        self.name = name
+        self.hp = int(hp * 1.5)  # 增加50%的生命值
+        self.max_hp = int(hp * 1.5)
+        self.attack = int(attack * 1.3)  # 增加30%的攻击力
+        self.defense = int(defense * 1.2)  # 增加20%的防御力
+        self.is_alive = True
+        self.size = int((world.cell_size - 10) * size_multiplier)  # Boss会更大
+        self.walkability = (world.walkability if walkability is None else walkability)(self.size // 2)  # 本体型的可通行表
+        self.pool.prev_x[self.slot] = x  # 新病毒没有上一tick的位置，插值时原地绘制
+        self.pool.prev_y[self.slot] = y
+        self.pool.radius[self.slot] = self.size // 2
+        self.pool.type_id[self.slot] = MONSTER_TYPE_IDS.get(name, -1)
+        self.color = color
+        self.speed = 7 if size_multiplier == 1 else 4  # 提高移动速度
+        self.move_cooldown = 0
+        rng = world.rng if rng is None else rng  # 后台准备关卡时用准备线程自己的随机数
+        self.move_direction = rng.choice([(1,0), (-1,0), (0,1), (0,-1)])
+        self.exp_reward = int((hp // 3) * exp_multiplier)  # Boss给更多免疫力
+        self.is_boss = size_multiplier > 1  # 标记是否为Boss
+
+        # 添加攻击相关属性
+        self.attack_cooldown = 0  # 攻击冷却时间
+        self.attack_range = MONSTER_ATTACK_RANGE  # 攻击范围（1格距离，从2格减少到1格）
+        self.attack_cooldown_max = 100  # 攻击冷却时间（1.6秒）
+
+    # ---- 以下属性直接读写数据池中的数组 ----
+    @property
+    def x(self):
+        return self.pool.x[self.slot]
+
+    @x.setter
+    def x(self, value):
+        self.pool.x[self.slot] = value
+
+    @property
+    def y(self):
+        return self.pool.y[self.slot]
+
+    @y.setter
+    def y(self, value):
+        self.pool.y[self.slot] = value
+
+    @property
+    def hp(self):
+        return int(self.pool.hp[self.slot])
+
+    @hp.setter
+    def hp(self, value):
+        self.pool.hp[self.slot] = value
+
+    @property
+    def max_hp(self):
+        return int(self.pool.max_hp[self.slot])
+
+    @max_hp.setter
+    def max_hp(self, value):
+        self.pool.max_hp[self.slot] = value
+
+    @property
+    def speed(self):
+        return float(self.pool.speed[self.slot])
+
+    @speed.setter
+    def speed(self, value):
+        self.pool.speed[self.slot] = value
+
+    @property
+    def is_alive(self):
+        return bool(self.pool.alive[self.slot])
+
+    @is_alive.setter
+    def is_alive(self, value):
+        self.pool.alive[self.slot] = value
+
+    @property
+    def move_cooldown(self):
+        return int(self.pool.move_cooldown[self.slot])
+
+    @move_cooldown.setter
+    def move_cooldown(self, value):
+        self.pool.move_cooldown[self.slot] = value
+
+    @property
+    def attack_cooldown(self):
+        return int(self.pool.attack_cooldown[self.slot])
+
+    @attack_cooldown.setter
+    def attack_cooldown(self, value):
+        self.pool.attack_cooldown[self.slot] = value
+
+    @property
+    def move_direction(self):
+        return (int(self.pool.dir_x[self.slot]), int(self.pool.dir_y[self.slot]))
+
+    @move_direction.setter
+    def move_direction(self, value):
+        self.pool.dir_x[self.slot] = value[0]
+        self.pool.dir_y[self.slot] = value[1]
+
+    def release(self):
+        """病毒移出游戏时归还数据池槽位"""
+        self.pool.release(self.slot)
+
+    def draw_position(self, alpha=1.0):
+        """绘制位置：上一tick与当前tick之间按alpha插值"""
+        return self.pool.interpolated_position(self.slot, alpha)
+
+    def draw(self, window, camera_x, camera_y, alpha=1.0):
+        """简化绘制（无贴图）：带颜色的圆和血条，main.py中的Monster会覆盖它"""
+        if not self.is_alive:
+            return
+        draw_x, draw_y = self.draw_position(alpha)
+        screen_x = int(draw_x - camera_x)
+        screen_y = int(draw_y - camera_y)
+        pygame.draw.circle(window, self.color, (screen_x, screen_y), self.size // 2)
+        hp_bar_y = screen_y - self.size // 2 - 8
+        pygame.draw.rect(window, (100, 45, 21), (screen_x - self.size // 2, hp_bar_y, self.size, 4))
+        pygame.draw.rect(window, (0, 255, 0),
+                         (screen_x - self.size // 2, hp_bar_y, int(self.size * self.hp / self.max_hp), 4))
+
+    def check_collision(self, player_x, player_y, player_size):
+        if not self.is_alive:
+            return False
+        distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
+        return distance < (player_size + self.size) // 2
+
+    def can_attack_player(self, player_x, player_y):
+        """检查是否在攻击范围内且冷却时间结束"""
+        if not self.is_alive or self.attack_cooldown > 0:
+            return False
+        distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
+        return distance <= self.attack_range
+
+    def attack_player(self, player_x, player_y):
+        """攻击玩家并设置冷却时间"""
+        if self.can_attack_player(player_x, player_y):
+            self.attack_cooldown = self.attack_cooldown_max
+            return True
+        return False
+
+    def update_attack_cooldown(self):
+        """更新攻击冷却时间"""
+        if self.attack_cooldown > 0:
+            self.attack_cooldown -= 1
+
+    def take_damage(self, damage):
+        actual_damage = max(damage - self.defense, 0)
+        self.hp = max(self.hp - actual_damage, 0)
+        if self.hp <= 0:
+            self.is_alive = False
+
+    def attack_target(self, target):
+        if self.is_alive:
+            target.take_damage(self.attack)
+
+    def heal(self, amount):
+        if self.is_alive:
+            self.hp = min(self.hp + amount, self.max_hp)
+
+    def __str__(self):
+        return f"{self.name} (HP: {self.hp}/{self.max_hp})"
+
+    def check_valid_position(self, x, y, maze=None):
+        """整个身体（含跨多格的Boss）不碰墙且在迷宫内；查预先算好的可通行表，maze参数不再使用"""
+        return self.walkability.is_valid(x, y)
+
+    def _clamp_to_world(self, x, y, buffer):
+        return (max(buffer, min(self.world.width - buffer, x)),
+                max(buffer, min(self.world.height - buffer, y)))
+
+    def move_towards_player(self, player_x, player_y, maze=None, always_move=True):
+        """
+        病毒移动逻辑
+        always_move: 是否始终移动（即使不在玩家视野内也自由游荡）
+        """
+        if not self.is_alive:
+            return
+
+        # 优化：提前执行移动冷却检查
+        if self.move_cooldown > 0:
+            self.move_cooldown -= 1
+            return
+
+        # 计算到玩家的距离（使用整数运算优化）
+        dx_raw = player_x - self.x
+        dy_raw = player_y - self.y
+        distance_squared = dx_raw * dx_raw + dy_raw * dy_raw
+        tracking_range_squared = MONSTER_TRACKING_RANGE * MONSTER_TRACKING_RANGE  # 增加追踪范围到8格
+
+        following_flow = False
+        # 在追踪范围内才会自动靠近玩家
+        if distance_squared < tracking_range_squared:
+            # 优先沿流场走迷宫最短路径（朝下一格中心移动），与玩家同格或不可达时才直线追踪
+            flow_field = self.world.flow_field
+            if flow_field.distance_at(self.x, self.y) > 0:
+                target_x, target_y = flow_field.next_step(self.x, self.y)
+                dx_raw = target_x - self.x
+                dy_raw = target_y - self.y
+                following_flow = True
+
+            # 使用快速距离近似避免开方运算
+            target_distance_squared = dx_raw * dx_raw + dy_raw * dy_raw
+            distance = (target_distance_squared) ** 0.5 if target_distance_squared > 0 else 0
+
+            if distance > 0:
+                # 沿流场走时不越过下一格中心，避免拐角处冲进墙里
+                step = min(self.speed, distance) if following_flow else self.speed
+                dx = (dx_raw / distance) * step
+                dy = (dy_raw / distance) * step
+            else:
+                dx = dy = 0
+        else:
+            # 自由游荡模式：即使不在玩家附近也会移动
+            # 增加方向改变频率，让病毒更活跃
+            if self.world.rng.random() < 0.05:  # 5%的概率改变方向
+                self.move_direction = self.world.rng.choice([(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)])
+
+            dx = self.move_direction[0] * self.speed * 0.6  # 游荡时速度稍慢
+            dy = self.move_direction[1] * self.speed * 0.6
+
+        # 边界检查优化，增加边界缓冲区
+        buffer = self.size // 2 + 5  # 增加5像素缓冲区
+        next_x, next_y = self._clamp_to_world(self.x + dx, self.y + dy, buffer)
+
+        # 迷宫碰撞检测优化 - 改进的防卡墙系统
+        if maze is not None:
+            if self.check_valid_position(next_x, next_y, maze):
+                self.x = next_x
+                self.y = next_y
+            else:
+                self.resolve_blocked_move(next_x, next_y, player_x, player_y, maze,
+                                          distance_squared < tracking_range_squared, following_flow)
+        else:
+            self.x = next_x
+            self.y = next_y
+
+        # 同步空间索引（只有跨格时才真正换桶）
+        self.world.monster_grid.update(self)
+
+        # 统一的冷却管理，防止卡墙
+        self.move_cooldown = 2  # 减少冷却时间提高响应性
+
+    def resolve_blocked_move(self, next_x, next_y, player_x, player_y, maze, chasing, following_flow):
+        """目标位置被墙挡住时的避障逻辑（逐个病毒执行，批量移动后也走这里）"""
+        # 改进的避障逻辑 - 多方向尝试
+        moved = False
+
+        # 首先尝试分别在x和y方向移动
+        if self.check_valid_position(next_x, self.y, maze):
+            self.x = next_x
+            moved = True
+        elif self.check_valid_position(self.x, next_y, maze):
+            self.y = next_y
+            moved = True
+
+        # 如果单方向移动也失败，使用智能寻路（沿流场时直接走逃脱逻辑）
+        if not moved and chasing and not following_flow:
+            self._smart_pathfinding(player_x, player_y, maze)
+            moved = True
+
+        # 如果仍然无法移动，执行防卡墙逃脱机制
+        if not moved:
+            self._escape_from_wall(maze)
+
+    def _smart_pathfinding(self, player_x, player_y, maze):
+        """优化的智能寻路算法"""
+        player_dx = player_x - self.x
+        player_dy = player_y - self.y
+
+        # 增加更多的寻路方向选择
+        if abs(player_dx) > abs(player_dy):
+            # 优先垂直绕行
+            directions = [(0, -self.speed), (0, self.speed), (-self.speed//2, -self.speed//2), (self.speed//2, self.speed//2)]
+        else:
+            # 优先水平绕行
+            directions = [(-self.speed, 0), (self.speed, 0), (-self.speed//2, -self.speed//2), (self.speed//2, self.speed//2)]
+
+        # 添加斜向移动尝试
+        diagonal_directions = [
+            (-self.speed//2, -self.speed//2), (self.speed//2, -self.speed//2),
+            (-self.speed//2, self.speed//2), (self.speed//2, self.speed//2)
+        ]
+        directions.extend(diagonal_directions)
+
+        for dx, dy in directions:
+            buffer = self.size // 2 + 5
+            test_x, test_y = self._clamp_to_world(self.x + dx, self.y + dy, buffer)
+
+            if self.check_valid_position(test_x, test_y, maze):
+                self.x = test_x
+                self.y = test_y
+                return
+
+        # 如果所有方向都被阻挡，强制改变方向并减少移动步长
+        self.move_direction = self.world.rng.choice([(1,0), (-1,0), (0,1), (0,-1)])
+        self._escape_from_wall(maze)
+
+    def _escape_from_wall(self, maze):
+        """防卡墙逃脱机制"""
+        # 尝试8个方向的小步移动来逃脱卡墙
+        escape_directions = [
+            (1, 0), (-1, 0), (0, 1), (0, -1),
+            (1, 1), (-1, -1), (1, -1), (-1, 1)
+        ]
+
+        escape_distance = self.speed // 3  # 使用较小的逃脱距离
+
+        for dx, dy in escape_directions:
+            # 确保不越界
+            buffer = self.size // 2 + 10  # 增加更大的缓冲区
+            escape_x, escape_y = self._clamp_to_world(self.x + dx * escape_distance,
+                                                      self.y + dy * escape_distance, buffer)
+
+            if self.check_valid_position(escape_x, escape_y, maze):
+                self.x = escape_x
+                self.y = escape_y
+                # 重置移动方向
+                self.move_direction = (dx, dy)
+                return
+
+        # 如果仍然无法逃脱，强制传送到最近的有效位置
+        self._force_teleport_to_valid_position(maze)
+
+    def _force_teleport_to_valid_position(self, maze):
+        """强制传送到最近的有效位置（最后手段）"""
+        # 在周围寻找最近的有效位置
+        cell_size = self.world.cell_size
+        search_radius = cell_size
+        max_radius = cell_size * 3
+
+        while search_radius <= max_radius:
+            for angle in range(0, 360, 45):  # 每45度检查一次
+                radian = math.radians(angle)
+                # 确保不越界
+                buffer = self.size // 2 + 10
+                test_x, test_y = self._clamp_to_world(self.x + math.cos(radian) * search_radius,
+                                                      self.y + math.sin(radian) * search_radius, buffer)
+
+                if self.check_valid_position(test_x, test_y, maze):
+                    self.x = test_x
+                    self.y = test_y
+                    return
+
+            search_radius += cell_size // 2
+
+
+class SpawnSnapshot:
+    """
+    后台准备关卡要读的世界状态的副本：请求准备时在主线程调用GameWorld.spawn_snapshot()生成，
+    之后后台线程只读写这份副本（可通行表缓存、出生点分配器、随机种子），不碰世界本身
+    """
+    def __init__(self, world):
+        self.walls = world.walls  # 迷宫不变，只读
+        self.cell_size = world.cell_size
+        self.walkability_grids = dict(world.walkability_grids)  # 已算好的表共用，之后新增的各存各的
+        self.seed = world.rng.getrandbits(64)  # 从世界的随机数取种子，同一种子下后台生成的结果可复现
+        self.spawner = world.spawner.snapshot(self.walkability, np.random.default_rng(self.seed))
+
+    def walkability(self, radius, outside_blocked=True):
+        key = (radius, outside_blocked)
+        grid = self.walkability_grids.get(key)
+        if grid is None:
+            grid = WalkabilityGrid(self.walls, self.cell_size, radius, outside_blocked)
+            self.walkability_grids[key] = grid
+        return grid
+
+
+class MonsterSet:
+    """一整批病毒连同它们专用的数据池和空间索引（GameWorld.prepare_monsters的结果）"""
+    def __init__(self, pool, grid, monsters):
+        self.pool = pool
+        self.grid = grid
+        self.monsters = monsters
+
+
+class HealthPack:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.size = CELL_SIZE - 15
+        self.active = True
+
+    def draw(self, window, camera_x, camera_y):
+        if self.active:
+            # 绘制十字形状的回血包
+            center_x = self.x - camera_x
+            center_y = self.y - camera_y
+            rect_width = self.size // 3
+            rect_height = self.size
+
+            # 绘制垂直部分
+            pygame.draw.rect(window, PINK,
+                           (center_x - rect_width//2,
+                            center_y - rect_height//2,
+                            rect_width, rect_height))
+
+            # 绘制水平部分
+            pygame.draw.rect(window, PINK,
+                           (center_x - rect_height//2,
+                            center_y - rect_width//2,
+                            rect_height, rect_width))
+
+    def check_collision(self, player_x, player_y, player_size):
+        if not self.active:
+            return False
+        distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
+        return distance < (player_size + self.size) // 2
+
+
+class FixedTimestep:
+    """
+    固定步长累加器：按真实经过时间累积，每满一个tick的时长就推进一次模拟，
+    模拟速度与绘制帧率无关；alpha为剩余时间占一个tick的比例，供绘制插值
+    """
+    def __init__(self, tick_rate=60, max_steps=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_steps = max_steps  # 单帧最多补的tick数，机器过慢时放慢游戏，避免越补越慢
+        self.accumulator = 0.0
+
+    def advance(self, frame_seconds):
+        """累积一帧的耗时，返回本帧需要推进的tick数"""
+        self.accumulator += frame_seconds
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0  # 丢弃积压的时间
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
+
+
+class GameWorld:
+    def __init__(self, maze_width=MAZE_WIDTH, maze_height=MAZE_HEIGHT, cell_size=CELL_SIZE,
+                 view_width=1000, view_height=900, monster_class=MonsterEntity, seed=None):
+        """
+        maze_width/maze_height: 迷宫格子数；view_width/view_height: 视野（窗口）大小，决定哪些病毒做迷宫碰撞
+        monster_class: 生成病毒时使用的类（main.py传入带贴图绘制的Monster）
+        seed: 随机种子，固定后整局模拟可复现（None时从random模块取一个种子，不改动全局随机数状态）
+        """
+        # 世界自己的随机数：迷宫生成、出生点、病毒类型和游荡方向都从这里取
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.maze_width = maze_width
+        self.maze_height = maze_height
+        self.cell_size = cell_size
+        self.width = maze_width * cell_size
+        self.height = maze_height * cell_size
+        self.view_width = view_width
+        self.view_height = view_height
+        self.monster_class = monster_class
+
+        # 生成迷宫
+        self.maze = generate_maze(maze_width, maze_height, self.rng)
+        # 病毒追踪用的流场（玩家跨格时增量重算）
+        self.flow_field = FlowField(self.maze, cell_size)
+        # 迷宫墙壁的NumPy布尔表
+        self.walls = np.array(self.maze, dtype=bool)
+        # 各实体半径的可通行表（配置空间），迷宫生成后为已知体型预先计算
+        self.walkability_grids = {}
+        for radius in ENTITY_RADII:
+            self.walkability(radius)
+        self.walkability(PLAYER_SIZE // 2, outside_blocked=False)
+        # 出生点分配（病毒、回血包、玩家重生点）
+        self.spawner = Spawner(self.walkability, maze_width, maze_height, cell_size, self.np_rng)
+        self.maze_renderer = None  # 迷宫分块渲染器（第一次绘制时才创建）
+
+        # 病毒：数据池 + 空间索引 + 对象列表
+        self.monster_grid = SpatialHashGrid(cell_size)
+        self.monster_pool = MonsterPool(cell_size, self.width, self.height, MONSTER_TRACKING_RANGE)
+        self.monster_pool.rng = self.np_rng
+        self.monsters = []
+        self.monster_spawn_timer = 0
+        # 按距离分级的病毒更新调度
+        self.monster_lod = MonsterLOD(cell_size, MONSTER_LOD_MID_RANGE, MONSTER_LOD_MID_INTERVAL,
+                                      MONSTER_LOD_FAR_INTERVAL, MONSTER_LOD_TICK_BUDGET)
+        # 逐个病毒的AI任务按时间预算轮转执行
+        self.ai_scheduler = AIScheduler(MONSTER_AI_BUDGET_MS)
+        # 病毒进入/移出游戏时的回调（如给Boss挂光源、病毒死亡时释放光源），在主线程调用
+        self.monsters_added_listeners = []  # 参数为新加入的病毒列表
+        self.monster_removed_listeners = []  # 参数为移出的病毒
+
+        # 子弹缓冲区（固定容量，数组存放位置/速度/伤害/寿命）
+        self.bullets = BulletPool(4096)
+
+        self.health_packs = []
+        self.health_pack_spawn_timer = 0
+
+        # 无窗口模拟使用的玩家状态（main.py的交互游戏自己维护玩家全局变量）
+        self.player_x = cell_size * 1.5
+        self.player_y = cell_size * 1.5
+        self.prev_player_x = self.player_x  # 上一tick的位置（绘制插值用）
+        self.prev_player_y = self.player_y
+        self.player_velocity_x = 0
+        self.player_velocity_y = 0
+        self.player_size = cell_size - 10
+        self.player_hp = 100
+        self.player_max_hp = 100
+        self.player_attack = 28
+        self.player_defense = 5
+        self.player_fire_cooldown = 0
+
+        # 统计
+        self.tick = 0
+        self.kills = 0
+        self.deaths = 0
+
+    # ---- 生成 ----
+    def walkability(self, radius, outside_blocked=True):
+        """取（必要时生成）某一半径的可通行表"""
+        key = (radius, outside_blocked)
+        grid = self.walkability_grids.get(key)
+        if grid is None:
+            grid = WalkabilityGrid(self.walls, self.cell_size, radius, outside_blocked)
+            self.walkability_grids[key] = grid
+        return grid
+
+    def check_collision_with_maze(self, x, y, size):
+        """实体身体覆盖的任一格是墙即为碰撞（迷宫外不算碰撞）"""
+        return not self.walkability(size // 2, outside_blocked=False).is_valid(x, y)
+
+    def generate_monsters(self, num_monsters, avoid=None, pool=None, rng=None, snapshot=None):
+        """
+        生成一批病毒（不加入世界，调用方用add_monsters或replace_monsters加入）
+        avoid: 需要保持间距的已有病毒（补充刷新时传入场上的病毒）
+        pool: 病毒放进的数据池（默认为世界当前的数据池）
+        rng: random.Random实例，后台线程用独立的随机数（默认用世界的随机数）
+        snapshot: SpawnSnapshot，后台线程用快照里的出生点分配器和可通行表（默认用世界的）
+        """
+        cell_size = self.cell_size
+        if rng is None:
+            rng = self.rng
+        spawner = self.spawner if snapshot is None else snapshot.spawner
+        walkability = None if snapshot is None else snapshot.walkability
+        # 先决定类型，再一次性分配出生点：(类型, 体型倍率, 经验倍率)
+        choices = []
+        # 有10%的概率生成Boss
+        if rng.random() < 0.1:
+            boss_type = rng.choice(BOSS_TYPES)
+            choices.append((boss_type, boss_type["size_multiplier"], boss_type["exp_multiplier"]))
+        # 生成普通怪物
+        for _ in range(num_monsters):
+            choices.append((rng.choice(MONSTER_TYPES), 1, 1))
+        # 确保生成的怪物数量不超过最大数量
+        choices = choices[:MAX_MONSTERS]
+
+        radii = [int((cell_size - 10) * size_multiplier) // 2 for _, size_multiplier, _ in choices]
+        occupied = [(monster.x, monster.y, monster.size // 2) for monster in avoid or ()]
+        positions = spawner.place(radii, spacing=20, avoid=occupied)
+
+        monsters = []
+        for (monster_type, size_multiplier, exp_multiplier), (x, y) in zip(choices, positions):
+            monsters.append(self.monster_class(
+                self, x, y,
+                monster_type["name"],
+                monster_type["hp"],
+                monster_type["attack"],
+                monster_type["defense"],
+                monster_type["color"],
+                size_multiplier=size_multiplier,
+                exp_multiplier=exp_multiplier,
+                pool=pool,
+                rng=rng,
+                walkability=walkability
+            ))
+        return monsters
+
+    def spawn_snapshot(self):
+        """主线程调用：复制一份后台准备关卡要用的出生点数据（见SpawnSnapshot）"""
+        return SpawnSnapshot(self)
+
+    def prepare_monsters(self, num_monsters, snapshot=None):
+        """
+        在独立的数据池和空间索引里生成一整批病毒，之后用install_monsters整体换入。
+        传入主线程生成的snapshot时可在后台线程运行：只读写快照和新建的对象，不碰世界当前的状态
+        """
+        if snapshot is None:
+            snapshot = self.spawn_snapshot()
+        rng = random.Random(snapshot.seed)
+        pool = MonsterPool(self.cell_size, self.width, self.height, MONSTER_TRACKING_RANGE)
+        pool.rng = np.random.default_rng(rng.getrandbits(32))
+        monsters = self.generate_monsters(num_monsters, pool=pool, rng=rng, snapshot=snapshot)
+        grid = SpatialHashGrid(self.cell_size)
+        grid.rebuild(monsters)
+        return MonsterSet(pool, grid, monsters)
+
+    def install_monsters(self, monster_set):
+        """换入prepare_monsters准备好的病毒：只替换引用，旧病毒随旧数据池一起丢弃"""
+        self._notify_removed(self.monsters)
+        self.monster_pool = monster_set.pool
+        self.monster_grid = monster_set.grid
+        self.monsters = monster_set.monsters
+        self.ai_scheduler.clear()
+        self._notify_added(self.monsters)
+
+    def _notify_added(self, monsters):
+        for listener in self.monsters_added_listeners:
+            listener(monsters)
+
+    def _notify_removed(self, monsters):
+        for listener in self.monster_removed_listeners:
+            for monster in monsters:
+                listener(monster)
+
+    def add_monsters(self, monsters):
+        self.monsters.extend(monsters)
+        for monster in monsters:
+            self.monster_grid.insert(monster)
+        self._notify_added(monsters)
+
+    def replace_monsters(self, monsters):
+        """整批替换病毒（如切换关卡），旧病毒归还槽位"""
+        self._notify_removed(self.monsters)
+        for monster in self.monsters:
+            monster.release()
+        self.ai_scheduler.clear()
+        self.monsters = list(monsters)
+        self.monster_grid.rebuild(self.monsters)
+        self._notify_added(self.monsters)
+
+    def generate_health_packs(self, num_packs):
+        """在不靠墙的空地上生成回血包，彼此（以及与场上已有的回血包）至少隔开一格"""
+        radius = (CELL_SIZE - 15) // 2
+        occupied = [(pack.x, pack.y, radius) for pack in self.health_packs]
+        positions = self.spawner.place([radius] * num_packs, spacing=self.cell_size, avoid=occupied)
+        return [HealthPack(x, y) for x, y in positions]
+
+    def populate(self, num_monsters=60, num_health_packs=1):
+        """开局：生成初始病毒和回血包"""
+        self.replace_monsters(self.generate_monsters(num_monsters))
+        self.health_packs = self.generate_health_packs(num_health_packs)
+
+    def find_safe_spawn_position(self, start_x, start_y, size):
+        """寻找一个不在墙内的安全位置：起始位置可用就直接用，否则取最近的可站立格子中心"""
+        # 首先检查起始位置是否安全
+        if not self.check_collision_with_maze(start_x, start_y, size):
+            return start_x, start_y
+        return self.spawner.nearest_free(start_x, start_y, size // 2)
+
+    # ---- 每帧更新的各个阶段（main.py的主循环也逐个调用） ----
+    def update_monsters(self, player_x, player_y, camera_x, camera_y):
+        """病毒移动：按距离分级更新（见monster_lod.py）；之后清理死亡病毒"""
+        # 玩家换格时才重算流场，所有追踪中的病毒共享
+        self.flow_field.update(player_x, player_y)
+
+        monster_pool = self.monster_pool
+        view_rect = (camera_x, camera_y, camera_x + self.view_width, camera_y + self.view_height)
+        moved_slots = self.monster_lod.update(monster_pool, player_x, player_y, view_rect,
+                                              self.walkability, self.flow_field)
+
+        # 被墙挡住的病毒：避障兜底提交给AI调度器，按预算轮转执行，超出预算的顺延到后面的帧
+        ai_scheduler = self.ai_scheduler
+        # 任务只记录提交时的位置和这一步的位移，执行时从病毒当前位置重建目标点
+        for slot in monster_pool.blocked_slots.tolist():
+            monster = monster_pool.views[slot]
+            x = float(monster_pool.x[slot])
+            y = float(monster_pool.y[slot])
+            ai_scheduler.submit(monster, self._resolve_blocked_move, monster, x, y,
+                                float(monster_pool.next_x[slot]) - x, float(monster_pool.next_y[slot]) - y,
+                                player_x, player_y, bool(monster_pool.chasing[slot]),
+                                bool(monster_pool.following_flow[slot]))
+        ai_scheduler.run()
+
+        # 只有跨格的病毒才需要同步空间索引
+        for slot in monster_pool.cell_changed(moved_slots).tolist():
+            self.monster_grid.update(monster_pool.views[slot])
+
+        monster_pool.update_attack_cooldowns()
+        self.remove_dead_monsters()
+
+    def _resolve_blocked_move(self, monster, start_x, start_y, dx, dy, player_x, player_y, chasing, following_flow):
+        """
+        AI调度器执行的避障任务；任务可能被顺延，执行时病毒已死亡或已被移出则跳过。
+        顺延期间病毒已经移动过（分级更新或后面的帧走通了）时，这一步已被后来的移动取代，也跳过，
+        避免把病毒拉回旧的目标点或多走一步
+        """
+        if not monster.is_alive or self.monster_pool.views[monster.slot] is not monster:
+            return
+        if monster.x != start_x or monster.y != start_y:
+            return
+        monster.resolve_blocked_move(monster.x + dx, monster.y + dy, player_x, player_y, self.maze,
+                                     chasing, following_flow)
+        self.monster_grid.update(monster)
+
+    def remove_dead_monsters(self):
+        """清理死亡病毒，归还索引和数据池槽位"""
+        alive_monsters = []
+        removed = []
+        for monster in self.monsters:
+            if monster.is_alive:
+                alive_monsters.append(monster)
+            else:
+                self.monster_grid.remove(monster)
+                self.ai_scheduler.discard(monster)
+                monster.release()
+                removed.append(monster)
+        self.monsters = alive_monsters
+        if removed:
+            self._notify_removed(removed)
+
+    def update_spawning(self):
+        """病毒数量低于下限时按冷却补充"""
+        if len(self.monsters) < MIN_MONSTERS and self.monster_spawn_timer <= 0:
+            # 计算需刷新的怪物数量
+            spawn_count = min(MAX_MONSTERS - len(self.monsters),
+                              self.rng.randint(1, 2))  # 每次新1-2个怪物
+            self.add_monsters(self.generate_monsters(spawn_count, avoid=self.monsters))
+            self.monster_spawn_timer = MONSTER_SPAWN_COOLDOWN  # 刷新冷却时间
+
+        # 更新刷新计时器
+        if self.monster_spawn_timer > 0:
+            self.monster_spawn_timer -= 1
+
+    def monster_attacks(self, player_x, player_y):
+        """返回本帧对玩家发起攻击的病毒（已进入冷却）"""
+        attackers = []
+        for monster in self.monster_grid.query_radius(player_x, player_y, MONSTER_ATTACK_RANGE):
+            if monster.is_alive and monster.attack_player(player_x, player_y):
+                attackers.append(monster)
+        return attackers
+
+    def update_health_packs(self, player_x, player_y, player_size):
+        """拾取和刷新回血包，返回本帧拾取的数量"""
+        picked = 0
+        for health_pack in self.health_packs:
+            if health_pack.active and health_pack.check_collision(player_x, player_y, player_size):
+                health_pack.active = False
+                picked += 1
+
+        # 清理已使用的回血包
+        self.health_packs = [hp for hp in self.health_packs if hp.active]
+
+        # 处理回血包刷新
+        if len(self.health_packs) < MAX_HEALTH_PACKS and self.health_pack_spawn_timer <= 0:
+            spawn_count = min(MAX_HEALTH_PACKS - len(self.health_packs),
+                              self.rng.randint(1, 2))  # 每次刷新1-2个回血包
+            self.health_packs.extend(self.generate_health_packs(spawn_count))
+            self.health_pack_spawn_timer = HEALTH_PACK_SPAWN_COOLDOWN
+
+        # 更新回血包刷新计时器
+        if self.health_pack_spawn_timer > 0:
+            self.health_pack_spawn_timer -= 1
+        return picked
+
+    def update_bullets(self):
+        """
+        子弹整批移动并检测命中，命中结果按子弹顺序逐个结算伤害
+        返回[(病毒, 是否被击杀), ...]，特效和经验由调用方处理
+        """
+        bullets = self.bullets
+        bullets.update(self.width, self.height)
+        hit_bullets, hit_slots = bullets.collide(self.monster_pool)
+        hits = []
+        spent_bullets = []
+        last_bullet = -1
+        for bullet_index, slot in zip(hit_bullets.tolist(), hit_slots.tolist()):
+            if bullet_index == last_bullet:
+                continue  # 这颗子弹已经命中了槽位更小的病毒
+            monster = self.monster_pool.views[slot]
+            if not monster.is_alive:
+                continue  # 本帧已被前面的子弹消灭，换下一个重叠的病毒；都死了子弹继续飞行
+            last_bullet = bullet_index
+            monster.take_damage(int(bullets.damage[bullet_index]))
+            spent_bullets.append(bullet_index)
+            hits.append((monster, not monster.is_alive))
+        bullets.remove(spent_bullets)
+        return hits
+
+    # ---- 无窗口模拟 ----
+    def snapshot_positions(self):
+        """每个tick开始时记录玩家和病毒的位置，绘制时在两次tick之间插值"""
+        self.prev_player_x = self.player_x
+        self.prev_player_y = self.player_y
+        self.monster_pool.snapshot_positions()
+
+    def player_draw_position(self, alpha=1.0):
+        return (self.prev_player_x + (self.player_x - self.prev_player_x) * alpha,
+                self.prev_player_y + (self.player_y - self.prev_player_y) * alpha)
+
+    def camera_position(self, alpha=1.0):
+        """以玩家（插值后）为中心的摄像机位置（限制在游戏边界内）"""
+        player_x, player_y = self.player_draw_position(alpha)
+        camera_x = player_x - self.view_width // 2
+        camera_y = player_y - self.view_height // 2
+        camera_x = max(-self.view_width // 2, min(self.width - self.view_width // 2, camera_x))
+        camera_y = max(-self.view_height // 2, min(self.height - self.view_height // 2, camera_y))
+        return camera_x, camera_y
+
+    def _move_player(self, move_x, move_y):
+        """加速度 + 摩擦力移动，撞墙时尝试沿单轴滑动"""
+        self.player_velocity_x = (self.player_velocity_x + move_x * PLAYER_ACCELERATION) * PLAYER_FRICTION
+        self.player_velocity_y = (self.player_velocity_y + move_y * PLAYER_ACCELERATION) * PLAYER_FRICTION
+        speed = (self.player_velocity_x ** 2 + self.player_velocity_y ** 2) ** 0.5
+        if speed > PLAYER_MAX_SPEED:
+            self.player_velocity_x = self.player_velocity_x / speed * PLAYER_MAX_SPEED
+            self.player_velocity_y = self.player_velocity_y / speed * PLAYER_MAX_SPEED
+
+        size = self.player_size
+        next_x = self.player_x + self.player_velocity_x
+        next_y = self.player_y + self.player_velocity_y
+        if not self.check_collision_with_maze(next_x, next_y, size):
+            self.player_x = next_x
+            self.player_y = next_y
+        else:
+            if not self.check_collision_with_maze(next_x, self.player_y, size):
+                self.player_x = next_x
+            elif not self.check_collision_with_maze(self.player_x, next_y, size):
+                self.player_y = next_y
+            self.player_velocity_x = 0
+            self.player_velocity_y = 0
+        self.player_x = max(size // 2, min(self.width - size // 2, self.player_x))
+        self.player_y = max(size // 2, min(self.height - size // 2, self.player_y))
+
+    def _respawn_player(self):
+        self.deaths += 1
+        self.player_x, self.player_y = self.find_safe_spawn_position(self.width // 2, self.height // 2,
+                                                                     self.player_size)
+        self.player_hp = self.player_max_hp
+
+    def step(self, inputs=None):
+        """
+        推进一帧模拟（不做任何绘制）
+        inputs: 字典，move_x/move_y为-1~1的移动方向，fire为是否射击，aim_angle为射击方向（弧度）
+        """
+        inputs = inputs or {}
+        self.snapshot_positions()
+        self._move_player(inputs.get('move_x', 0), inputs.get('move_y', 0))
+        camera_x, camera_y = self.camera_position()
+
+        self.update_monsters(self.player_x, self.player_y, camera_x, camera_y)
+        self.update_spawning()
+
+        for monster in self.monster_attacks(self.player_x, self.player_y):
+            self.player_hp -= max(monster.attack - self.player_defense, 0)
+        if self.player_hp <= 0:
+            self._respawn_player()
+
+        picked = self.update_health_packs(self.player_x, self.player_y, self.player_size)
+        if picked:
+            self.player_hp = min(self.player_hp + HEALTH_RESTORE_AMOUNT * picked, self.player_max_hp)
+
+        if self.player_fire_cooldown > 0:
+            self.player_fire_cooldown -= 1
+        if inputs.get('fire') and self.player_fire_cooldown <= 0:
+            angle = inputs.get('aim_angle', 0.0)
+            self.bullets.spawn_batch(self.player_x, self.player_y,
+                                     math.cos(angle) * PLAYER_BULLET_SPEED, math.sin(angle) * PLAYER_BULLET_SPEED,
+                                     self.player_attack, PLAYER_BULLET_LIFETIME)
+            self.player_fire_cooldown = PLAYER_FIRE_COOLDOWN
+
+        for monster, killed in self.update_bullets():
+            if killed:
+                self.kills += 1
+        self.tick += 1
+
+    # ---- 绘制 ----
+    def get_maze_renderer(self):
+        if self.maze_renderer is None:
+            self.maze_renderer = MazeChunkRenderer(self.maze, self.cell_size, create_wall_texture(self.cell_size))
+        return self.maze_renderer
+
+    def render(self, surface, alpha=1.0):
+        """
+        把当前世界状态画到surface上（不修改任何模拟状态）
+        alpha: 上一tick到当前tick之间的插值比例，配合FixedTimestep使用
+        """
+        camera_x, camera_y = self.camera_position(alpha)
+        surface.fill((30, 30, 30))
+        self.get_maze_renderer().draw(surface, camera_x, camera_y)
+        view_right = camera_x + surface.get_width()
+        view_bottom = camera_y + surface.get_height()
+        for monster in self.monster_grid.query_rect(camera_x - MAX_MONSTER_RADIUS, camera_y - MAX_MONSTER_RADIUS,
+                                                    view_right - camera_x + MAX_MONSTER_RADIUS * 2,
+                                                    view_bottom - camera_y + MAX_MONSTER_RADIUS * 2):
+            monster.draw(surface, camera_x, camera_y, alpha)
+        for health_pack in self.health_packs:
+            health_pack.draw(surface, camera_x, camera_y)
+        self.bullets.draw(surface, camera_x, camera_y, alpha)
+        player_x, player_y = self.player_draw_position(alpha)
+        pygame.draw.circle(surface, (0, 0, 255),
+                           (int(player_x - camera_x), int(player_y - camera_y)), self.player_size // 2)
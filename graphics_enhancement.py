@@ -1,7 +1,9 @@
 import pygame
+import numpy as np
 import random
 import math
 import time
+from collections import OrderedDict
 
 # 导入Player类以便类型检查
 class Player:
@@ -50,218 +52,652 @@ class Player:
         self.flash_cooldown = 0  # 添加闪现技能冷却时间
 
 # 粒子效果系统
+# 粒子数据按字段存放在预分配的NumPy数组里，每个槽位有存活标记，空闲槽位放在一个栈里：
+# 发射时从栈顶一次取走k个槽位，寿命耗尽的粒子在update时整批把槽位压回栈里，分配和回收都是O(k)，
+# 不搬动任何存活粒子；积分用带存活掩码的ufunc在整块容量上原地计算
 class ParticleSystem:
     def __init__(self):
-        self.particles = []
         self.max_particles = 1000  # 限制最大粒子数量
-        self.particle_pool = [{'active': False} for _ in range(self.max_particles)]  # 粒子对象池
-    
+        self.count = 0
+        capacity = self.max_particles
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.velocity_x = np.zeros(capacity, dtype=np.float64)
+        self.velocity_y = np.zeros(capacity, dtype=np.float64)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.max_lifetime = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.float64)
+        self.decay = np.zeros(capacity, dtype=np.float64)
+        self.gravity = np.zeros(capacity, dtype=np.float64)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)  # 透明度由剩余寿命决定，不单独存
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+        self.free_slots = np.arange(capacity - 1, -1, -1, dtype=np.intp)  # 空闲槽位栈，前free_count个有效
+        self.free_count = capacity
+        self.sprite_cache = OrderedDict()  # 预渲染粒子贴图（LRU）
+        self.max_cached_sprites = 512
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.alive[:] = False
+        self.free_slots[:] = np.arange(self.max_particles - 1, -1, -1)
+        self.free_count = self.max_particles
+
+    def _reserve(self, amount):
+        """从空闲栈取amount个槽位，返回槽位数组（可能更短）；超出上限的部分直接丢弃"""
+        amount = max(min(amount, self.free_count), 0)
+        self.free_count -= amount
+        slots = self.free_slots[self.free_count:self.free_count + amount].copy()
+        self.alive[slots] = True
+        self.count += amount
+        return slots
+
     def add_particle(self, x, y, color, velocity_x=0, velocity_y=0, lifetime=30, size=3, decay=0.95, gravity=0.1):
-        # 检查是否达到最大粒子数量
-        if len(self.particles) >= self.max_particles:
+        slots = self._reserve(1)
+        if slots.size == 0:
             return
-            
-        # 从对象池中获取一个未使用的粒子
-        for particle in self.particle_pool:
-            if not particle.get('active', False):
-                particle.update({
-                    'active': True,
-                    'x': x,
-                    'y': y,
-                    'color': color,
-                    'velocity_x': velocity_x,
-                    'velocity_y': velocity_y,
-                    'lifetime': lifetime,
-                    'max_lifetime': lifetime,
-                    'size': size,
-                    'decay': decay,
-                    'gravity': gravity
-                })
-                self.particles.append(particle)
-                break
-    
+        slot = slots[0]
+        self.x[slot] = x
+        self.y[slot] = y
+        self.velocity_x[slot] = velocity_x
+        self.velocity_y[slot] = velocity_y
+        self.lifetime[slot] = lifetime
+        self.max_lifetime[slot] = max(lifetime, 1)
+        self.size[slot] = size
+        self.decay[slot] = decay
+        self.gravity[slot] = gravity
+        self.color[slot] = color[:3]
+
+    @staticmethod
+    def _sample(value, amount, integer=False):
+        """value为数值时原样返回，为(最小, 最大)时按均匀分布抽样"""
+        if isinstance(value, tuple):
+            low, high = value
+            if integer:
+                return np.random.randint(low, high + 1, amount)
+            return np.random.uniform(low, high, amount)
+        return value
+
+    def add_burst(self, count, x, y, color, speed=2, lifetime=30, size=3, decay=0.95, gravity=0.1,
+                  spawn_distance=0, jitter=0):
+        """
+        一次发射count个朝随机方向飞散的粒子
+        speed/lifetime/size/spawn_distance可以是数值，也可以是(最小, 最大)表示随机范围；
+        spawn_distance: 粒子沿飞行方向离中心的初始距离（环形爆发）；jitter: 初始位置的随机偏移
+        """
+        slots = self._reserve(count)
+        amount = slots.size
+        if amount == 0:
+            return
+        angle = np.random.uniform(0, math.pi * 2, amount)
+        cos_angle = np.cos(angle)
+        sin_angle = np.sin(angle)
+        speed = self._sample(speed, amount)
+        distance = self._sample(spawn_distance, amount)
+        x = x + cos_angle * distance
+        y = y + sin_angle * distance
+        if jitter:
+            x += np.random.uniform(-jitter, jitter, amount)
+            y += np.random.uniform(-jitter, jitter, amount)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.velocity_x[slots] = cos_angle * speed
+        self.velocity_y[slots] = sin_angle * speed
+        lifetime = self._sample(lifetime, amount, integer=True)
+        self.lifetime[slots] = lifetime
+        self.max_lifetime[slots] = np.maximum(lifetime, 1)
+        self.size[slots] = self._sample(size, amount)
+        self.decay[slots] = decay
+        self.gravity[slots] = gravity
+        self.color[slots] = color[:3]
+
     def add_explosion(self, x, y, color, particle_count=20, max_speed=3):
-        for _ in range(particle_count):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(1, max_speed)
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
-            lifetime = random.randint(20, 40)
-            size = random.uniform(1, 4)
-            self.add_particle(x, y, color, velocity_x, velocity_y, lifetime, size)
-    
+        self.add_burst(particle_count, x, y, color, speed=(1, max_speed), lifetime=(20, 40), size=(1, 4))
+
     def add_hit_effect(self, x, y, color):
-        for _ in range(10):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(0.5, 2)
-            velocity_x = math.cos(angle) * speed
-            velocity_y = math.sin(angle) * speed
-            lifetime = random.randint(10, 20)
-            size = random.uniform(1, 3)
-            self.add_particle(x, y, color, velocity_x, velocity_y, lifetime, size, 0.9)
-    
+        self.add_burst(10, x, y, color, speed=(0.5, 2), lifetime=(10, 20), size=(1, 3), decay=0.9)
+
     def add_trail(self, x, y, color, direction, speed=1):
-        for _ in range(3):
-            offset_x = random.uniform(-3, 3)
-            offset_y = random.uniform(-3, 3)
-            velocity_x = -math.cos(direction) * speed * random.uniform(0.1, 0.5)
-            velocity_y = -math.sin(direction) * speed * random.uniform(0.1, 0.5)
-            lifetime = random.randint(5, 15)
-            size = random.uniform(1, 2)
-            self.add_particle(x + offset_x, y + offset_y, color, velocity_x, velocity_y, lifetime, size, 0.85)
-    
+        slots = self._reserve(3)
+        amount = slots.size
+        if amount == 0:
+            return
+        self.x[slots] = x + np.random.uniform(-3, 3, amount)
+        self.y[slots] = y + np.random.uniform(-3, 3, amount)
+        self.velocity_x[slots] = -math.cos(direction) * speed * np.random.uniform(0.1, 0.5, amount)
+        self.velocity_y[slots] = -math.sin(direction) * speed * np.random.uniform(0.1, 0.5, amount)
+        lifetime = np.random.randint(5, 16, amount)
+        self.lifetime[slots] = lifetime
+        self.max_lifetime[slots] = lifetime
+        self.size[slots] = np.random.uniform(1, 2, amount)
+        self.decay[slots] = 0.85
+        self.gravity[slots] = 0.1
+        self.color[slots] = color[:3]
+
     def update(self):
-        i = len(self.particles) - 1
-        while i >= 0:
-            particle = self.particles[i]
-            if particle['lifetime'] <= 0:
-                particle['active'] = False  # 标记为未使用
-                self.particles.pop(i)
-            else:
-                # 批量更新粒子状态
-                particle['x'] += particle['velocity_x']
-                particle['y'] += particle['velocity_y']
-                particle['velocity_y'] += particle['gravity']
-                particle['velocity_x'] *= particle['decay']
-                particle['velocity_y'] *= particle['decay']
-                particle['lifetime'] -= 1
-            i -= 1
-    
+        if self.count == 0:
+            return
+        alive = self.alive
+        # 整批更新存活粒子（按掩码原地计算，不做收集/写回）
+        np.add(self.x, self.velocity_x, out=self.x, where=alive)
+        np.add(self.y, self.velocity_y, out=self.y, where=alive)
+        np.add(self.velocity_y, self.gravity, out=self.velocity_y, where=alive)
+        np.multiply(self.velocity_x, self.decay, out=self.velocity_x, where=alive)
+        np.multiply(self.velocity_y, self.decay, out=self.velocity_y, where=alive)
+        np.subtract(self.lifetime, 1, out=self.lifetime, where=alive)
+
+        # 同一次更新里回收寿命耗尽的粒子（槽位整批压回空闲栈），不会再以透明度0画一帧
+        dead = np.flatnonzero(alive & (self.lifetime <= 0))
+        if dead.size:
+            alive[dead] = False
+            self.free_slots[self.free_count:self.free_count + dead.size] = dead
+            self.free_count += dead.size
+            self.count -= dead.size
+
+    def _get_sprite(self, key):
+        """按(颜色, 尺寸, 透明度档位)取预渲染的粒子贴图，缓存满时淘汰最久未用的"""
+        sprite = self.sprite_cache.get(key)
+        if sprite is not None:
+            self.sprite_cache.move_to_end(key)
+            return sprite
+        red, green, blue, size, alpha = key
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (red, green, blue, alpha), (size, size), size)
+        self.sprite_cache[key] = sprite
+        if len(self.sprite_cache) > self.max_cached_sprites:
+            self.sprite_cache.popitem(last=False)
+        return sprite
+
     def draw(self, screen, camera):
-        for particle in self.particles:
-            alpha = int(255 * (particle['lifetime'] / particle['max_lifetime']))
-            # 确保alpha值在有效范围内
-            alpha = max(0, min(255, alpha))
-            color = list(particle['color'])
-            if len(color) == 3:
-                color.append(alpha)
-            else:
-                color[3] = alpha
-            
-            # 确保颜色值在有效范围内
-            for i in range(len(color)):
-                color[i] = max(0, min(255, color[i]))
-            
-            screen_x, screen_y = camera.apply(particle['x'], particle['y'])
-            
-            # 创建一个临时surface来绘制带透明度的粒子
-            particle_surface = pygame.Surface((particle['size'] * 2, particle['size'] * 2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, color, (particle['size'], particle['size']), particle['size'])
-            screen.blit(particle_surface, (screen_x - particle['size'], screen_y - particle['size']))
+        if self.count == 0:
+            return
+        live = np.flatnonzero(self.alive)
+        # 量化：颜色每通道保留5位，尺寸取整，透明度分成16档
+        size = np.maximum(np.rint(self.size[live]), 1).astype(np.int32)
+        screen_x = (self.x[live] - camera.x).astype(np.int32) - size
+        screen_y = (self.y[live] - camera.y).astype(np.int32) - size
+        width, height = screen.get_size()
+        visible = ((screen_x + size * 2 > 0) & (screen_x < width) &
+                   (screen_y + size * 2 > 0) & (screen_y < height))
+        if not visible.any():
+            return
+        alpha = np.clip(255 * self.lifetime[live] // self.max_lifetime[live], 0, 255)
+        alpha_bucket = (alpha[visible] >> 4) * 17  # 0~15档映射回0~255
+        color = self.color[live][visible] & 0xF8
+        keys = zip(color[:, 0].tolist(), color[:, 1].tolist(), color[:, 2].tolist(),
+                   size[visible].tolist(), alpha_bucket.tolist())
+        get_sprite = self._get_sprite
+        screen.blits([(get_sprite(key), position) for key, position in
+                      zip(keys, zip(screen_x[visible].tolist(), screen_y[visible].tolist()))],
+                     doreturn=False)
+
+def subtract_rect(rect, hole):
+    """rect减去hole后剩下的（最多4个）矩形"""
+    if not rect.colliderect(hole):
+        return [rect]
+    pieces = []
+    if hole.top > rect.top:
+        pieces.append(pygame.Rect(rect.left, rect.top, rect.width, hole.top - rect.top))
+    if hole.bottom < rect.bottom:
+        pieces.append(pygame.Rect(rect.left, hole.bottom, rect.width, rect.bottom - hole.bottom))
+    middle_top = max(rect.top, hole.top)
+    middle_height = min(rect.bottom, hole.bottom) - middle_top
+    if hole.left > rect.left:
+        pieces.append(pygame.Rect(rect.left, middle_top, hole.left - rect.left, middle_height))
+    if hole.right < rect.right:
+        pieces.append(pygame.Rect(hole.right, middle_top, rect.right - hole.right, middle_height))
+    return pieces
+
+# 光源渐变强度的量化档位数
+GRADIENT_INTENSITY_LEVELS = 255
 
 # 光照效果系统
+# 光照：光照贴图按世界坐标切成tile_size见方的瓦片，每块瓦片 = 环境光 + 覆盖到它的光源渐变（取最大值）。
+# 只有光源移动超过5像素时才重建它新旧位置覆盖的瓦片；相机移动只决定取哪些瓦片、画在哪里。
+# 没有光源覆盖的瓦片共用同一块纯环境光瓦片（带特殊混合的fill比blit慢得多，不用它）；
+# UI排除区域通过把瓦片的绘制区域切成不与之相交的几个矩形来处理，不再复制整屏表面。
+# 光源渐变贴图按量化后的(半径, 强度, 颜色)放在有上限的LRU缓存里，满了只淘汰最久未用的一张。
+# 光源用句柄管理，可以跟随病毒等对象移动，对象移出游戏时释放；瓦片->光源的索引就是剔除用的网格，
+# 只合成相机看得到的瓦片；远离视野的跟随光源停放起来、分批低频检查，屏幕外光源再多每帧开销也基本不变
 class LightingSystem:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, tile_size=256, max_cached_tiles=64,
+                 max_cached_gradients=100, far_check_interval=4):
+        """
+        far_check_interval: 远离视野的跟随光源每隔几帧检查一次是否回到附近（按句柄错开，每帧只查其中一部分）
+        """
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.lights = []
+        self.lights = {}  # 光源句柄 -> 光源
+        self.next_handle = 0
+        self.light_owners = {}  # 光源句柄 -> 跟随的对象（有x、y属性）
+        self.owner_lights = {}  # 跟随的对象 -> 它的光源句柄列表
+        self.dirty_lights = set()  # 新增或移动超过5像素、还没重新登记瓦片的光源
+        # 跟随光源分两档：视野附近的每帧跟随；远离视野的“停放”起来，不在瓦片索引里，按句柄分组轮流检查
+        self.near_owned = set()
+        self.far_check_interval = far_check_interval
+        self.parked_groups = [set() for _ in range(far_check_interval)]
+        self.parked_lights = set()
+        self.tick = 0
         self.ambient_light = (180, 180, 200)  # 进一步提高环境光亮度
+        self.ambient_alpha = 40  # 降低环境光透明度
         self.last_frame_time = time.time()  # 初始化帧率限制计时器
-        self.gradient_cache = {}  # 初始化渐变缓存字典
+        self.gradient_cache = OrderedDict()  # 光源渐变贴图（LRU），键见_gradient_key
+        self.max_cached_gradients = max_cached_gradients
+        self.gradient_hits = 0
+        self.gradient_misses = 0
+        self.gradient_evictions = 0
+        self.tile_size = tile_size
+        self.max_cached_tiles = max_cached_tiles
+        self.tiles = {}  # (瓦片x, 瓦片y) -> 已合成的光照瓦片
+        self.tile_lights = {}  # (瓦片x, 瓦片y) -> 覆盖该瓦片的光源句柄集合（即按瓦片划分的光源网格索引）
+        self.rendered_positions = {}  # 光源句柄 -> 瓦片中使用的光源位置
+        self.light_tiles = {}  # 光源句柄 -> 该光源覆盖的瓦片集合
+        self.tiles_built = 0  # 累计重建的瓦片数（性能统计）
+        self.ambient_tile = None  # 没有光源覆盖时共用的纯环境光瓦片
     
-    def add_light(self, x, y, radius, color, intensity=1.0):
-        self.lights.append({
+    def _make_light(self, x, y, radius, color, intensity=1.0):
+        return {
             'x': x,
             'y': y,
             'radius': radius * 1.2,  # 适中的光照半径
             'color': color,
             'intensity': intensity * 0.3  # 大幅降低光照强度，避免遮挡角色
-        })
-        return len(self.lights) - 1  # 返回光源索引
-    
-    def update_light(self, index, x, y):
-        if 0 <= index < len(self.lights):
-            self.lights[index]['x'] = x
-            self.lights[index]['y'] = y
+        }
+
+    def add_light(self, x, y, radius, color, intensity=1.0, owner=None):
+        """
+        添加光源，返回光源句柄
+        owner: 可选的跟随对象（病毒等，需有x、y属性），光源每帧跟随它移动，
+               对象移出游戏时调用release_owner(owner)释放它的光源
+        """
+        handle = self.next_handle
+        self.next_handle += 1
+        self.lights[handle] = self._make_light(x, y, radius, color, intensity)
+        self.dirty_lights.add(handle)
+        if owner is not None:
+            self.light_owners[handle] = owner
+            self.owner_lights.setdefault(owner, []).append(handle)
+            self.near_owned.add(handle)  # 第一次同步时若离视野很远会被停放
+        return handle
     
-    def _create_gradient_surface(self, light):
-        light_radius = int(light['radius'])
-        cache_key = (light_radius, light['intensity'], str(light['color']))
-        
-        if cache_key in self.gradient_cache:
-            return self.gradient_cache[cache_key]
-        
-        gradient_surface = pygame.Surface((light_radius * 2, light_radius * 2), pygame.SRCALPHA)
-        step_size = max(1, light_radius // 30)  # 根据半径动态调整步长
-        
+    def update_light(self, handle, x, y):
+        light = self.lights.get(handle)
+        if light is None:
+            return
+        light['x'] = x
+        light['y'] = y
+        if handle in self.parked_lights:
+            return  # 停放中的光源回到视野附近时才重新登记
+        rendered = self.rendered_positions.get(handle)
+        if rendered is None or abs(rendered[0] - x) > 5 or abs(rendered[1] - y) > 5:
+            self.dirty_lights.add(handle)
+
+    def remove_light(self, handle):
+        """移除光源，它覆盖的瓦片失效"""
+        if self.lights.pop(handle, None) is None:
+            return
+        self.dirty_lights.discard(handle)
+        self.near_owned.discard(handle)
+        if handle in self.parked_lights:
+            self.parked_lights.discard(handle)
+            self.parked_groups[handle % self.far_check_interval].discard(handle)
+        self.rendered_positions.pop(handle, None)
+        self._unregister(handle, self.light_tiles.pop(handle, ()))
+        owner = self.light_owners.pop(handle, None)
+        if owner is not None:
+            handles = self.owner_lights.get(owner)
+            if handles is not None:
+                handles.remove(handle)
+                if not handles:
+                    del self.owner_lights[owner]
+
+    def release_owner(self, owner):
+        """释放某个对象的全部光源（病毒死亡或被移出游戏时调用）"""
+        for handle in self.owner_lights.pop(owner, ()):
+            self.light_owners.pop(handle, None)
+            self.remove_light(handle)
+
+    def clear(self):
+        """移除所有光源"""
+        for handle in list(self.lights):
+            self.remove_light(handle)
+
+    @staticmethod
+    def _gradient_key(light):
+        """量化后的渐变缓存键：(半径像素, 强度档位, 颜色)；强度按1/255分档，对应峰值透明度的1个单位"""
         base_color = light['color']
         if not isinstance(base_color, (tuple, list)) or len(base_color) < 3:
             base_color = (255, 255, 255)
-        
-        r = max(0, min(255, int(base_color[0])))
-        g = max(0, min(255, int(base_color[1])))
-        b = max(0, min(255, int(base_color[2])))
+        color = (max(0, min(255, int(base_color[0]))),
+                 max(0, min(255, int(base_color[1]))),
+                 max(0, min(255, int(base_color[2]))))
+        return int(light['radius']), round(light['intensity'] * GRADIENT_INTENSITY_LEVELS), color
+
+    def _create_gradient_surface(self, light):
+        """取光源的渐变贴图（LRU缓存）；同一量化键的光源共用一张"""
+        cache_key = self._gradient_key(light)
+        gradient_surface = self.gradient_cache.get(cache_key)
+        if gradient_surface is not None:
+            self.gradient_cache.move_to_end(cache_key)
+            self.gradient_hits += 1
+            return gradient_surface
+        self.gradient_misses += 1
+
+        light_radius, intensity_level, (r, g, b) = cache_key
+        intensity = intensity_level / GRADIENT_INTENSITY_LEVELS
+        gradient_surface = pygame.Surface((light_radius * 2, light_radius * 2), pygame.SRCALPHA)
+        step_size = max(1, light_radius // 30)  # 根据半径动态调整步长
         
         for radius in range(light_radius, 0, -step_size):
             progress = radius / light_radius
-            alpha = int(255 * (1 - progress ** 2) * light['intensity'])
+            alpha = int(255 * (1 - progress ** 2) * intensity)
             alpha = max(0, min(255, alpha))
             color = (r, g, b, alpha)
             
             pygame.draw.circle(gradient_surface, color, (light_radius, light_radius), radius)
         
         self.gradient_cache[cache_key] = gradient_surface
+        if len(self.gradient_cache) > self.max_cached_gradients:
+            self.gradient_cache.popitem(last=False)
+            self.gradient_evictions += 1
         return gradient_surface
 
+    def prewarm(self, presets):
+        """预先生成常用光源的渐变，presets为[(半径, 颜色, 强度), ...]，参数含义同add_light"""
+        for radius, color, intensity in presets:
+            self._create_gradient_surface(self._make_light(0, 0, radius, color, intensity))
+
+    def gradient_stats(self):
+        """渐变缓存统计：(命中, 未命中, 淘汰, 当前条数)"""
+        return self.gradient_hits, self.gradient_misses, self.gradient_evictions, len(self.gradient_cache)
+
+    def _covered_tiles(self, x, y, radius):
+        """光源渐变方块覆盖的瓦片"""
+        tile_size = self.tile_size
+        light_radius = int(radius)
+        left = int(x) - light_radius
+        top = int(y) - light_radius
+        right = left + light_radius * 2 - 1
+        bottom = top + light_radius * 2 - 1
+        return {(tile_x, tile_y)
+                for tile_y in range(top // tile_size, bottom // tile_size + 1)
+                for tile_x in range(left // tile_size, right // tile_size + 1)}
+
+    def _unregister(self, handle, tiles):
+        """把光源从这些瓦片的索引中去掉，并让瓦片失效"""
+        for tile in tiles:
+            lights = self.tile_lights.get(tile)
+            if lights is not None:
+                lights.discard(handle)
+                if not lights:
+                    del self.tile_lights[tile]
+            self.tiles.pop(tile, None)
+
+    def _sync_owned_lights(self, left, top, right, bottom):
+        """
+        跟随光源取对象当前位置。(left, top, right, bottom)为视野外扩一块瓦片的世界坐标范围：
+        完全在范围外的光源停放（移出瓦片索引），停放的光源每far_check_interval帧检查一次，
+        回到范围内时重新登记。外扩的一块瓦片保证光源在下次检查前来不及进入视野
+        （相机和光源每帧合计移动不超过tile_size / far_check_interval像素）
+        """
+        lights = self.lights
+        owners = self.light_owners
+        parked = self.parked_lights
+        groups = self.parked_groups
+        interval = self.far_check_interval
+        for handle in list(self.near_owned):
+            owner = owners[handle]
+            x = owner.x
+            y = owner.y
+            radius = lights[handle]['radius']
+            if x + radius < left or x - radius > right or y + radius < top or y - radius > bottom:
+                lights[handle]['x'] = x
+                lights[handle]['y'] = y
+                self.near_owned.discard(handle)
+                self.dirty_lights.discard(handle)
+                self.rendered_positions.pop(handle, None)
+                self._unregister(handle, self.light_tiles.pop(handle, ()))
+                parked.add(handle)
+                groups[handle % interval].add(handle)
+            else:
+                self.update_light(handle, x, y)
+
+        group = groups[self.tick % interval]
+        for handle in list(group):
+            owner = owners[handle]
+            x = owner.x
+            y = owner.y
+            lights[handle]['x'] = x
+            lights[handle]['y'] = y
+            radius = lights[handle]['radius']
+            if not (x + radius < left or x - radius > right or y + radius < top or y - radius > bottom):
+                group.discard(handle)
+                parked.discard(handle)
+                self.near_owned.add(handle)
+                self.dirty_lights.add(handle)
+
+    def _sync_lights(self, camera_x, camera_y):
+        """只有新增、移动超过5像素或重新回到视野附近的光源重新登记瓦片，它新旧位置覆盖的瓦片失效；
+        静止的光源和停放的远处光源每帧都没有（或只有很小的）开销"""
+        self.tick += 1
+        if self.light_owners:
+            margin = self.tile_size
+            self._sync_owned_lights(camera_x - margin, camera_y - margin,
+                                    camera_x + self.screen_width + margin, camera_y + self.screen_height + margin)
+        if not self.dirty_lights:
+            return
+        for handle in self.dirty_lights:
+            light = self.lights[handle]
+            x = light['x']
+            y = light['y']
+            old_tiles = self.light_tiles.get(handle, set())
+            new_tiles = self._covered_tiles(x, y, light['radius'])
+            self._unregister(handle, old_tiles - new_tiles)
+            for tile in new_tiles:
+                self.tile_lights.setdefault(tile, set()).add(handle)
+                self.tiles.pop(tile, None)
+            self.rendered_positions[handle] = (x, y)
+            self.light_tiles[handle] = new_tiles
+        self.dirty_lights.clear()
+
+    def _tile_surface(self, tile):
+        """取（必要时合成）某块有光源覆盖的瓦片；没有光源覆盖时返回None"""
+        surface = self.tiles.get(tile)
+        if surface is not None:
+            return surface
+        lights = self.tile_lights.get(tile)
+        if not lights:
+            return None
+        tile_size = self.tile_size
+        origin_x = tile[0] * tile_size
+        origin_y = tile[1] * tile_size
+        surface = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+        surface.fill((*self.ambient_light, self.ambient_alpha))
+        for handle in lights:
+            light = self.lights[handle]
+            x, y = self.rendered_positions[handle]
+            light_radius = int(light['radius'])
+            surface.blit(self._create_gradient_surface(light),
+                         (int(x) - light_radius - origin_x, int(y) - light_radius - origin_y),
+                         special_flags=pygame.BLEND_RGBA_MAX)
+        self.tiles[tile] = surface
+        self.tiles_built += 1
+        return surface
+
     def draw(self, screen, camera, exclude_rect=None):
         """
         绘制光照效果
         exclude_rect: 可选的排除区域(x, y, width, height)，该区域不会被光照影响（用于UI）
         """
-        # 使用缓存的光照表面
-        if not hasattr(self, 'cached_light_surface'):
-            self.cached_light_surface = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-            self.last_lights_positions = {}
-            self.last_camera_pos = (0, 0)
-
-        # 检查光源位置或相机是否发生变化
-        lights_changed = False
-        current_positions = {}
-        current_camera = (camera.x, camera.y)
-
-        if current_camera != self.last_camera_pos:
-            lights_changed = True
-            self.last_camera_pos = current_camera
-
-        for i, light in enumerate(self.lights):
-            current_positions[i] = (light['x'], light['y'])
-            if i not in self.last_lights_positions or \
-               abs(self.last_lights_positions[i][0] - light['x']) > 5 or \
-               abs(self.last_lights_positions[i][1] - light['y']) > 5:
-                lights_changed = True
-
-        if lights_changed:
-            self.cached_light_surface.fill((*self.ambient_light, 40))  # 降低环境光透明度
-
-            visible_lights = [light for light in self.lights if self._is_light_visible(light, camera)]
-
-            for light in visible_lights:
-                screen_x, screen_y = camera.apply(light['x'], light['y'])
-                gradient_surface = self._create_gradient_surface(light)
-                light_radius = int(light['radius'])
-                self.cached_light_surface.blit(gradient_surface,
-                                              (screen_x - light_radius, screen_y - light_radius),
-                                              special_flags=pygame.BLEND_RGBA_MAX)
-
-            self.last_lights_positions = current_positions.copy()
-
-        # 创建一个临时表面用于绘制，排除UI区域
-        if exclude_rect:
-            temp_surface = self.cached_light_surface.copy()
-            # 将UI区域设为透明（不受光照影响）
-            pygame.draw.rect(temp_surface, (255, 255, 255, 255), exclude_rect)
-            screen.blit(temp_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        tile_size = self.tile_size
+        camera_x = int(math.floor(camera.x))
+        camera_y = int(math.floor(camera.y))
+        self._sync_lights(camera_x, camera_y)
+        screen_rect = pygame.Rect(0, 0, self.screen_width, self.screen_height)
+        hole = pygame.Rect(exclude_rect) if exclude_rect else None
+        ambient_rgba = (*self.ambient_light, self.ambient_alpha)
+        if self.ambient_tile is None or self.ambient_tile.get_at((0, 0)) != ambient_rgba:
+            self.ambient_tile = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+            self.ambient_tile.fill(ambient_rgba)
+        visible = set()
+
+        for tile_y in range(camera_y // tile_size, (camera_y + self.screen_height - 1) // tile_size + 1):
+            for tile_x in range(camera_x // tile_size, (camera_x + self.screen_width - 1) // tile_size + 1):
+                dest_x = tile_x * tile_size - camera_x
+                dest_y = tile_y * tile_size - camera_y
+                area = pygame.Rect(dest_x, dest_y, tile_size, tile_size).clip(screen_rect)
+                pieces = [area] if hole is None else subtract_rect(area, hole)
+                tile = self._tile_surface((tile_x, tile_y))
+                if tile is None:
+                    tile = self.ambient_tile
+                else:
+                    visible.add((tile_x, tile_y))
+                for piece in pieces:
+                    screen.blit(tile, piece.topleft, piece.move(-dest_x, -dest_y),
+                                special_flags=pygame.BLEND_RGBA_MULT)
+
+        # 只保留当前可见的瓦片，其余的等再次进入视野时重建
+        if len(self.tiles) > self.max_cached_tiles:
+            self.tiles = {tile: surface for tile, surface in self.tiles.items() if tile in visible}
+
+# 战争迷雾
+# 迷雾遮罩只在视野半径（或画质参数）变化时生成一次：遮罩是屏幕两倍大小、中心挖空的半透明黑色表面
+# 叠在白底上得到的灰度“亮度系数”表面（255 - 迷雾浓度），每帧按玩家的屏幕坐标截取其中一块，
+# 一次乘法混合盖到画面上（与直接叠半透明黑色等价，但不带透明通道的乘法blit快得多）。
+# 设置了可见格子（set_visibility，来自field_of_view.py的视线计算）时，视野圆内被墙挡住的格子也盖上迷雾：
+# 被挡格子的系数表面只在玩家换格时生成；每帧在视野圆所在的方形内与遮罩取较小的系数后一起乘上去，
+# 圆外不会重复变暗
+class FogOfWar:
+    def __init__(self, screen_width, screen_height, radius, fog_alpha=200, soft_edge=0,
+                 low_resolution=False, low_resolution_scale=4):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.radius = radius
+        self.fog_alpha = fog_alpha
+        self.soft_edge = soft_edge  # 视野边缘渐变带宽度（像素），0为硬边
+        self.low_resolution = low_resolution  # 低画质：按1/scale分辨率生成遮罩再放大
+        self.low_resolution_scale = low_resolution_scale
+        self.mask_cache = {}  # (半径, 渐变宽度, 是否低分辨率) -> 遮罩表面
+        self.hidden_surface = None  # 被墙挡住的格子为迷雾系数、可见格子为白色（世界坐标对齐格子）
+        self.hidden_origin = (0, 0)  # hidden_surface左上角的世界坐标
+        self.composite = None  # 每帧合成视野圆方形区域用的表面
+
+    def set_radius(self, radius):
+        self.radius = radius
+
+    def set_quality(self, soft_edge=None, low_resolution=None):
+        if soft_edge is not None:
+            self.soft_edge = soft_edge
+        if low_resolution is not None:
+            self.low_resolution = low_resolution
+
+    def _build_hole(self, radius, soft_edge, scale):
+        """生成视野圆所在的方形区域（边长2*radius），按1/scale分辨率绘制"""
+        size = max(1, (radius * 2) // scale)
+        hole = pygame.Surface((size, size), pygame.SRCALPHA)
+        hole.fill((0, 0, 0, self.fog_alpha))
+        if soft_edge > 0:
+            # 按到圆心的距离计算透明度：内圈全透明，渐变带内线性过渡到迷雾浓度
+            offsets = (np.arange(size, dtype=np.float32) + 0.5) * scale - radius
+            distance = np.sqrt(offsets[:, None] ** 2 + offsets[None, :] ** 2)
+            inner = radius - soft_edge
+            alpha = np.clip((distance - inner) / soft_edge, 0, 1) * self.fog_alpha
+            pixels_alpha = pygame.surfarray.pixels_alpha(hole)
+            pixels_alpha[:] = alpha.astype(np.uint8)
+            del pixels_alpha  # 释放表面锁
         else:
-            screen.blit(self.cached_light_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        
-        # 清理过期的缓存
-        if len(self.gradient_cache) > 100:  # 限制缓存大小
-            self.gradient_cache.clear()
-    
-    def _is_light_visible(self, light, camera):
-        screen_x, screen_y = camera.apply(light['x'], light['y'])
-        return (-light['radius'] <= screen_x <= self.screen_width + light['radius'] and
-                -light['radius'] <= screen_y <= self.screen_height + light['radius'])
+            pygame.draw.circle(hole, (0, 0, 0, 0), (size // 2, size // 2), radius // scale)
+        if scale > 1:
+            hole = pygame.transform.smoothscale(hole, (radius * 2, radius * 2))
+        return hole
+
+    def _build_mask(self, radius, soft_edge, low_resolution):
+        width = self.screen_width * 2
+        height = self.screen_height * 2
+        mask = pygame.Surface((width, height), pygame.SRCALPHA)
+        mask.fill((0, 0, 0, self.fog_alpha))
+        if radius > 0:
+            scale = self.low_resolution_scale if low_resolution else 1
+            hole = self._build_hole(radius, soft_edge, scale)
+            # 取透明度较小者，把视野圆“挖”进迷雾
+            mask.blit(hole, (width // 2 - radius, height // 2 - radius),
+                      special_flags=pygame.BLEND_RGBA_MIN)
+        # 叠到白底上变成亮度系数
+        factors = pygame.Surface((width, height))
+        factors.fill((255, 255, 255))
+        factors.blit(mask, (0, 0))
+        return factors
+
+    def _get_mask(self):
+        key = (self.radius, self.soft_edge, self.low_resolution)
+        mask = self.mask_cache.get(key)
+        if mask is None:
+            if len(self.mask_cache) >= 4:  # 遮罩很大，只保留少量
+                self.mask_cache.clear()
+            mask = self.mask_cache[key] = self._build_mask(*key)
+        return mask
+
+    def _fog_factor(self):
+        """迷雾处的亮度系数（与遮罩一样由白底叠迷雾得到，保证两者完全一致）"""
+        sample = pygame.Surface((1, 1))
+        sample.fill((255, 255, 255))
+        fog = pygame.Surface((1, 1), pygame.SRCALPHA)
+        fog.fill((0, 0, 0, self.fog_alpha))
+        sample.blit(fog, (0, 0))
+        return sample.get_at((0, 0))[0]
+
+    def set_visibility(self, visible, origin_x, origin_y, cell_size):
+        """
+        设置可见格子：visible为布尔数组[行, 列]，左上角为格子(origin_x, origin_y)；
+        visible为None时取消，迷雾恢复为只有视野圆
+        """
+        if visible is None:
+            self.hidden_surface = None
+            return
+        rows, columns = visible.shape
+        cells = pygame.Surface((columns, rows))
+        pixels = pygame.surfarray.pixels3d(cells)
+        pixels[:] = np.where(visible.T, 255, self._fog_factor())[:, :, None]
+        del pixels  # 释放表面锁
+        size = (columns * cell_size, rows * cell_size)
+        if self.hidden_surface is None or self.hidden_surface.get_size() != size:
+            self.hidden_surface = pygame.Surface(size)
+        pygame.transform.scale(cells, size, self.hidden_surface)  # 每次换格复用同一张表面
+        self.hidden_origin = (origin_x * cell_size, origin_y * cell_size)
+
+    def draw(self, screen, center_x, center_y, camera_x=0, camera_y=0):
+        """
+        以屏幕坐标(center_x, center_y)为视野中心绘制迷雾
+        camera_x/camera_y: 相机位置，设置了可见格子时用来把格子对齐到屏幕
+        """
+        mask = self._get_mask()
+        # 视野中心超出屏幕时截取位置会越界，限制在屏幕范围内
+        clamped_x = max(0, min(self.screen_width, int(center_x)))
+        clamped_y = max(0, min(self.screen_height, int(center_y)))
+        offset_x = self.screen_width - clamped_x
+        offset_y = self.screen_height - clamped_y
+        screen_rect = pygame.Rect(0, 0, self.screen_width, self.screen_height)
+        square = pygame.Rect(int(center_x) - self.radius, int(center_y) - self.radius,
+                             self.radius * 2, self.radius * 2).clip(screen_rect)
+        if self.hidden_surface is None or square.width == 0 or square.height == 0:
+            screen.blit(mask, (0, 0), screen_rect.move(offset_x, offset_y), special_flags=pygame.BLEND_RGB_MULT)
+            return
+
+        # 视野圆所在方形之外照旧；方形之内先复制遮罩，再与被挡格子取较小的系数
+        for piece in subtract_rect(screen_rect, square):
+            screen.blit(mask, piece.topleft, piece.move(offset_x, offset_y), special_flags=pygame.BLEND_RGB_MULT)
+        if self.composite is None or self.composite.get_width() < square.width or \
+                self.composite.get_height() < square.height:
+            self.composite = pygame.Surface((self.radius * 2, self.radius * 2))
+        composite = self.composite
+        composite.blit(mask, (0, 0), square.move(offset_x, offset_y))
+        composite.blit(self.hidden_surface, (self.hidden_origin[0] - camera_x - square.x,
+                                             self.hidden_origin[1] - camera_y - square.y),
+                       special_flags=pygame.BLEND_RGB_MIN)
+        screen.blit(composite, square.topleft, (0, 0, square.width, square.height),
+                    special_flags=pygame.BLEND_RGB_MULT)
 
 # 屏幕抖动效果
 class ScreenShake:
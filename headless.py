@@ -0,0 +1,94 @@
+import argparse
+import math
+import os
+import time
+
+# 无窗口运行：必须在导入pygame之前指定dummy视频/音频驱动
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from game_world import GameWorld
+
+# 无窗口模拟：不打开窗口、不限帧，直接循环调用GameWorld.step()，
+# 用于测量纯模拟的tick速率，也可以每隔若干帧调用render()把画面画到离屏Surface上
+
+
+def bot_inputs(world):
+    """简单的自动操作：朝最近的病毒射击，沿流场方向靠近它；没有目标时按固定节奏绕圈"""
+    target = None
+    best_distance = None
+    for monster in world.monster_grid.query_radius(world.player_x, world.player_y, world.cell_size * 8):
+        distance = (monster.x - world.player_x) ** 2 + (monster.y - world.player_y) ** 2
+        if best_distance is None or distance < best_distance:
+            target = monster
+            best_distance = distance
+
+    if target is None:
+        angle = (world.tick % 240) / 240.0 * math.pi * 2
+        return {'move_x': math.cos(angle), 'move_y': math.sin(angle), 'fire': False}
+
+    aim_angle = math.atan2(target.y - world.player_y, target.x - world.player_x)
+    return {'move_x': math.cos(aim_angle), 'move_y': math.sin(aim_angle), 'fire': True, 'aim_angle': aim_angle}
+
+
+def run_headless(ticks=3600, render_every=0, seed=None, initial_monsters=60, input_provider=bot_inputs):
+    """
+    无窗口推进ticks帧模拟
+    render_every: 每隔多少帧调用一次render()画到离屏Surface（0为不绘制）
+    input_provider: 根据世界状态返回每帧输入的函数
+    返回统计字典（总耗时、每秒帧数、击杀、死亡、剩余病毒数等）
+    """
+    pygame.init()
+    world = GameWorld(seed=seed)
+    world.populate(initial_monsters, 1)
+    surface = None
+    if render_every > 0:
+        pygame.display.set_mode((world.view_width, world.view_height))
+        surface = pygame.Surface((world.view_width, world.view_height))
+
+    step_time = 0.0
+    render_time = 0.0
+    for tick in range(ticks):
+        start = time.perf_counter()
+        world.step(input_provider(world))
+        step_time += time.perf_counter() - start
+        if surface is not None and (tick + 1) % render_every == 0:
+            start = time.perf_counter()
+            world.render(surface)
+            render_time += time.perf_counter() - start
+
+    total_time = step_time + render_time
+    return {
+        'ticks': ticks,
+        'seconds': total_time,
+        'ticks_per_second': ticks / total_time if total_time > 0 else 0.0,
+        'step_ms': step_time * 1000.0 / max(ticks, 1),
+        'render_ms': render_time * 1000.0 / max(ticks // render_every, 1) if render_every > 0 else 0.0,
+        'kills': world.kills,
+        'deaths': world.deaths,
+        'monsters': len(world.monsters),
+        'bullets': len(world.bullets),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='无窗口运行游戏模拟并输出tick速率')
+    parser.add_argument('--ticks', type=int, default=3600, help='模拟帧数')
+    parser.add_argument('--render-every', type=int, default=0, help='每隔多少帧绘制一次（0为不绘制）')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    parser.add_argument('--monsters', type=int, default=60, help='初始病毒数量')
+    args = parser.parse_args()
+
+    stats = run_headless(args.ticks, args.render_every, args.seed, args.monsters)
+    print(f"模拟 {stats['ticks']} 帧，用时 {stats['seconds']:.2f} 秒，"
+          f"{stats['ticks_per_second']:.0f} 帧/秒（每帧模拟 {stats['step_ms']:.3f} ms）")
+    if args.render_every > 0:
+        print(f"每次绘制 {stats['render_ms']:.3f} ms")
+    print(f"击杀 {stats['kills']}，死亡 {stats['deaths']}，"
+          f"剩余病毒 {stats['monsters']}，飞行中子弹 {stats['bullets']}")
+
+
+if __name__ == '__main__':
+    main()
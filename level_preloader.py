@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 关卡后台预加载：玩当前关时在后台线程里准备下一关（生成病毒、分配出生点、缩放贴图），
+# 过关时直接取出结果换入，主循环里只剩引用替换；
+# 后台还没准备完（或根本没请求过）时take()会等待或当场准备，保证总能拿到结果。
+# 后台线程要读的共享状态在请求时由snapshot在主线程复制一份，准备过程只用这份副本；
+# 退出游戏时shutdown()通知准备函数停下（准备函数在各步骤之间查询stopping()），并等后台线程返回
+class LevelPreloader:
+    def __init__(self, prepare, snapshot=None):
+        """
+        prepare(关卡编号, 快照): 在后台线程运行，返回准备好的关卡数据
+        snapshot(关卡编号): 在调用request/take的线程（主线程）运行，返回交给prepare的快照
+        """
+        self.prepare = prepare
+        self.snapshot = snapshot
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-preload')
+        self.pending = {}  # 关卡编号 -> Future
+        self.stop_event = threading.Event()
+        # 最近一次取出的关卡的耗时统计（毫秒）
+        self.last_prepare_ms = 0.0  # 后台准备用时
+        self.last_wait_ms = 0.0  # 切换时主线程等待后台完成的时间（提前准备好时为0）
+        self.last_swap_ms = 0.0  # 换入用时（由调用方记录）
+
+    def _take_snapshot(self, level_index):
+        return self.snapshot(level_index) if self.snapshot is not None else None
+
+    def _timed_prepare(self, level_index, snapshot):
+        start = time.perf_counter()
+        result = self.prepare(level_index, snapshot)
+        return result, (time.perf_counter() - start) * 1000.0
+
+    def request(self, level_index):
+        """开始在后台准备某一关（已在准备中则忽略）"""
+        if level_index not in self.pending:
+            self.pending[level_index] = self.executor.submit(self._timed_prepare, level_index,
+                                                             self._take_snapshot(level_index))
+
+    def is_ready(self, level_index):
+        future = self.pending.get(level_index)
+        return future is not None and future.done()
+
+    def take(self, level_index):
+        """取出准备好的关卡数据"""
+        start = time.perf_counter()
+        future = self.pending.pop(level_index, None)
+        if future is None:
+            result, prepare_ms = self._timed_prepare(level_index, self._take_snapshot(level_index))
+        else:
+            result, prepare_ms = future.result()
+        self.last_wait_ms = (time.perf_counter() - start) * 1000.0
+        self.last_prepare_ms = prepare_ms
+        return result
+
+    def stopping(self):
+        """准备函数在各步骤之间调用：返回True时说明游戏正在退出，应尽快返回"""
+        return self.stop_event.is_set()
+
+    def shutdown(self):
+        """
+        退出游戏：丢弃尚未开始的准备任务，通知正在进行的准备在下一步之前停下，然后等后台线程返回。
+        线程池的工作线程不是守护线程，正在执行的那一步（如生成一批病毒）无法打断，退出最多等这一步做完
+        """
+        self.stop_event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pending.clear()
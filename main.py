@@ -1,4 +1,9 @@
+import time
+# 启动计时起点（统计从启动到第一帧画面显示的用时）
+STARTUP_TIME = time.perf_counter()
+
 import pygame
+import numpy as np
 import random
 import math
 import json
@@ -17,7 +22,27 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 # 导入画质增强模块
-from graphics_enhancement import ParticleSystem, LightingSystem
+from graphics_enhancement import ParticleSystem, LightingSystem, FogOfWar
+# 导入游戏世界（迷宫、病毒、子弹、回血包的模拟状态与逐帧更新）
+from game_world import (GameWorld, MonsterEntity, FixedTimestep,
+                        CELL_SIZE, MAZE_WIDTH, MAZE_HEIGHT, GAME_WIDTH, GAME_HEIGHT,
+                        MONSTER_ATTACK_RANGE, MONSTER_TRACKING_RANGE, MAX_MONSTERS, MIN_MONSTERS,
+                        MONSTER_SPAWN_COOLDOWN, MAX_HEALTH_PACKS, HEALTH_PACK_SPAWN_COOLDOWN,
+                        HEALTH_RESTORE_AMOUNT, BOSS_TYPES, MAX_MONSTER_RADIUS, MONSTER_TYPE_IDS)
+# 导入文字渲染缓存
+from text_cache import TextCache
+# 导入分阶段帧耗时分析器
+from profiler import FrameProfiler
+# 导入关卡后台预加载
+from level_preloader import LevelPreloader
+# 导入资源管理（并行解码、磁盘缓存、按需加载）
+from asset_manager import AssetManager
+# 导入病毒贴图享元
+from sprite_registry import SpriteRegistry
+# 导入视野（迷宫格子上的阴影投射）
+from field_of_view import FieldOfView
+# 导入小地图（预渲染迷宫图层 + 探索记录）
+from minimap import Minimap
 
 # 添加Camera类
 class Camera:
@@ -51,20 +76,35 @@ try:
 except (pygame.error, FileNotFoundError):
     print("警告：无法加载 logo.png 作为窗口图标")
 
-# 初始化中文字体
+# 资源管理：图片在线程池里并行解码，解码、缩放后的像素缓存在磁盘上，之后启动跳过PNG解码和缩放；
+# 第一帧用不到的资源（图鉴贴图和分行、标题字体）第一次用到时才加载
+ASSET_CACHE_DIR = (os.environ.get("IMMUNE_ASSET_CACHE") or
+                   os.path.join(os.path.expanduser("~"), ".immune_battle", "asset_cache"))
+assets = AssetManager(ASSET_CACHE_DIR)
+
+# 初始化中文字体（字体文件只读一次，各字号共用）
 CHINESE_FONT_PATH = resource_path("STHeiti Light.ttc")
 try:
-    FONT_LARGE = pygame.font.Font(CHINESE_FONT_PATH, 22)
-    FONT_SMALL = pygame.font.Font(CHINESE_FONT_PATH, 16)
-    FONT_TINY = pygame.font.Font(CHINESE_FONT_PATH, 14)
-    FONT_TITLE = pygame.font.Font(CHINESE_FONT_PATH, 48)
+    FONT_LARGE = assets.font(CHINESE_FONT_PATH, 22)
+    FONT_SMALL = assets.font(CHINESE_FONT_PATH, 16)
+    FONT_TINY = assets.font(CHINESE_FONT_PATH, 14)
 except:
     print("警告：无法加载中文字体，使用默认字体")
-    FONT_LARGE = pygame.font.Font(None, 22)
-    FONT_SMALL = pygame.font.Font(None, 16)
-    FONT_TINY = pygame.font.Font(None, 14)
-    FONT_TITLE = pygame.font.Font(None, 48)
-
+    CHINESE_FONT_PATH = None
+    FONT_LARGE = assets.font(None, 22)
+    FONT_SMALL = assets.font(None, 16)
+    FONT_TINY = assets.font(None, 14)
+
+def get_title_font():
+    """标题大字只在游戏结束画面使用，第一次用到时才创建"""
+    return assets.font(CHINESE_FONT_PATH, 48)
+
+# 文字渲染缓存（HUD、病毒名称等）
+text_cache = TextCache()
+# 分阶段帧耗时分析（按F3显示叠加层）
+frame_profiler = FrameProfiler(['events', 'player', 'monsters', 'spawning', 'combat', 'bullets',
+                                'maze', 'monster_draw', 'entity_draw', 'fog', 'particles', 'lighting',
+                                'hud', 'minimap', 'stats_panel', 'popups', 'overlay', 'flip', 'late_update'])
 # 初始化粒子系统
 particle_system = ParticleSystem()
 # 初始化光照系统
@@ -75,9 +115,7 @@ camera = Camera()
 # 玩家光源将在玩家初始化后添加
 player_light_index = -1  # 初始化为-1，表示尚未创建
 
-# 迷宫相关常量
-MAZE_WIDTH = 75  # 迷宫宽度（格子数）
-MAZE_HEIGHT = 75  # 迷宫高度（格子数）
+# 迷宫相关常量（迷宫尺寸见game_world.py）
 WALL_COLOR = (20, 50, 50)  # 墙壁颜色
 PATH_COLOR = (0, 0, 0)  # 通道颜色
 
@@ -101,6 +139,11 @@ SHADOW_COLOR = (0, 0, 0, 100)  # 半透明阴影
 # 视野限制相关常量
 FOG_OF_WAR_ENABLED = True  # 是否启用战争迷雾效果
 VISIBILITY_RADIUS = 300    # 玩家视野半径
+FOG_SOFT_EDGE = 0          # 视野边缘渐变宽度（像素），0为硬边
+FOG_LOW_RESOLUTION = False  # 低画质迷雾：低分辨率生成遮罩后放大
+# 迷雾遮罩只生成一次，每帧按玩家位置偏移绘制
+fog_of_war = FogOfWar(WINDOW_WIDTH, WINDOW_HEIGHT, VISIBILITY_RADIUS,
+                      soft_edge=FOG_SOFT_EDGE, low_resolution=FOG_LOW_RESOLUTION)
 
 # 在颜色常量下方添加武器相关常量
 WEAPON_TYPES = {
@@ -113,18 +156,17 @@ WEAPON_TYPES = {
     "Shotgun": {"attack": 40, "color": (0, 255, 0)}  # 绿色
 }
 
-# Game settings
-CELL_SIZE = 40
-GAME_WIDTH = MAZE_WIDTH * CELL_SIZE
-GAME_HEIGHT = MAZE_HEIGHT * CELL_SIZE
-
-# 在全局变量区域添加这些量（根据用户记忆优化）
-MAX_MONSTERS = 300 # 设置最大病毒数量（翻倍）
-MIN_MONSTERS = 40   # 最小病毒数量（翻倍）
-MONSTER_SPAWN_COOLDOWN = 180  # 刷新冷却时间（180帧，约3秒）
-MAX_HEALTH_PACKS = 40   # 场上最大回血包数量
-HEALTH_PACK_SPAWN_COOLDOWN = 100  # 回血包刷新冷却时间（?秒）
-HEALTH_RESTORE_AMOUNT = 20  # 回血包恢复量
+# 游戏世界：迷宫、病毒数据池、空间索引、子弹和回血包都由GameWorld持有，
+# 主循环按阶段调用它的方法；同一套模拟也可以用headless.py在无窗口下运行
+# 病毒空间索引world.monster_grid：近距离查询（近战、范围技能、滑动、病毒攻击）都走网格；
+# 病毒数据池world.monster_pool：移动、冷却等逐帧数据集中存放，按批更新。
+# 切换关卡时两者会整体换成后台准备好的新对象，所以总是通过world访问
+world = GameWorld(MAZE_WIDTH, MAZE_HEIGHT, CELL_SIZE, WINDOW_WIDTH, WINDOW_HEIGHT)
+maze = world.maze
+# 视野：墙会挡住视线，玩家换格时才重新取可见格子（按格缓存）；驱动迷雾和病毒绘制剔除
+field_of_view = FieldOfView(world.walls, CELL_SIZE, VISIBILITY_RADIUS)
+# 小地图：迷宫图层只画一次，视野扫过的格子记为已探索；TAB键切换全图
+minimap = Minimap(world.walls, CELL_SIZE)
 
 # 难度增长优化：从每1分调整为每100分
 DIFFICULTY_SCORE_THRESHOLD = 1000  # 每1000分增加一次难度
@@ -277,29 +319,13 @@ def build_virus_codex_entries(content_width):
     return entries
 
 VIRUS_CODEX_CONTENT_WIDTH = 620
-VIRUS_CODEX_ENTRIES = build_virus_codex_entries(VIRUS_CODEX_CONTENT_WIDTH)
-
-# Boss病毒类型定义
-BOSS_TYPES = [
-    {
-        "name": "超级流感",
-        "hp": 300,
-        "attack": 30,
-        "defense": 15,
-        "color": (180, 30, 30),  # 深红色
-        "size_multiplier": 5,  # Boss体型翻倍
-        "exp_multiplier": 10    # 免疫力奖励翻10倍
-    },
-    {
-        "name": "病毒之王",
-        "hp": 250,
-        "attack": 35,
-        "defense": 12,
-        "color": (100, 20, 120),  # 紫黑色
-        "size_multiplier": 1.8,
-        "exp_multiplier": 2.5
-    }
-]
+VIRUS_CODEX_ENTRIES = None  # 第一次打开图鉴时才分行
+
+def get_virus_codex_entries():
+    global VIRUS_CODEX_ENTRIES
+    if VIRUS_CODEX_ENTRIES is None:
+        VIRUS_CODEX_ENTRIES = build_virus_codex_entries(VIRUS_CODEX_CONTENT_WIDTH)
+    return VIRUS_CODEX_ENTRIES
 
 # 武器管理工具函数
 def upgrade_weapon():
@@ -362,84 +388,32 @@ class Weapon:
                          self.size,
                          self.size//8))
 
-class Monster:
-    def __init__(self, x, y, name, hp, attack, defense, color, size_multiplier=1, exp_multiplier=1):
-        self.x = x
-        self.y = y
-        self.name = name
-        self.hp = int(hp * 1.5)  # 增加50%的生命值
-        self.max_hp = int(hp * 1.5)
-        self.attack = int(attack * 1.3)  # 增加30%的攻击力
-        self.defense = int(defense * 1.2)  # 增加20%的防御力
-        self.is_alive = True
-        self.size = int((CELL_SIZE - 10) * size_multiplier)  # Boss会更大
-        self.color = color
-        self.speed = 7 if size_multiplier == 1 else 4  # 提高移动速度
-        self.move_cooldown = 0
-        self.move_direction = random.choice([(1,0), (-1,0), (0,1), (0,-1)])
-        self.exp_reward = int((hp // 3) * exp_multiplier)  # Boss给更多免疫力
+class Monster(MonsterEntity):
+    """带贴图、阴影和名称标签绘制的病毒；数据与移动、战斗逻辑见game_world.MonsterEntity"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.font = FONT_TINY
-        self.is_boss = size_multiplier > 1  # 标记是否为Boss
-        
-        # 添加攻击相关属性
-        self.attack_cooldown = 0  # 攻击冷却时间
-        self.attack_range = CELL_SIZE * 1  # 攻击范围（1格距离，从2格减少到1格）
-        self.attack_cooldown_max = 100  # 攻击冷却时间（1.6秒）
-    
-    def draw(self, window, camera_x, camera_y):
+
+    def draw(self, window, camera_x, camera_y, alpha=1.0):
         if not self.is_alive:
             return
 
-        # 优化的视野剖除检查
-        screen_x = self.x - camera_x
-        screen_y = self.y - camera_y
+        # 优化的视野剖除检查（按上一tick与当前tick之间的插值位置绘制）
+        draw_x, draw_y = self.draw_position(alpha)
+        screen_x = draw_x - camera_x
+        screen_y = draw_y - camera_y
         margin = self.size + 20  # 增加margin以容纳光晕
         if (screen_x < -margin or screen_x > WINDOW_WIDTH + margin or
             screen_y < -margin or screen_y > WINDOW_HEIGHT + margin):
             return
 
-        # 优化：使用预计算的阴影表面
-        if not hasattr(self, '_shadow_surface'):
-            self._shadow_surface = pygame.Surface((self.size, self.size//2), pygame.SRCALPHA)
-            pygame.draw.ellipse(self._shadow_surface, (0, 0, 0, 100),
-                              (0, 0, self.size, self.size//2))
-
-        # 绘制阴影
-        window.blit(self._shadow_surface,
+        # 绘制阴影（同尺寸的病毒共用一张）
+        window.blit(monster_sprites.shadow(self.size),
                    (screen_x - self.size//2, screen_y + self.size//4))
 
-        # 预计算病毒表面
-        if not hasattr(self, '_monster_surface'):
-            # 尝试使用图片
-            monster_img = MONSTER_IMAGES.get(self.name)
-            if monster_img is not None:
-                # 缩放图片直接作为表面
-                self._monster_surface = pygame.transform.scale(monster_img, (self.size, self.size)).convert_alpha()
-                self._border_offset = 0
-            else:
-                # 回退到默认的圆形渲染
-                self._monster_surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-                self._border_offset = 0
-
-                # 创建渐变效果
-                for i in range(self.size//2, 0, -2):
-                    alpha = max(50, 255 - (self.size//2 - i) * 8)
-                    color = [max(0, min(255, c)) for c in self.color]
-                    pygame.draw.circle(self._monster_surface, (*color, alpha),
-                                     (self.size//2, self.size//2), i)
-
-                # 高光效果
-                highlight_size = self.size//4
-                highlight = pygame.Surface((highlight_size, highlight_size), pygame.SRCALPHA)
-                pygame.draw.circle(highlight, (255, 255, 255, 150),
-                                 (highlight_size//2, highlight_size//2), highlight_size//2)
-                self._monster_surface.blit(highlight, (self.size//4, self.size//4))
-
-        # 绘制病毒
-        border_offset = getattr(self, '_border_offset', 0)
-        window.blit(self._monster_surface,
-                   (screen_x - self.size//2 - border_offset,
-                    screen_y - self.size//2 - border_offset))
+        # 绘制病毒（同类型同尺寸的病毒共用一张贴图）
+        window.blit(monster_sprites.monster(self.name, self.size, self.color),
+                   (screen_x - self.size//2, screen_y - self.size//2))
 
         # 优化的血条绘制
         self._draw_health_bar(window, screen_x, screen_y)
@@ -452,13 +426,9 @@ class Monster:
         hp_bar_y = screen_y - self.size//2 - 15
 
         # 在血条上方显示病毒名称
-        name_text = self.font.render(self.name, True, (255, 255, 255))
-        name_rect = name_text.get_rect(centerx=screen_x, bottom=hp_bar_y - 2)
-        # 名称背景（半透明）
-        name_bg = pygame.Surface((name_rect.width + 6, name_rect.height + 2), pygame.SRCALPHA)
-        name_bg.fill((0, 0, 0, 120))
-        window.blit(name_bg, (name_rect.x - 3, name_rect.y - 1))
-        window.blit(name_text, name_rect)
+        # 名称和半透明背景合成为一张缓存的标签，只在首次出现时渲染
+        name_label = text_cache.render_label(self.font, self.name, True, (255, 255, 255), (0, 0, 0, 120))
+        window.blit(name_label, name_label.get_rect(centerx=screen_x, bottom=hp_bar_y - 1))
 
         # 血条边框（只在边框绘制）
         pygame.draw.rect(window, (40, 40, 40),
@@ -479,391 +449,10 @@ class Monster:
             pygame.draw.rect(window, hp_color,
                            (hp_bar_x, hp_bar_y, current_width, hp_bar_height))
     
-    def check_collision(self, player_x, player_y, player_size):
-        if not self.is_alive:
-            return False
-        distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
-        return distance < (player_size + self.size) // 2
-    
-    def can_attack_player(self, player_x, player_y):
-        """检查是否在攻击范围内且冷却时间结束"""
-        if not self.is_alive or self.attack_cooldown > 0:
-            return False
-        distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
-        return distance <= self.attack_range
-    
-    def attack_player(self, player_x, player_y):
-        """攻击玩家并设置冷却时间"""
-        if self.can_attack_player(player_x, player_y):
-            self.attack_cooldown = self.attack_cooldown_max
-            return True
-        return False
-    
-    def update_attack_cooldown(self):
-        """更新攻击冷却时间"""
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
-    
-    def take_damage(self, damage):
-        actual_damage = max(damage - self.defense, 0)
-        self.hp = max(self.hp - actual_damage, 0)
-        if self.hp <= 0:
-            self.is_alive = False
-            
-    def attack_target(self, target):
-        if self.is_alive:
-            target.take_damage(self.attack)
-    
-    def heal(self, amount):
-        if self.is_alive:
-            self.hp = min(self.hp + amount, self.max_hp)
-            
-    def __str__(self):
-        return f"{self.name} (HP: {self.hp}/{self.max_hp})"
-    
-    def check_valid_position(self, x, y, maze):
-        size = self.size // 2
-        corners = [
-            (int((x - size) // CELL_SIZE), int((y - size) // CELL_SIZE)),
-            (int((x + size) // CELL_SIZE), int((y - size) // CELL_SIZE)),
-            (int((x - size) // CELL_SIZE), int((y + size) // CELL_SIZE)),
-            (int((x + size) // CELL_SIZE), int((y + size) // CELL_SIZE))
-        ]
-        
-        for cell_x, cell_y in corners:
-            if (not (0 <= cell_x < MAZE_WIDTH and 0 <= cell_y < MAZE_HEIGHT) or
-                maze[cell_y][cell_x] == 1):
-                return False
-        return True
-
-    def move_towards_player(self, player_x, player_y, maze=None, always_move=True):
-        """
-        病毒移动逻辑
-        always_move: 是否始终移动（即使不在玩家视野内也自由游荡）
-        """
-        if not self.is_alive:
-            return
-
-        # 优化：提前执行移动冷却检查
-        if self.move_cooldown > 0:
-            self.move_cooldown -= 1
-            return
-
-        # 计算到玩家的距离（使用整数运算优化）
-        dx_raw = player_x - self.x
-        dy_raw = player_y - self.y
-        distance_squared = dx_raw * dx_raw + dy_raw * dy_raw
-        tracking_range_squared = (CELL_SIZE * 8) * (CELL_SIZE * 8)  # 增加追踪范围到8格
-
-        # 在追踪范围内才会自动靠近玩家
-        if distance_squared < tracking_range_squared:
-            # 使用快速距离近似避免开方运算
-            distance = (distance_squared) ** 0.5 if distance_squared > 0 else 0
-
-            if distance > 0:
-                dx = (dx_raw / distance) * self.speed
-                dy = (dy_raw / distance) * self.speed
-            else:
-                dx = dy = 0
-        else:
-            # 自由游荡模式：即使不在玩家附近也会移动
-            # 增加方向改变频率，让病毒更活跃
-            if random.random() < 0.05:  # 5%的概率改变方向
-                self.move_direction = random.choice([(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)])
-
-            dx = self.move_direction[0] * self.speed * 0.6  # 游荡时速度稍慢
-            dy = self.move_direction[1] * self.speed * 0.6
-        
-        # 边界检查优化，增加边界缓冲区
-        buffer = self.size // 2 + 5  # 增加5像素缓冲区
-        next_x = max(buffer, min(GAME_WIDTH - buffer, self.x + dx))
-        next_y = max(buffer, min(GAME_HEIGHT - buffer, self.y + dy))
-        
-        # 迷宫碰撞检测优化 - 改进的防卡墙系统
-        if maze is not None:
-            if self.check_valid_position(next_x, next_y, maze):
-                self.x = next_x
-                self.y = next_y
-            else:
-                # 改进的避障逻辑 - 多方向尝试
-                moved = False
-                
-                # 首先尝试分别在x和y方向移动
-                if self.check_valid_position(next_x, self.y, maze):
-                    self.x = next_x
-                    moved = True
-                elif self.check_valid_position(self.x, next_y, maze):
-                    self.y = next_y
-                    moved = True
-                
-                # 如果单方向移动也失败，使用智能寻路
-                if not moved and distance_squared < tracking_range_squared:
-                    self._smart_pathfinding(player_x, player_y, maze)
-                    moved = True
-                
-                # 如果仍然无法移动，执行防卡墙逃脱机制
-                if not moved:
-                    self._escape_from_wall(maze)
-        else:
-            self.x = next_x
-            self.y = next_y
-            
-        # 统一的冷却管理，防止卡墙
-        self.move_cooldown = 2  # 减少冷却时间提高响应性
-    
-    def _smart_pathfinding(self, player_x, player_y, maze):
-        """优化的智能寻路算法"""
-        player_dx = player_x - self.x
-        player_dy = player_y - self.y
-        
-        # 增加更多的寻路方向选择
-        if abs(player_dx) > abs(player_dy):
-            # 优先垂直绕行
-            directions = [(0, -self.speed), (0, self.speed), (-self.speed//2, -self.speed//2), (self.speed//2, self.speed//2)]
-        else:
-            # 优先水平绕行
-            directions = [(-self.speed, 0), (self.speed, 0), (-self.speed//2, -self.speed//2), (self.speed//2, self.speed//2)]
-        
-        # 添加斜向移动尝试
-        diagonal_directions = [
-            (-self.speed//2, -self.speed//2), (self.speed//2, -self.speed//2),
-            (-self.speed//2, self.speed//2), (self.speed//2, self.speed//2)
-        ]
-        directions.extend(diagonal_directions)
-        
-        for dx, dy in directions:
-            buffer = self.size // 2 + 5
-            test_x = max(buffer, min(GAME_WIDTH - buffer, self.x + dx))
-            test_y = max(buffer, min(GAME_HEIGHT - buffer, self.y + dy))
-            
-            if self.check_valid_position(test_x, test_y, maze):
-                self.x = test_x
-                self.y = test_y
-                return
-        
-        # 如果所有方向都被阻挡，强制改变方向并减少移动步长
-        self.move_direction = random.choice([(1,0), (-1,0), (0,1), (0,-1)])
-        self._escape_from_wall(maze)
-    
-    def _escape_from_wall(self, maze):
-        """防卡墙逃脱机制"""
-        # 尝试8个方向的小步移动来逃脱卡墙
-        escape_directions = [
-            (1, 0), (-1, 0), (0, 1), (0, -1),
-            (1, 1), (-1, -1), (1, -1), (-1, 1)
-        ]
-        
-        escape_distance = self.speed // 3  # 使用较小的逃脱距离
-        
-        for dx, dy in escape_directions:
-            escape_x = self.x + dx * escape_distance
-            escape_y = self.y + dy * escape_distance
-            
-            # 确保不越界
-            buffer = self.size // 2 + 10  # 增加更大的缓冲区
-            escape_x = max(buffer, min(GAME_WIDTH - buffer, escape_x))
-            escape_y = max(buffer, min(GAME_HEIGHT - buffer, escape_y))
-            
-            if self.check_valid_position(escape_x, escape_y, maze):
-                self.x = escape_x
-                self.y = escape_y
-                # 重置移动方向
-                self.move_direction = (dx, dy)
-                return
-        
-        # 如果仍然无法逃脱，强制传送到最近的有效位置
-        self._force_teleport_to_valid_position(maze)
-    
-    def _force_teleport_to_valid_position(self, maze):
-        """强制传送到最近的有效位置（最后手段）"""
-        # 在周围寻找最近的有效位置
-        search_radius = CELL_SIZE
-        max_radius = CELL_SIZE * 3
-        
-        while search_radius <= max_radius:
-            for angle in range(0, 360, 45):  # 每45度检查一次
-                radian = math.radians(angle)
-                test_x = self.x + math.cos(radian) * search_radius
-                test_y = self.y + math.sin(radian) * search_radius
-                
-                # 确保不越界
-                buffer = self.size // 2 + 10
-                test_x = max(buffer, min(GAME_WIDTH - buffer, test_x))
-                test_y = max(buffer, min(GAME_HEIGHT - buffer, test_y))
-                
-                if self.check_valid_position(test_x, test_y, maze):
-                    self.x = test_x
-                    self.y = test_y
-                    return
-            
-            search_radius += CELL_SIZE // 2
-
 # 修改玩家移动检查函数
 def check_player_collision_with_maze(x, y, maze):
-    # 获取玩家四个角的格子坐标
-    player_radius = player_size // 2
-    corners = [
-        (int((x - player_radius) // CELL_SIZE), int((y - player_radius) // CELL_SIZE)),
-        (int((x + player_radius) // CELL_SIZE), int((y - player_radius) // CELL_SIZE)),
-        (int((x - player_radius) // CELL_SIZE), int((y + player_radius) // CELL_SIZE)),
-        (int((x + player_radius) // CELL_SIZE), int((y + player_radius) // CELL_SIZE))
-    ]
-    
-    # 检查每个角是否与墙壁碰撞
-    for cell_x, cell_y in corners:
-        if (0 <= cell_x < MAZE_WIDTH and 0 <= cell_y < MAZE_HEIGHT and
-            maze[cell_y][cell_x] == 1):
-            return True  # 碰撞
-    return False  # 无碰撞
-
-# 检查与迷宫的碰撞
-def check_collision_with_maze(x, y, size, maze):
-    # 获取实体四个角的格子坐标
-    radius = size // 2
-    corners = [
-        (int((x - radius) // CELL_SIZE), int((y - radius) // CELL_SIZE)),
-        (int((x + radius) // CELL_SIZE), int((y - radius) // CELL_SIZE)),
-        (int((x - radius) // CELL_SIZE), int((y + radius) // CELL_SIZE)),
-        (int((x + radius) // CELL_SIZE), int((y + radius) // CELL_SIZE))
-    ]
-    
-    # 检查每个角是否与墙壁碰撞
-    for cell_x, cell_y in corners:
-        if (0 <= cell_x < MAZE_WIDTH and 0 <= cell_y < MAZE_HEIGHT and
-            maze[cell_y][cell_x] == 1):
-            return True  # 碰撞
-    return False  # 无碰撞
-
-class HealthPack:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.size = CELL_SIZE - 15
-        self.active = True
-    
-    def draw(self, window, camera_x, camera_y):
-        if self.active:
-            # 绘制十字形状的回血包
-            center_x = self.x - camera_x
-            center_y = self.y - camera_y
-            rect_width = self.size // 3
-            rect_height = self.size
-            
-            # 绘制垂直部分
-            pygame.draw.rect(window, PINK,
-                           (center_x - rect_width//2,
-                            center_y - rect_height//2,
-                            rect_width, rect_height))
-            
-            # 绘制水平部分
-            pygame.draw.rect(window, PINK,
-                           (center_x - rect_height//2,
-                            center_y - rect_width//2,
-                            rect_height, rect_width))
-    
-    def check_collision(self, player_x, player_y, player_size):
-        if not self.active:
-            return False
-        distance = ((player_x - self.x) ** 2 + (player_y - self.y) ** 2) ** 0.5
-        return distance < (player_size + self.size) // 2
-
-def generate_monsters(num_monsters):
-    monsters = []
-    # 病毒类型定义
-    monster_types = [
-        {"name": "感冒病毒", "hp": 40, "attack": 12, "defense": 2, "color": (100, 200, 100)},
-        {"name": "流感病毒", "hp": 55, "attack": 15, "defense": 4, "color": (255, 150, 50)},
-        {"name": "蛀牙细菌", "hp": 35, "attack": 14, "defense": 1, "color": (200, 200, 180)},
-        {"name": "鼻涕虫菌", "hp": 30, "attack": 10, "defense": 1, "color": (180, 220, 100)},
-        {"name": "肚子疼菌", "hp": 85, "attack": 18, "defense": 6, "color": (139, 90, 43)},
-        {"name": "熬夜菌", "hp": 45, "attack": 16, "defense": 0, "color": (180, 150, 220)},
-        {"name": "咳嗽病毒", "hp": 25, "attack": 8, "defense": 0, "color": (100, 100, 120)},
-        {"name": "懒惰菌", "hp": 99, "attack": 14, "defense": 15, "color": (169, 169, 169)},
-        {"name": "坏情绪菌", "hp": 50, "attack": 22, "defense": 3, "color": (100, 50, 150)},
-        {"name": "发烧病毒", "hp": 60, "attack": 20, "defense": 4, "color": (255, 80, 50)}
-    ]
-
-    def check_monster_collision(x, y, size, existing_monsters):
-        for monster in existing_monsters:
-            distance = ((x - monster.x) ** 2 + (y - monster.y) ** 2) ** 0.5
-            if distance < (size + monster.size) // 2:
-                return True
-        return False
-
-    # 有10%的概率生成Boss
-    if random.random() < 0.1:
-        boss_type = random.choice(BOSS_TYPES)
-        if _spawn_monster_safely(monsters, boss_type, is_boss=True):
-            pass  # Boss生成成功
-
-    # 生成普通怪物
-    for _ in range(num_monsters):
-        monster_type = random.choice(monster_types)
-        _spawn_monster_safely(monsters, monster_type, is_boss=False)
-    
-    # 确保生成的怪物数量不超过最大数量
-    return monsters[:MAX_MONSTERS]
-
-def _spawn_monster_safely(monsters, monster_type, is_boss=False):
-    """安全生成怪物的助手函数"""
-    attempts = 0
-    max_attempts = 100  # 增加尝试次数
-    
-    while attempts < max_attempts:
-        x = random.randint(CELL_SIZE * 2, GAME_WIDTH - CELL_SIZE * 2)  # 给边界留更多空间
-        y = random.randint(CELL_SIZE * 2, GAME_HEIGHT - CELL_SIZE * 2)
-        
-        if is_boss:
-            size_multiplier = monster_type["size_multiplier"]
-            exp_multiplier = monster_type["exp_multiplier"]
-            monster_size = int((CELL_SIZE - 10) * size_multiplier)
-        else:
-            size_multiplier = 1
-            exp_multiplier = 1
-            monster_size = CELL_SIZE - 10
-        
-        # 检查是否与现有怪物冲突
-        collision_found = False
-        for monster in monsters:
-            distance = ((x - monster.x) ** 2 + (y - monster.y) ** 2) ** 0.5
-            if distance < (monster_size + monster.size) // 2 + 20:  # 增加安全距离
-                collision_found = True
-                break
-        
-        # 检查是否在墙里（需要在迷宫初始化后才能检查）
-        wall_collision = False
-        try:
-            wall_collision = check_collision_with_maze(x, y, monster_size, maze)
-        except NameError:
-            # 如果迷宫还没有初始化，跳过墙壁检测
-            wall_collision = False
-        
-        if not collision_found and not wall_collision:
-            monster = Monster(
-                x, y,
-                monster_type["name"],
-                monster_type["hp"],
-                monster_type["attack"],
-                monster_type["defense"],
-                monster_type["color"],
-                size_multiplier=size_multiplier,
-                exp_multiplier=exp_multiplier
-            )
-            monsters.append(monster)
-            return True
-        
-        attempts += 1
-    
-    return False  # 生成失败
-
-def generate_health_packs(num_packs):
-    health_packs = []
-    for _ in range(num_packs):
-        # 在游戏区域内随机生成回血包
-        pack_x = random.randint(CELL_SIZE, GAME_WIDTH - CELL_SIZE)
-        pack_y = random.randint(CELL_SIZE, GAME_HEIGHT - CELL_SIZE)
-        health_packs.append(HealthPack(pack_x, pack_y))
-    return health_packs
+    # 查玩家体型的可通行表（迷宫生成时预先算好）
+    return world.check_collision_with_maze(x, y, player_size)
 
 # Set game center
 center_x = GAME_WIDTH // 2
@@ -878,50 +467,60 @@ player_speed = 30  # 增加基础速度
 camera_x = 0
 camera_y = 0
 
-# 加载玩家图片
-try:
-    player_image = pygame.image.load(resource_path("中国球.png")).convert_alpha()
-    # 缩放图片到适合的大小
-    player_image = pygame.transform.scale(player_image, (player_size, player_size))
-except (pygame.error, FileNotFoundError):
-    print("警告：无法加载 中国球.png，将使用默认的圆形")
-    player_image = None
-
-# 加载武器图片
-try:
-    weapon_image_original = pygame.image.load(resource_path("铁剑.png")).convert_alpha()
-    # 缩放武器图片
-    weapon_image_original = pygame.transform.scale(weapon_image_original, (32, 32))
-except (pygame.error, FileNotFoundError):
-    print("警告：无法加载 铁剑.png，将使用默认的武器形状")
-    weapon_image_original = None
-
-# 加载病毒图片
-MONSTER_IMAGES = {}
 MONSTER_IMAGE_NAMES = [
     "感冒病毒", "流感病毒", "蛀牙细菌", "鼻涕虫菌", "肚子疼菌",
     "熬夜菌", "咳嗽病毒", "懒惰菌", "坏情绪菌", "发烧病毒",
     "超级流感", "病毒之王"
 ]
+BOSS_SIZES = {boss["name"]: int((CELL_SIZE - 10) * boss["size_multiplier"]) for boss in BOSS_TYPES}
+
+# 第一帧就要用的图片：玩家、武器和各病毒按游戏内尺寸缩放好的贴图，并行加载
+image_requests = {
+    "player": (resource_path("中国球.png"), (player_size, player_size), False),
+    "weapon": (resource_path("铁剑.png"), (32, 32), False),
+}
 for monster_name in MONSTER_IMAGE_NAMES:
-    try:
-        img_path = resource_path(f"images/{monster_name}.png")
-        img = pygame.image.load(img_path).convert_alpha()
-        MONSTER_IMAGES[monster_name] = img
+    sprite_size = BOSS_SIZES.get(monster_name, CELL_SIZE - 10)
+    image_requests[monster_name] = (resource_path(f"images/{monster_name}.png"), (sprite_size, sprite_size), False)
+loaded_images = assets.load_images(image_requests)
+
+# 玩家图片
+player_image = loaded_images["player"]
+if player_image is None:
+    print("警告：无法加载 中国球.png，将使用默认的圆形")
+
+# 武器图片
+weapon_image_original = loaded_images["weapon"]
+if weapon_image_original is None:
+    print("警告：无法加载 铁剑.png，将使用默认的武器形状")
+
+def get_monster_image(monster_name):
+    """病毒原图（缩放出其他尺寸时才加载）"""
+    return assets.image(resource_path(f"images/{monster_name}.png"))
+
+# 病毒贴图享元：每种(病毒, 尺寸)只有一份贴图，所有病毒共用；启动时加载好的缩放贴图直接登记
+monster_sprites = SpriteRegistry(get_monster_image)
+for monster_name in MONSTER_IMAGE_NAMES:
+    sprite = loaded_images[monster_name]
+    if sprite is not None:
+        monster_sprites.add(monster_name, sprite.get_width(), sprite)
         print(f"已加载病毒图片: {monster_name}")
-    except (pygame.error, FileNotFoundError):
+    else:
         print(f"警告：无法加载 images/{monster_name}.png，将使用默认图形")
-        MONSTER_IMAGES[monster_name] = None
+
+def monster_sprite_entries(monsters):
+    """一批病毒用到的(病毒名称, 尺寸, 颜色)，每种只取一次"""
+    entries = {}
+    for monster in monsters:
+        entries.setdefault((monster.name, monster.size), monster.color)
+    return [(name, size, color) for (name, size), color in entries.items()]
 
 CODEX_IMAGE_SIZE = 64
-MONSTER_CODEX_IMAGES = {}
-for monster_name, monster_img in MONSTER_IMAGES.items():
-    if monster_img:
-        MONSTER_CODEX_IMAGES[monster_name] = pygame.transform.smoothscale(
-            monster_img, (CODEX_IMAGE_SIZE, CODEX_IMAGE_SIZE)
-        )
-    else:
-        MONSTER_CODEX_IMAGES[monster_name] = None
+
+def get_codex_image(monster_name):
+    """图鉴用的平滑缩放图片（第一次打开图鉴时才加载）"""
+    return assets.image(resource_path(f"images/{monster_name}.png"),
+                        (CODEX_IMAGE_SIZE, CODEX_IMAGE_SIZE), smooth=True)
 
 # 玩家朝向和武器攻击相关变量
 player_facing_angle = 0  # 玩家朝向角度（弧度）
@@ -997,124 +596,46 @@ def trigger_virus_intro(virus_name):
         virus_intro_name = virus_name
         virus_intro_timer = 0
 
-monsters = generate_monsters(60)  # 调整初始病毒数量为60个（翻倍）
+def attach_monster_lights(monsters):
+    """Boss自带跟随光源，病毒移出游戏时由release_owner释放"""
+    for monster in monsters:
+        if monster.is_boss:
+            lighting_system.add_light(monster.x, monster.y, monster.size * 0.6, monster.color, owner=monster)
+
+world.monster_class = Monster
+world.monsters_added_listeners.append(attach_monster_lights)
+world.monster_removed_listeners.append(lighting_system.release_owner)
+world.populate(60, 1)  # 初始病毒60个（翻倍），回血包1个
+monster_sprites.prewarm(monster_sprite_entries(world.monsters))
 combat_cooldown = 0
 COMBAT_COOLDOWN_MAX = 30  # 战斗冷却时间（帧数）
-monster_spawn_timer = 0
-health_packs = generate_health_packs(1)  # 初始生成1个回血包
-health_pack_spawn_timer = 0
-
 
-# 迷宫生成函数
-def generate_maze(width, height):
-    # 初始化迷宫，1表示墙，0表示通道
-    maze = [[1 for _ in range(width)] for _ in range(height)]
-    
-    # 使用深度优先搜索算法生成迷宫（改用栈避免递归深度问题）
-    def carve_passages(x, y):
-        # 使用栈代替递归
-        stack = [(x, y)]
-        maze[y][x] = 0  # 标记起点为通道
-        
-        while stack:
-            cx, cy = stack[-1]  # 获取当前单元格
-            
-            # 随机选择方向：上、右、下、左
-            directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-            random.shuffle(directions)
-            
-            moved = False
-            for dx, dy in directions:
-                nx, ny = cx + dx*2, cy + dy*2
-                if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == 1:
-                    # 在两个单元格之间挖通道
-                    maze[cy + dy][cx + dx] = 0
-                    maze[ny][nx] = 0
-                    stack.append((nx, ny))
-                    moved = True
-                    break
-            
-            # 如果没有可移动的方向，回溯
-            if not moved:
-                stack.pop()
-    
-    # 从随机点开始生成
-    start_x = random.randrange(1, width, 2)
-    start_y = random.randrange(1, height, 2)
-    
-    # 确保起点是奇数坐标
-    if start_x % 2 == 0:
-        start_x -= 1
-    if start_y % 2 == 0:
-        start_y -= 1
-    
-    carve_passages(start_x, start_y)
-    
-    # 确保入口和出口
-    maze[1][1] = 0  # 入口附近
-    maze[height-2][width-2] = 0  # 出口附近
-    
-    # 添加一些额外的通道，使迷宫不那么复杂
-    for _ in range(width * height // 20):  # 添加约5%的额外通道
-        x = random.randrange(1, width-1)
-        y = random.randrange(1, height-1)
-        maze[y][x] = 0
-    
-    return maze
 
-# 迷宫绘制函数（优化版）
+# 迷宫绘制函数（分块预渲染版）
 def draw_maze(window, maze, camera_x, camera_y):
-    # 优化：使用更精确的可见区域计算
-    start_x = max(0, int(camera_x // CELL_SIZE) - 1)  # 加上边界缓冲
-    end_x = min(MAZE_WIDTH, int((camera_x + WINDOW_WIDTH) // CELL_SIZE + 2))
-    start_y = max(0, int(camera_y // CELL_SIZE) - 1)
-    end_y = min(MAZE_HEIGHT, int((camera_y + WINDOW_HEIGHT) // CELL_SIZE + 2))
-    
-    # 使用预渲染的墙壁纹理
-    global wall_texture_cache
-    if 'wall_texture_cache' not in globals():
-        wall_texture_cache = create_wall_texture()
-    
-    # 只绘制可见区域的单元格
-    for y in range(start_y, end_y):
-        for x in range(start_x, end_x):
-            if y < len(maze) and x < len(maze[0]) and maze[y][x] == 1:  # 墙
-                screen_x = x * CELL_SIZE - camera_x
-                screen_y = y * CELL_SIZE - camera_y
-                window.blit(wall_texture_cache, (screen_x, screen_y))
-
-def create_wall_texture():
-    """创建一次性预渲染的墙壁纹理"""
-    wall_surface = pygame.Surface((CELL_SIZE, CELL_SIZE))
-    
-    # 绘制基础墙壁
-    wall_surface.fill(WALL_COLOR)
-    
-    # 添加简化的纹理效果（减少随机元素）
-    texture_color = (30, 30, 120)
-    for i in range(0, CELL_SIZE, 8):  # 用固定模式替代随机
-        pygame.draw.line(wall_surface, texture_color, (i, 0), (i, CELL_SIZE), 1)
-        pygame.draw.line(wall_surface, texture_color, (0, i), (CELL_SIZE, i), 1)
-    
-    # 添加边缘高光
-    pygame.draw.line(wall_surface, (70, 70, 170), (0, 0), (CELL_SIZE, 0), 2)
-    pygame.draw.line(wall_surface, (70, 70, 170), (0, 0), (0, CELL_SIZE), 2)
-    
-    return wall_surface
+    # 背景、墙壁和游戏边框都已烘焙进迷宫块，每帧只需贴出摄像机范围内的几个块
+    maze_renderer.draw(window, camera_x, camera_y)
 
-# 生成迷宫
-maze = generate_maze(MAZE_WIDTH, MAZE_HEIGHT)
+# 迷宫分块渲染器（按16x16格切块，最多缓存16块）
+maze_renderer = world.get_maze_renderer()
+maze_renderer.prebake(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
 
 # Game loop
 running = True
 clock = pygame.time.Clock()
 
+# 固定步长模拟：移动、冷却、刷新计时等按tick计数的游戏逻辑固定以60Hz推进，与绘制帧率无关；
+# 绘制时在上一tick与当前tick的位置之间插值。慢的机器少画几帧但游戏速度不变，快的机器可以画到120/144帧
+SIM_TICK_RATE = 60
+MAX_SIM_STEPS_PER_FRAME = 5  # 单帧最多补5个tick
+RENDER_FPS_LIMIT = 144  # 绘制帧率上限（0为不限制）
+sim_clock = FixedTimestep(SIM_TICK_RATE, MAX_SIM_STEPS_PER_FRAME)
+frame_seconds = sim_clock.dt  # 上一帧的真实耗时（第一帧直接推进一个tick）
+prev_player_x, prev_player_y = player_x, player_y  # 上一tick的玩家位置（绘制插值用）
+
 # 计算初始速度（解决speed未定义问题）
 speed = 0
 
-# 初始化墙壁纹理缓存
-wall_texture_cache = create_wall_texture()
-
 # 2. 游戏平衡性优化
 DIFFICULTY_SCALING = {
     'monster_hp_multiplier': 1.1,  # 每次生成怪物时HP增加10%
@@ -1129,7 +650,7 @@ def save_game():
         'player_exp': player_exp,
         'player_hp': player_hp,
         'player_weapon': player_weapon.name,
-        'monsters_killed': len([m for m in monsters if not m.is_alive])
+        'monsters_killed': len([m for m in world.monsters if not m.is_alive])
     }
     with open('game_save.txt', 'w') as f:
         json.dump(game_state, f)
@@ -1145,13 +666,6 @@ def load_game():
 game_paused = False
 
 # 把这个函数定义移到其他函数（如generate_monsters）之前
-def is_in_view(x, y, camera_x, camera_y):
-    screen_x = x - camera_x
-    screen_y = y - camera_y
-    margin = CELL_SIZE * 2
-    return (-margin <= screen_x <= WINDOW_WIDTH + margin and 
-            -margin <= screen_y <= WINDOW_HEIGHT + margin)
-
 # 在文件顶部添加子弹类
 class Bullet:
     def __init__(self, x, y, direction, speed, color):
@@ -1171,8 +685,8 @@ class Bullet:
         screen_y = self.y - camera_y
         pygame.draw.circle(window, self.color, (int(screen_x), int(screen_y)), self.size)
 
-# 在Player properties部分添加子弹列表
-player_bullets = []
+# 子弹缓冲区（固定容量，数组存放位置/速度/伤害/寿命）由游戏世界持有
+player_bullets = world.bullets
 
 # 在文件顶部定义关卡数据
 LEVELS = {
@@ -1191,12 +705,48 @@ LEVELS = {
 current_level_index = 1  # 当前关卡索引，从1开始
 current_level = LEVELS[current_level_index]  # 当前关卡
 
+def snapshot_level(level_index):
+    """主线程（请求准备时）：复制出生点数据，记下已登记的贴图"""
+    return world.spawn_snapshot(), frozenset(monster_sprites.sprites)
+
+def prepare_level(level_index, snapshot):
+    """
+    后台线程：按快照在独立的数据池里生成该关的病毒，并为还没有的贴图解码、缩放出新的Surface（不转换格式）；
+    只读写快照和新建的对象，不碰世界、贴图登记表和资源缓存；退出游戏时在下一步之前停下（返回None）
+    """
+    spawn_snapshot, known_sprites = snapshot
+    monster_set = world.prepare_monsters(LEVELS[level_index]["monster_count"], spawn_snapshot)
+    sprite_entries = monster_sprite_entries(monster_set.monsters)
+    sprites = {}
+    for name, size, color in sprite_entries:
+        if level_preloader.stopping():
+            return None
+        if (name, size) not in known_sprites:
+            monster_img = assets.decode(resource_path(f"images/{name}.png"), (size, size))
+            sprites[(name, size)] = SpriteRegistry.render(monster_img, size, color)
+    return monster_set, sprite_entries, sprites
+
 def load_level(level_index):
+    """切换关卡：换入后台准备好的病毒（只替换引用），并开始在后台准备再下一关"""
     global current_level
     current_level = LEVELS[level_index]
-    # 生成怪物
-    monsters = generate_monsters(current_level["monster_count"])
-    return monsters
+    monster_set, sprite_entries, sprites = level_preloader.take(level_index)
+    swap_start = time.perf_counter()
+    for (name, size), sprite in sprites.items():
+        monster_sprites.add(name, size, sprite.convert_alpha())
+    monster_sprites.prewarm(sprite_entries)  # 补上阴影（以及后台之后才缺的贴图）
+    world.install_monsters(monster_set)
+    level_preloader.last_swap_ms = (time.perf_counter() - swap_start) * 1000.0
+    print(f"关卡{level_index}：后台准备 {level_preloader.last_prepare_ms:.1f} ms，"
+          f"切换时等待 {level_preloader.last_wait_ms:.1f} ms，换入 {level_preloader.last_swap_ms:.2f} ms")
+    if level_index + 1 < len(LEVELS):
+        level_preloader.request(level_index + 1)
+
+# 玩当前关时在后台准备下一关
+level_preloader = LevelPreloader(prepare_level, snapshot_level)
+level_preloader.request(current_level_index + 1)
+
+first_frame_ms = None  # 启动到第一帧画面显示的用时（毫秒）
 
 # 在Player properties部分添加player_angle
 player_angle = 0  # 初始化玩家角度
@@ -1227,7 +777,7 @@ class Dialogue:
 
     def draw(self, window):
         if self.is_active:
-            text = FONT_SMALL.render(self.messages[self.current_message_index], True, YELLOW)
+            text = text_cache.render(FONT_SMALL, self.messages[self.current_message_index], True, YELLOW)
             text_rect = text.get_rect()
             # 显示在屏幕顶部中央，带背景框
             x = (WINDOW_WIDTH - text_rect.width) // 2
@@ -1268,7 +818,7 @@ class Shop:
         pygame.draw.rect(window, (50, 50, 50), (shop_x, shop_y, shop_width, shop_height))
         pygame.draw.rect(window, WHITE, (shop_x, shop_y, shop_width, shop_height), 3)
 
-        title_text = FONT_LARGE.render("商店 (按S关闭)", True, WHITE)
+        title_text = text_cache.render(FONT_LARGE, "商店 (按S关闭)", True, WHITE)
         window.blit(title_text, (shop_x + 10, shop_y + 10))
 
         y_offset = shop_y + 50
@@ -1278,8 +828,8 @@ class Shop:
             desc_text = f"    {item_info['description']}"
 
             color = GREEN if player_exp >= item_info['cost'] else RED
-            item_surface = FONT_LARGE.render(item_text, True, color)
-            desc_surface = FONT_SMALL.render(desc_text, True, WHITE)
+            item_surface = text_cache.render(FONT_LARGE, item_text, True, color)
+            desc_surface = text_cache.render(FONT_SMALL, desc_text, True, WHITE)
 
             window.blit(item_surface, (shop_x + 10, y_offset))
             window.blit(desc_surface, (shop_x + 10, y_offset + 30))
@@ -1320,40 +870,10 @@ player_monster_dialogue.add_message("发现病毒入侵！")
 player_monster_dialogue.add_message("准备消灭它们！")
 
 # 在适当的地方启动对话，例如在玩家接近病毒时
-for monster in monsters:
+for monster in world.monsters:
     if monster.check_collision(player_x, player_y, player_size):
         player_monster_dialogue.start()
 
-def find_safe_spawn_position(start_x, start_y, maze):
-    """寻找一个不在墙内的安全重生位置"""
-    # 首先检查起始位置是否安全
-    if not check_collision_with_maze(start_x, start_y, player_size, maze):
-        return start_x, start_y
-
-    # 螺旋搜索安全位置
-    search_radius = CELL_SIZE
-    max_radius = CELL_SIZE * 20  # 最大搜索半径
-
-    while search_radius <= max_radius:
-        # 在当前半径上搜索8个方向
-        for angle in range(0, 360, 45):
-            radian = math.radians(angle)
-            test_x = start_x + math.cos(radian) * search_radius
-            test_y = start_y + math.sin(radian) * search_radius
-
-            # 确保在游戏边界内
-            test_x = max(CELL_SIZE * 2, min(GAME_WIDTH - CELL_SIZE * 2, test_x))
-            test_y = max(CELL_SIZE * 2, min(GAME_HEIGHT - CELL_SIZE * 2, test_y))
-
-            # 检查是否安全
-            if not check_collision_with_maze(test_x, test_y, player_size, maze):
-                return test_x, test_y
-
-        search_radius += CELL_SIZE // 2
-
-    # 如果找不到安全位置，返回迷宫入口附近
-    return CELL_SIZE * 1.5, CELL_SIZE * 1.5
-
 def respawn_player():
     global player_x, player_y, player_hp, player_is_hit, player_hit_timer
 
@@ -1362,7 +882,7 @@ def respawn_player():
     target_y = GAME_HEIGHT // 2
 
     # 寻找安全的重生位置
-    safe_x, safe_y = find_safe_spawn_position(target_x, target_y, maze)
+    safe_x, safe_y = world.find_safe_spawn_position(target_x, target_y, player_size)
     player_x = safe_x
     player_y = safe_y
 
@@ -1377,6 +897,7 @@ shop = Shop()
 
 # 在游戏主循环中处理对话和战斗逻辑
 while running:
+    frame_profiler.start_frame()
     # 事件处理
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -1397,22 +918,17 @@ while running:
                 continue
             if event.key == pygame.K_ESCAPE:
                 running = False
+            elif event.key == pygame.K_F3:  # 按F3键切换性能分析叠加层
+                frame_profiler.toggle()
+            elif event.key == pygame.K_TAB:  # 按TAB键切换全图
+                minimap.overview = not minimap.overview
             elif event.key == pygame.K_l:  # 按L键切换穿墙模式
                 no_clip_mode = not no_clip_mode  # 切换穿墙状态
                 
                 # 添加穿墙特效
                 effect_color = (0, 255, 255) if no_clip_mode else (255, 255, 255)  # 青色或白色
-                for _ in range(20):
-                    angle = random.uniform(0, math.pi * 2)
-                    distance = random.uniform(15, 40)
-                    particle_system.add_particle(
-                        player_x + math.cos(angle) * distance,
-                        player_y + math.sin(angle) * distance,
-                        (*effect_color, 200),  # 特效颜色
-                        math.cos(angle) * 2,
-                        math.sin(angle) * 2,
-                        30, 3, 0.9, 0
-                    )
+                particle_system.add_burst(20, player_x, player_y, (*effect_color, 200),  # 特效颜色
+                                          speed=2, lifetime=30, size=3, decay=0.9, gravity=0, spawn_distance=(15, 40))
                 
                 # 添加状态视觉指示
                 skill_effects.append({
@@ -1433,17 +949,8 @@ while running:
                 player_attack = player_base_attack + player_weapon.attack_bonus  # 更新总攻击力
                 
                 # 添加加强特效
-                for _ in range(30):
-                    angle = random.uniform(0, math.pi * 2)
-                    distance = random.uniform(20, 60)
-                    particle_system.add_particle(
-                        player_x + math.cos(angle) * distance,
-                        player_y + math.sin(angle) * distance,
-                        (255, 215, 0, 200),  # 金色粒子
-                        math.cos(angle) * 3,
-                        math.sin(angle) * 3,
-                        40, 4, 0.95, 0
-                    )
+                particle_system.add_burst(30, player_x, player_y, (255, 215, 0, 200),  # 金色粒子
+                                          speed=3, lifetime=40, size=4, decay=0.95, gravity=0, spawn_distance=(20, 60))
                 
                 # 添加加强状态视觉效果
                 skill_effects.append({
@@ -1509,7 +1016,7 @@ while running:
                     next_y = max(player_size, min(GAME_HEIGHT - player_size, next_y))
                     
                     # 检查是否与迷宫墙壁碰撞
-                    if not no_clip_mode and check_collision_with_maze(next_x, next_y, player_size, maze):
+                    if not no_clip_mode and world.check_collision_with_maze(next_x, next_y, player_size):
                         # 如果碰撞墙壁，停止滑动
                         break
                     
@@ -1518,50 +1025,30 @@ while running:
                     
                     # 检测路径上的敌人
                     dash_range = 60  # 滑动范围（比冲撞范围小）
-                    for monster in monsters[:]:
+                    for monster in world.monster_grid.query_radius(player_x, player_y, dash_range):
                         if monster.is_alive:
-                            # 计算怪物到玩家当前位置的距离
-                            monster_distance = ((monster.x - player_x) ** 2 + (monster.y - player_y) ** 2) ** 0.5
+                            # 对怪物造成伤害
+                            total_attack = int((player_base_attack + player_weapon.attack_bonus) * 1.2)  # 滑动伤害为普通攻击的1.2倍
+                            monster.take_damage(total_attack)
                             
-                            # 如果怪物在滑动范围内
-                            if monster_distance <= dash_range:
-                                # 对怪物造成伤害
-                                total_attack = int((player_base_attack + player_weapon.attack_bonus) * 1.2)  # 滑动伤害为普通攻击的1.2倍
-                                monster.take_damage(total_attack)
-                                
-                                # 添加击退效果（比冲撞小）
-                                knockback_distance = 15
-                                monster.x += dx * knockback_distance
-                                monster.y += dy * knockback_distance
-                                
-                                # 添加滑动击中特效
-                                for _ in range(8):
-                                    angle = random.uniform(0, math.pi * 2)
-                                    particle_system.add_particle(
-                                        monster.x + random.uniform(-8, 8),
-                                        monster.y + random.uniform(-8, 8),
-                                        (255, 255, 100, 200),  # 淡黄色滑动粒子
-                                        math.cos(angle) * 2,
-                                        math.sin(angle) * 2,
-                                        20, 3, 0.9, 0
-                                    )
-                                
-                                # 如果怪物死亡，获得经验值
-                                if not monster.is_alive:
-                                    player_exp += monster.exp_reward
-                                    trigger_virus_intro(monster.name)
+                            # 添加击退效果（比冲撞小）
+                            knockback_distance = 15
+                            monster.x += dx * knockback_distance
+                            monster.y += dy * knockback_distance
+                            world.monster_grid.update(monster)
+                            
+                            # 添加滑动击中特效
+                            particle_system.add_burst(8, monster.x, monster.y, (255, 255, 100, 200),  # 淡黄色滑动粒子
+                                                      speed=2, lifetime=20, size=3, decay=0.9, gravity=0, jitter=8)
+                            
+                            # 如果怪物死亡，获得经验值
+                            if not monster.is_alive:
+                                player_exp += monster.exp_reward
+                                trigger_virus_intro(monster.name)
 
-                                    # 添加死亡特效
-                                    for _ in range(15):
-                                        angle = random.uniform(0, math.pi * 2)
-                                        particle_system.add_particle(
-                                            monster.x,
-                                            monster.y,
-                                            (255, 255, 100, 200),  # 淡黄色粒子
-                                            math.cos(angle) * 4,
-                                            math.sin(angle) * 4,
-                                            25, 4, 0.95, 0
-                                        )
+                                # 添加死亡特效
+                                particle_system.add_burst(15, monster.x, monster.y, (255, 255, 100, 200),  # 淡黄色粒子
+                                                          speed=4, lifetime=25, size=4, decay=0.95, gravity=0)
                     
                     # 添加滑动轨迹特效
                     if step % 2 == 0:  # 每隔一帧添加特效以减少性能消耗
@@ -1586,17 +1073,8 @@ while running:
                 # 治疗效果
                 player_hp = min(player_hp + 50, player_max_hp)
                 # 添加治疗粒子效果
-                for _ in range(20):
-                    angle = random.uniform(0, math.pi * 2)
-                    distance = random.uniform(10, 40)
-                    particle_system.add_particle(
-                        player_x + math.cos(angle) * distance,
-                        player_y + math.sin(angle) * distance,
-                        (0, 255, 0, 200),  # 绿色粒子
-                        math.cos(angle) * 1.5,
-                        math.sin(angle) * 1.5,
-                        30, 3, 0.95, 0
-                    )
+                particle_system.add_burst(20, player_x, player_y, (0, 255, 0, 200),  # 绿色粒子
+                                          speed=1.5, lifetime=30, size=3, decay=0.95, gravity=0, spawn_distance=(10, 40))
                 skill_effects.append({
                     "x": player_x,
                     "y": player_y,
@@ -1671,33 +1149,23 @@ while running:
 
                 # 计算攻击范围内的敌人
                 attack_range = 60  # 攻击范围（根据用户记忆设为60像素）
-                for monster in monsters:
+                for monster in world.monster_grid.query_radius(player_x, player_y, attack_range):
                     if monster.is_alive:
-                        distance = ((player_x - monster.x) ** 2 + (player_y - monster.y) ** 2) ** 0.5
-                        if distance <= attack_range:
-                            # 对怪物造成伤害
-                            total_attack = player_base_attack + player_weapon.attack_bonus
-                            monster.take_damage(total_attack)
-                            
-                            # 添加攻击特效
-                            for _ in range(10):
-                                angle = random.uniform(0, math.pi * 2)
-                                particle_system.add_particle(
-                                    monster.x + random.uniform(-10, 10),
-                                    monster.y + random.uniform(-10, 10),
-                                    (255, 100, 100, 200),  # 红色攻击粒子
-                                    math.cos(angle) * 2,
-                                    math.sin(angle) * 2,
-                                    20, 3, 0.9, 0
-                                )
-                            
-                            # 如果怪物死亡，获得经验值
-                            if not monster.is_alive:
-                                player_exp += monster.exp_reward
-                                trigger_virus_intro(monster.name)
-                                # 随机掉落更好的武器
-                                if random.random() < 0.2:  # 20%的概率掉落武器
-                                    upgrade_weapon()
+                        # 对怪物造成伤害
+                        total_attack = player_base_attack + player_weapon.attack_bonus
+                        monster.take_damage(total_attack)
+                        
+                        # 添加攻击特效
+                        particle_system.add_burst(10, monster.x, monster.y, (255, 100, 100, 200),  # 红色攻击粒子
+                                                  speed=2, lifetime=20, size=3, decay=0.9, gravity=0, jitter=10)
+                        
+                        # 如果怪物死亡，获得经验值
+                        if not monster.is_alive:
+                            player_exp += monster.exp_reward
+                            trigger_virus_intro(monster.name)
+                            # 随机掉落更好的武器
+                            if random.random() < 0.2:  # 20%的概率掉落武器
+                                upgrade_weapon()
                 
                 # 添加攻击范围视觉效果
                 skill_effects.append({
@@ -1748,457 +1216,443 @@ while running:
             if event.key == pygame.K_LSHIFT:  # 松开Shift键停止冲刺
                 is_dashing = False  # 设置冲刺状态为False
 
-    # 处理玩家移动
-    if is_dashing:
-        player_speed = player_dash_speed  # 使用冲刺速度
-    else:
-        player_speed = 12  # 进一步增加基础速度
+    frame_profiler.mark('events')
 
-    # 计算下一个位置
-    next_x = player_x + player_velocity_x
-    next_y = player_y + player_velocity_y
+    # 如果游戏暂停，跳过更新逻辑
+    if game_paused:
+        # 只更新显示
+        pygame.display.flip()
+        clock.tick(RENDER_FPS_LIMIT)
+        frame_seconds = 0.0  # 暂停期间不累积模拟时间
+        continue
 
-    # 其他游戏逻辑...
+    # 按真实经过时间推进固定步长的模拟tick（可能是0个、1个或多个）
+    for sim_step in range(sim_clock.advance(frame_seconds)):
+        # 记录本tick开始时的位置，供绘制插值
+        prev_player_x, prev_player_y = player_x, player_y
+        world.monster_pool.snapshot_positions()
 
-    # 检查是否完成当前关卡
-    if len(monsters) == 0:  # 如果没有怪物，表示关卡完成
-        current_level_index += 1
-        if current_level_index < len(LEVELS):
-            load_level(current_level_index)  # 加载下一关卡
+        # 处理玩家移动
+        if is_dashing:
+            player_speed = player_dash_speed  # 使用冲刺速度
         else:
-            game_won = True  # 所有关卡完成，游戏胜利
+            player_speed = 12  # 进一步增加基础速度
 
-    # 这里移除了重复的子弹更新逻辑，因为在后面已经有了正确的子弹处理代码
+        # 计算下一个位置
+        next_x = player_x + player_velocity_x
+        next_y = player_y + player_velocity_y
 
-    # 其他游戏逻辑...
+        # 其他游戏逻辑...
 
-    # 如果游戏暂停，跳过更新逻辑
-    if game_paused:
-        # 只更新显示
-        pygame.display.flip()
-        clock.tick(60)
-        continue
+        # 检查是否完成当前关卡
+        if len(world.monsters) == 0:  # 如果没有怪物，表示关卡完成
+            current_level_index += 1
+            if current_level_index < len(LEVELS):
+                load_level(current_level_index)  # 加载下一关卡（后台已准备好）
+            else:
+                game_won = True  # 所有关卡完成，游戏胜利
+
+        # 这里移除了重复的子弹更新逻辑，因为在后面已经有了正确的子弹处理代码
 
-    # 病毒介绍显示期间暂停游戏逻辑（但仍然绘制画面）
-    if virus_intro_active:
-        virus_intro_timer += 1
+        # 其他游戏逻辑...
 
-    if not game_won and not game_over and not virus_intro_active and not virus_codex_active:
-        # Get key state
-        keys = pygame.key.get_pressed()
+        # 病毒介绍显示期间暂停游戏逻辑（但仍然绘制画面）
+        if virus_intro_active:
+            virus_intro_timer += 1
+
+        if not game_won and not game_over and not virus_intro_active and not virus_codex_active:
+            # Get key state
+            keys = pygame.key.get_pressed()
         
-        # Calculate next position with acceleration
-        acceleration_x = 0
-        acceleration_y = 0
+            # Calculate next position with acceleration
+            acceleration_x = 0
+            acceleration_y = 0
         
-        # 第一个玩家使用WASD键或方向键
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            acceleration_x -= player_acceleration
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            acceleration_x += player_acceleration
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
-            acceleration_y -= player_acceleration
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-            acceleration_y += player_acceleration
-
-        # 根据移动方向更新玩家朝向
-        if acceleration_x != 0 or acceleration_y != 0:
-            player_facing_angle = math.atan2(acceleration_y, acceleration_x)
+            # 第一个玩家使用WASD键或方向键
+            if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+                acceleration_x -= player_acceleration
+            if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+                acceleration_x += player_acceleration
+            if keys[pygame.K_w] or keys[pygame.K_UP]:
+                acceleration_y -= player_acceleration
+            if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+                acceleration_y += player_acceleration
+
+            # 根据移动方向更新玩家朝向
+            if acceleration_x != 0 or acceleration_y != 0:
+                player_facing_angle = math.atan2(acceleration_y, acceleration_x)
             
-        # 按住Shift键加速
-        if keys[pygame.K_LSHIFT] and player_dash_cooldown <= 0:
-            speed_multiplier = player_dash_speed / player_max_speed
-            player_velocity_x *= speed_multiplier
-            player_velocity_y *= speed_multiplier
-            player_dash_cooldown = DASH_COOLDOWN_MAX
+            # 按住Shift键加速
+            if keys[pygame.K_LSHIFT] and player_dash_cooldown <= 0:
+                speed_multiplier = player_dash_speed / player_max_speed
+                player_velocity_x *= speed_multiplier
+                player_velocity_y *= speed_multiplier
+                player_dash_cooldown = DASH_COOLDOWN_MAX
         
-        # 更新速度
-        player_velocity_x += acceleration_x
-        player_velocity_y += acceleration_y
+            # 更新速度
+            player_velocity_x += acceleration_x
+            player_velocity_y += acceleration_y
         
-        # 应用摩擦力
-        player_velocity_x *= player_friction
-        player_velocity_y *= player_friction
+            # 应用摩擦力
+            player_velocity_x *= player_friction
+            player_velocity_y *= player_friction
         
-        # 制最大速度
-        speed = (player_velocity_x ** 2 + player_velocity_y ** 2) ** 0.5
-        if speed > player_max_speed:
-            player_velocity_x = player_velocity_x / speed * player_max_speed
-            player_velocity_y = player_velocity_y / speed * player_max_speed
+            # 制最大速度
+            speed = (player_velocity_x ** 2 + player_velocity_y ** 2) ** 0.5
+            if speed > player_max_speed:
+                player_velocity_x = player_velocity_x / speed * player_max_speed
+                player_velocity_y = player_velocity_y / speed * player_max_speed
         
-        # 计算下一个位置
-        next_x = player_x + player_velocity_x
-        next_y = player_y + player_velocity_y
+            # 计算下一个位置
+            next_x = player_x + player_velocity_x
+            next_y = player_y + player_velocity_y
 
-        # 更新冲刺冷却
-        if player_dash_cooldown > 0:
-            player_dash_cooldown -= 1
+            # 更新冲刺冷却
+            if player_dash_cooldown > 0:
+                player_dash_cooldown -= 1
         
-        # 计算当前速度（解决speed未定义问题）
-        speed = (player_velocity_x ** 2 + player_velocity_y ** 2) ** 0.5
+            # 计算当前速度（解决speed未定义问题）
+            speed = (player_velocity_x ** 2 + player_velocity_y ** 2) ** 0.5
 
-        # 检查是否与迷宫墙壁碰撞（穿墙模式下跳过碰撞检测）
-        if no_clip_mode or not check_collision_with_maze(next_x, next_y, player_size, maze):
-            player_x = next_x
-            player_y = next_y
-        else:
-            # 尝试只在x或y方向移动
-            if not check_collision_with_maze(next_x, player_y, player_size, maze):
+            # 检查是否与迷宫墙壁碰撞（穿墙模式下跳过碰撞检测）
+            if no_clip_mode or not world.check_collision_with_maze(next_x, next_y, player_size):
                 player_x = next_x
-            elif not check_collision_with_maze(player_x, next_y, player_size, maze):
                 player_y = next_y
-            # 如果两个方向都不能移动，玩家保持原位
-            player_velocity_x = 0
-            player_velocity_y = 0
-        
-        # 确保玩家不会超出游戏边界
-        player_x = max(player_size // 2, min(GAME_WIDTH - player_size // 2, player_x))
-        player_y = max(player_size // 2, min(GAME_HEIGHT - player_size // 2, player_y))
-
-        # 更新相机位置（跟随玩家或鼠标拖拽控制）
-        if camera_follow_player:
-            camera_x = player_x - WINDOW_WIDTH // 2
-            camera_y = player_y - WINDOW_HEIGHT // 2
-            # 限制相机位置不超出游戏边界
-            camera_x = max(-WINDOW_WIDTH // 2, min(GAME_WIDTH - WINDOW_WIDTH // 2, camera_x))
-            camera_y = max(-WINDOW_HEIGHT // 2, min(GAME_HEIGHT - WINDOW_HEIGHT // 2, camera_y))
-
-        # 优化的怪物更新系统
-        alive_monsters = []
-        for monster in monsters:
-            if monster.is_alive:
-                # 只更新视野范围内的怪物
-                if is_in_view(monster.x, monster.y, camera_x, camera_y):
-                    monster.move_towards_player(player_x, player_y, maze)
-                elif ((monster.x - player_x) ** 2 + (monster.y - player_y) ** 2) < (CELL_SIZE * 8) ** 2:
-                    # 在追踪范围内但不在视野内的怪物，使用简化更新
-                    monster.move_towards_player(player_x, player_y, None)  # 不传递迷宫以减少计算
-                
-                monster.update_attack_cooldown()
-                alive_monsters.append(monster)
+            else:
+                # 尝试只在x或y方向移动
+                if not world.check_collision_with_maze(next_x, player_y, player_size):
+                    player_x = next_x
+                elif not world.check_collision_with_maze(player_x, next_y, player_size):
+                    player_y = next_y
+                # 如果两个方向都不能移动，玩家保持原位
+                player_velocity_x = 0
+                player_velocity_y = 0
         
-        monsters = alive_monsters
+            # 确保玩家不会超出游戏边界
+            player_x = max(player_size // 2, min(GAME_WIDTH - player_size // 2, player_x))
+            player_y = max(player_size // 2, min(GAME_HEIGHT - player_size // 2, player_y))
+
+            # 更新相机位置（跟随玩家或鼠标拖拽控制）
+            if camera_follow_player:
+                camera_x = player_x - WINDOW_WIDTH // 2
+                camera_y = player_y - WINDOW_HEIGHT // 2
+                # 限制相机位置不超出游戏边界
+                camera_x = max(-WINDOW_WIDTH // 2, min(GAME_WIDTH - WINDOW_WIDTH // 2, camera_x))
+                camera_y = max(-WINDOW_HEIGHT // 2, min(GAME_HEIGHT - WINDOW_HEIGHT // 2, camera_y))
+
+            frame_profiler.mark('player')
+
+            # 批量更新病毒移动（NumPy向量化）：按距离分级，近处每帧完整碰撞，
+            # 视野外按间隔低频推进，远处整批统计推进；之后清理死亡病毒
+            world.update_monsters(player_x, player_y, camera_x, camera_y)
+            if frame_profiler.enabled:  # 计数只在叠加层打开时才格式化
+                lod_counts = world.monster_lod.counts
+                frame_profiler.set_counter('病毒 近/中/远', "%d / %d / %d" % (
+                    lod_counts['near'], lod_counts['mid'], lod_counts['far']))
+                frame_profiler.set_counter('中档间隔', world.monster_lod.mid_stride)
+                frame_profiler.set_counter('关卡 准备/等待/换入 ms', "%.1f / %.1f / %.2f" % (
+                    level_preloader.last_prepare_ms, level_preloader.last_wait_ms, level_preloader.last_swap_ms))
+                ai_scheduler = world.ai_scheduler
+                frame_profiler.set_counter('AI 执行/顺延/最久等待', "%d / %d / %d" % (
+                    ai_scheduler.executed, ai_scheduler.deferred, ai_scheduler.worst_staleness()))
+            frame_profiler.mark('monsters')
         
-        # 处理怪物刷新
-        if len(monsters) < MIN_MONSTERS and monster_spawn_timer <= 0:
-            # 计算需刷新的怪物数量
-            spawn_count = min(MAX_MONSTERS - len(monsters), 
-                              random.randint(1, 2))  # 每次新1-2个怪物
-            # 生成新怪物
-            new_monsters = generate_monsters(spawn_count)
-            monsters.extend(new_monsters)
-            monster_spawn_timer = MONSTER_SPAWN_COOLDOWN  # 刷新冷却时间
-            
-        # 更新刷新计时器
-        if monster_spawn_timer > 0:
-            monster_spawn_timer -= 1
+            # 处理怪物刷新
+            world.update_spawning()
+
+            frame_profiler.mark('spawning')
 
-        # 处理怪物主动攻击玩家（不需要碰撞）
-        if combat_cooldown > 0:
-            combat_cooldown -= 1
+            # 处理怪物主动攻击玩家（不需要碰撞）
+            if combat_cooldown > 0:
+                combat_cooldown -= 1
             
-        # 怪物主动攻击逻辑
-        for monster in monsters:
-            # 攻击第一个玩家
-            if monster.can_attack_player(player_x, player_y) and monster.is_alive:
-                if monster.attack_player(player_x, player_y):
-                    # 怪物攻击玩家
-                    if not player_invincible:  # 检查玩家是否无敌
-                        damage = max(monster.attack - player_defense, 0)
-                        player_hp -= damage
-                        player_is_hit = True
-                        player_hit_timer = 30  # 闪烁持续30帧
-                        
-                        # 添加攻击特效
-                        for _ in range(10):
-                            angle = random.uniform(0, math.pi * 2)
-                            particle_system.add_particle(
-                                player_x + random.uniform(-10, 10),
-                                player_y + random.uniform(-10, 10),
-                                (255, 0, 0, 200),  # 红色攻击粒子
-                                math.cos(angle) * 2,
-                                math.sin(angle) * 2,
-                                20, 3, 0.9, 0
-                            )
-                    
-                    if player_hp <= 0:
-                        game_over = True
-                        break
+            # 怪物主动攻击逻辑（只检查攻击范围内的病毒）
+            for monster in world.monster_attacks(player_x, player_y):
+                # 怪物攻击玩家
+                if not player_invincible:  # 检查玩家是否无敌
+                    damage = max(monster.attack - player_defense, 0)
+                    player_hp -= damage
+                    player_is_hit = True
+                    player_hit_timer = 30  # 闪烁持续30帧
+
+                    # 添加攻击特效
+                    particle_system.add_burst(10, player_x, player_y, (255, 0, 0, 200),  # 红色攻击粒子
+                                              speed=2, lifetime=20, size=3, decay=0.9, gravity=0, jitter=10)
+
+                if player_hp <= 0:
+                    game_over = True
+                    break
 
-        # 处理回血包
-        for health_pack in health_packs:
-            if health_pack.active and health_pack.check_collision(player_x, player_y, player_size):
-                player_hp = min(player_hp + HEALTH_RESTORE_AMOUNT, player_max_hp)
-                health_pack.active = False
-        
-        # 清理已使用的回血包
-        health_packs = [hp for hp in health_packs if hp.active]
-        
-        # 处理回血包刷新
-        if len(health_packs) < MAX_HEALTH_PACKS and health_pack_spawn_timer <= 0:
-            spawn_count = min(MAX_HEALTH_PACKS - len(health_packs), 
-                              random.randint(1, 2))  # 每次刷新1-2个回血包
-            new_health_packs = generate_health_packs(spawn_count)
-            health_packs.extend(new_health_packs)
-            health_pack_spawn_timer = HEALTH_PACK_SPAWN_COOLDOWN
-        
-        # 更新回血包刷新计时器
-        if health_pack_spawn_timer > 0:
-            health_pack_spawn_timer -= 1
-
-        # 技能触发检测
-        for skill_name, skill in SKILLS.items():
-            if keys[skill["key"]] and player_skills_cooldown[skill_name] <= 0:
-                if skill_name == "Area Attack":
-                    # 范围攻击 - 触发挥剑效果
-                    weapon_is_swinging = True
-                    weapon_swing_timer = WEAPON_SWING_DURATION
-
-                    # 对范围内敌人造成伤害
-                    attack_range = skill["range"]
-                    for monster in monsters:
-                        if monster.is_alive:
-                            distance = ((player_x - monster.x) ** 2 + (player_y - monster.y) ** 2) ** 0.5
-                            if distance <= attack_range:
+            # 处理回血包（拾取、清理和刷新）
+            picked_packs = world.update_health_packs(player_x, player_y, player_size)
+            if picked_packs:
+                player_hp = min(player_hp + HEALTH_RESTORE_AMOUNT * picked_packs, player_max_hp)
+
+            # 技能触发检测
+            for skill_name, skill in SKILLS.items():
+                if keys[skill["key"]] and player_skills_cooldown[skill_name] <= 0:
+                    if skill_name == "Area Attack":
+                        # 范围攻击 - 触发挥剑效果
+                        weapon_is_swinging = True
+                        weapon_swing_timer = WEAPON_SWING_DURATION
+
+                        # 对范围内敌人造成伤害
+                        attack_range = skill["range"]
+                        for monster in world.monster_grid.query_radius(player_x, player_y, attack_range):
+                            if monster.is_alive:
                                 monster.take_damage(skill["damage"])
                                 # 添加攻击特效
-                                for _ in range(10):
-                                    angle = random.uniform(0, math.pi * 2)
-                                    particle_system.add_particle(
-                                        monster.x + random.uniform(-10, 10),
-                                        monster.y + random.uniform(-10, 10),
-                                        (255, 255, 100, 200),
-                                        math.cos(angle) * 2,
-                                        math.sin(angle) * 2,
-                                        20, 3, 0.9, 0
-                                    )
+                                particle_system.add_burst(10, monster.x, monster.y, (255, 255, 100, 200),
+                                                          speed=2, lifetime=20, size=3, decay=0.9, gravity=0, jitter=10)
                                 if not monster.is_alive:
                                     player_exp += monster.exp_reward
                                     trigger_virus_intro(monster.name)
 
-                    # 添加范围攻击视觉效果
-                    skill_effects.append({
-                        "x": player_x,
-                        "y": player_y,
-                        "range": attack_range,
-                        "color": skill["color"],
-                        "timer": 15
-                    })
-
-                elif skill_name == "Heal":
-                    # 治疗效果
-                    player_hp = min(player_hp + skill["heal"], player_max_hp)
-                    # 添加治疗粒子效果
-                    for _ in range(20):
-                        angle = random.uniform(0, math.pi * 2)
-                        distance = random.uniform(10, 40)
-                        particle_system.add_particle(
-                            player_x + math.cos(angle) * distance,
-                            player_y + math.sin(angle) * distance,
-                            (0, 255, 0, 200),  # 绿色粒子
-                            math.cos(angle) * 1.5,
-                            math.sin(angle) * 1.5,
-                            30, 3, 0.95, 0
-                        )
-                    skill_effects.append({
-                        "x": player_x,
-                        "y": player_y,
-                        "range": 50,
-                        "color": skill["color"],
-                        "timer": 30
-                    })
+                        # 添加范围攻击视觉效果
+                        skill_effects.append({
+                            "x": player_x,
+                            "y": player_y,
+                            "range": attack_range,
+                            "color": skill["color"],
+                            "timer": 15
+                        })
+
+                    elif skill_name == "Heal":
+                        # 治疗效果
+                        player_hp = min(player_hp + skill["heal"], player_max_hp)
+                        # 添加治疗粒子效果
+                        particle_system.add_burst(20, player_x, player_y, (0, 255, 0, 200),  # 绿色粒子
+                                                  speed=1.5, lifetime=30, size=3, decay=0.95, gravity=0, spawn_distance=(10, 40))
+                        skill_effects.append({
+                            "x": player_x,
+                            "y": player_y,
+                            "range": 50,
+                            "color": skill["color"],
+                            "timer": 30
+                        })
                 
-                elif skill_name == "Flash":
-                    # 闪现效果
-                    # 添加闪现粒子效果
-                    for _ in range(30):
-                        particle_system.add_particle(
-                            player_x, player_y,
-                            (200, 200, 255, 200),  # 蓝白色粒子
-                            random.uniform(-2, 2),
-                            random.uniform(-2, 2),
-                            20, 2, 0.9, 0
-                        )
-                    angle = math.atan2(next_y - player_y, next_x - player_x)
-                    flash_x = player_x + math.cos(angle) * skill["distance"]
-                    flash_y = player_y + math.sin(angle) * skill["distance"]
+                    elif skill_name == "Flash":
+                        # 闪现效果
+                        # 添加闪现粒子效果
+                        particle_system.add_burst(30, player_x, player_y, (200, 200, 255, 200),  # 蓝白色粒子
+                                                  speed=(0, 2), lifetime=20, size=2, decay=0.9, gravity=0)
+                        angle = math.atan2(next_y - player_y, next_x - player_x)
+                        flash_x = player_x + math.cos(angle) * skill["distance"]
+                        flash_y = player_y + math.sin(angle) * skill["distance"]
                     
-                    # 检查闪现目标位置是否有效 - 完善边界检查
-                    cell_x = int(flash_x) // CELL_SIZE
-                    cell_y = int(flash_y) // CELL_SIZE
+                        # 检查闪现目标位置是否有效 - 完善边界检查
+                        cell_x = int(flash_x) // CELL_SIZE
+                        cell_y = int(flash_y) // CELL_SIZE
                     
-                    # 确保不会闪现到地图外（使用迷宫的格子数量）
-                    cell_x = max(0, min(cell_x, MAZE_WIDTH - 1))
-                    cell_y = max(0, min(cell_y, MAZE_HEIGHT - 1))
+                        # 确保不会闪现到地图外（使用迷宫的格子数量）
+                        cell_x = max(0, min(cell_x, MAZE_WIDTH - 1))
+                        cell_y = max(0, min(cell_y, MAZE_HEIGHT - 1))
                     
-                    # 双重检查确保不越界
-                    if (0 <= cell_y < len(maze) and 0 <= cell_x < len(maze[0]) and 
-                        cell_y < MAZE_HEIGHT and cell_x < MAZE_WIDTH and
-                        maze[cell_y][cell_x] == 0):
-                        # 确保闪现的位置在格中心
-                        player_x = cell_x * CELL_SIZE + CELL_SIZE//2
-                        player_y = cell_y * CELL_SIZE + CELL_SIZE//2
+                        # 双重检查确保不越界
+                        if (0 <= cell_y < len(maze) and 0 <= cell_x < len(maze[0]) and 
+                            cell_y < MAZE_HEIGHT and cell_x < MAZE_WIDTH and
+                            maze[cell_y][cell_x] == 0):
+                            # 确保闪现的位置在格中心
+                            player_x = cell_x * CELL_SIZE + CELL_SIZE//2
+                            player_y = cell_y * CELL_SIZE + CELL_SIZE//2
+                            skill_effects.append({
+                                "x": player_x,
+                                "y": player_y,
+                                "range": 30,
+                                "color": skill["color"],
+                                "timer": 20
+                            })
+                
+                    elif skill_name == "Invincible":
+                        # 无敌效果
+                        player_invincible = True
+                        player_invincible_timer = skill["duration"]
                         skill_effects.append({
                             "x": player_x,
                             "y": player_y,
-                            "range": 30,
+                            "range": 40,
                             "color": skill["color"],
-                            "timer": 20
+                            "timer": skill["duration"]
                         })
                 
-                elif skill_name == "Invincible":
-                    # 无敌效果
-                    player_invincible = True
-                    player_invincible_timer = skill["duration"]
-                    skill_effects.append({
-                        "x": player_x,
-                        "y": player_y,
-                        "range": 40,
-                        "color": skill["color"],
-                        "timer": skill["duration"]
-                    })
-                
-                elif skill_name == "Multi Shot":
-                    # 多重射击效果（来自枪战.py的R键技能）
-                    # 获取鼠标位置作为射击方向
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    world_mouse_x = mouse_x + camera_x
-                    world_mouse_y = mouse_y + camera_y
+                    elif skill_name == "Multi Shot":
+                        # 多重射击效果（来自枪战.py的R键技能）
+                        # 获取鼠标位置作为射击方向
+                        mouse_x, mouse_y = pygame.mouse.get_pos()
+                        world_mouse_x = mouse_x + camera_x
+                        world_mouse_y = mouse_y + camera_y
                     
-                    # 计算射击角度
-                    dx = world_mouse_x - player_x
-                    dy = world_mouse_y - player_y
-                    base_angle = math.atan2(dy, dx)
+                        # 计算射击角度
+                        dx = world_mouse_x - player_x
+                        dy = world_mouse_y - player_y
+                        base_angle = math.atan2(dy, dx)
                     
-                    # 发射多颗子弹
-                    bullet_count = skill["bullet_count"]
-                    for i in range(bullet_count):
-                        spread_angle = (i * (0 / bullet_count)) * (math.pi / 180)  # 均匀分布在360度
+                        # 发射多颗子弹（一次性批量写入子弹缓冲区）
+                        bullet_count = skill["bullet_count"]
+                        spread_angles = np.arange(bullet_count) * (0 / bullet_count) * (math.pi / 180)  # 均匀分布在360度
                         bullet_speed = 15
-                        bullet_dx = math.cos(spread_angle) * bullet_speed
-                        bullet_dy = math.sin(spread_angle) * bullet_speed
-                        
-                        # 添加子弹到列表：[x, y, dx, dy, damage, lifetime]
-                        player_bullets.append([
-                            player_x, player_y, 
-                            bullet_dx, bullet_dy,
-                            skill["damage"], 120  # 2秒生命周期
-                        ])
-                    
-                    # 添加金色粒子特效
-                    for _ in range(50):
-                        angle = random.uniform(0, 2 * math.pi)
-                        speed = random.uniform(2, 5)
-                        particle_system.add_particle(
+                        player_bullets.spawn_batch(
                             player_x, player_y,
-                            skill["color"] + (200,),  # 添加alpha通道
-                            math.cos(angle) * speed,
-                            math.sin(angle) * speed,
-                            60, random.randint(3, 6), 0.95, 0
+                            np.cos(spread_angles) * bullet_speed,
+                            np.sin(spread_angles) * bullet_speed,
+                            skill["damage"], 120  # 2秒生命周期
                         )
                     
-                    # 添加技能特效
-                    skill_effects.append({
-                        "x": player_x,
-                        "y": player_y,
-                        "range": 80,
-                        "color": skill["color"],
-                        "timer": 60
-                    })
+                        # 添加金色粒子特效
+                        particle_system.add_burst(50, player_x, player_y, skill["color"],
+                                                  speed=(2, 5), lifetime=60, size=(3, 6), decay=0.95, gravity=0)
+                    
+                        # 添加技能特效
+                        skill_effects.append({
+                            "x": player_x,
+                            "y": player_y,
+                            "range": 80,
+                            "color": skill["color"],
+                            "timer": 60
+                        })
                 
-                player_skills_cooldown[skill_name] = skill["cooldown"]
+                    player_skills_cooldown[skill_name] = skill["cooldown"]
         
-        # 更新技能冷却和特效
-        for skill_name in player_skills_cooldown:
-            if player_skills_cooldown[skill_name] > 0:
-                player_skills_cooldown[skill_name] -= 1
+            # 更新技能冷却和特效
+            for skill_name in player_skills_cooldown:
+                if player_skills_cooldown[skill_name] > 0:
+                    player_skills_cooldown[skill_name] -= 1
         
-        # 更新无敌状态
-        if player_invincible_timer > 0:
-            player_invincible_timer -= 1
-            if player_invincible_timer <= 0:
-                player_invincible = False
+            # 更新无敌状态
+            if player_invincible_timer > 0:
+                player_invincible_timer -= 1
+                if player_invincible_timer <= 0:
+                    player_invincible = False
         
-        # 更新技能特效
-        skill_effects = [effect for effect in skill_effects if effect["timer"] > 0]
-        for effect in skill_effects:
-            effect["timer"] -= 1
+            # 更新技能特效：新特效补上光源，结束的特效释放光源
+            for effect in skill_effects:
+                if effect["timer"] <= 0:
+                    if "light" in effect:
+                        lighting_system.remove_light(effect["light"])
+                elif "light" not in effect:
+                    effect["light"] = lighting_system.add_light(effect["x"], effect["y"], effect["range"],
+                                                                effect["color"][:3])
+            skill_effects = [effect for effect in skill_effects if effect["timer"] > 0]
+            for effect in skill_effects:
+                effect["timer"] -= 1
         
-        # 更新子弹
-        for bullet in player_bullets[:]:
-            # 更新子弹位置
-            bullet[0] += bullet[2]  # x += dx
-            bullet[1] += bullet[3]  # y += dy
-            bullet[5] -= 1  # 减少生命周期
-            
-            # 移除超出边界或生命周期结束的子弹
-            if (bullet[0] < 0 or bullet[0] > GAME_WIDTH or 
-                bullet[1] < 0 or bullet[1] > GAME_HEIGHT or 
-                bullet[5] <= 0):
-                player_bullets.remove(bullet)
-                continue
-            
-            # 检查子弹是否击中怪物
-            for monster in monsters[:]:
-                if monster.is_alive:
-                    distance = ((bullet[0] - monster.x) ** 2 + (bullet[1] - monster.y) ** 2) ** 0.5
-                    if distance < monster.size // 2:
-                        # 对怪物造成伤害
-                        monster.take_damage(bullet[4])  # bullet[4] 是伤害值
-                        
-                        # 添加击中特效
-                        for _ in range(5):
-                            angle = random.uniform(0, math.pi * 2)
-                            particle_system.add_particle(
-                                monster.x + random.uniform(-10, 10),
-                                monster.y + random.uniform(-10, 10),
-                                (255, 100, 100, 200),  # 红色伤害粒子
-                                math.cos(angle) * 2,
-                                math.sin(angle) * 2,
-                                15, 3, 0.9, 0
-                            )
-                        
-                        # 移除子弹
-                        if bullet in player_bullets:
-                            player_bullets.remove(bullet)
-                        
-                        # 检查怪物是否死亡
-                        if not monster.is_alive:
-                            # 添加经验值
-                            player_exp += monster.exp_reward
-                            trigger_virus_intro(monster.name)
-                            # 检查是否升级
-                            while player_exp >= player_exp_to_next_level:
-                                player_level += 1
-                                player_exp -= player_exp_to_next_level
-                                player_exp_to_next_level = int(player_exp_to_next_level * 1.2)
-                                player_max_hp += 20
-                                player_hp = player_max_hp
-                                player_base_attack += 5
-                                player_defense += 2
-                                player_attack = player_base_attack + player_weapon.attack_bonus
-                        break
-
-    # Drawing
-    window.fill(BLACK)
+            frame_profiler.mark('combat')
+
+            # 更新子弹：整批移动（越界或生命周期结束的子弹交换删除），
+            # 批量检测击中，命中结果按子弹顺序逐个结算伤害
+            for monster, killed in world.update_bullets():
+                # 添加击中特效
+                particle_system.add_burst(5, monster.x, monster.y, (255, 100, 100, 200),  # 红色伤害粒子
+                                          speed=2, lifetime=15, size=3, decay=0.9, gravity=0, jitter=10)
+
+                # 检查怪物是否死亡
+                if killed:
+                    # 添加经验值
+                    player_exp += monster.exp_reward
+                    trigger_virus_intro(monster.name)
+                    # 检查是否升级
+                    while player_exp >= player_exp_to_next_level:
+                        player_level += 1
+                        player_exp -= player_exp_to_next_level
+                        player_exp_to_next_level = int(player_exp_to_next_level * 1.2)
+                        player_max_hp += 20
+                        player_hp = player_max_hp
+                        player_base_attack += 5
+                        player_defense += 2
+                        player_attack = player_base_attack + player_weapon.attack_bonus
 
-    # Draw background
-    pygame.draw.rect(window, (30, 30, 30), (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
-    
-    # 绘制迷宫
-    draw_maze(window, maze, camera_x, camera_y)
+        frame_profiler.mark('bullets')
+
+        # 突刺动画更新：蓄力抬起 → 快速扎下 → 缩回
+        if weapon_is_swinging:
+            weapon_swing_timer -= 1
+            swing_progress = 1 - (weapon_swing_timer / WEAPON_SWING_DURATION)
+            if swing_progress < 0.2:
+                # 蓄力阶段：注射器向后抬起
+                t = swing_progress / 0.2
+                weapon_thrust_offset = -8 * t       # 向后缩
+                weapon_swing_angle = -30 * t         # 向上抬起30度
+            elif swing_progress < 0.5:
+                # 突刺阶段：快速向前扎出
+                t = (swing_progress - 0.2) / 0.3
+                weapon_thrust_offset = -8 + 32 * t   # 从-8冲到+24
+                weapon_swing_angle = -30 + 45 * t     # 从-30转到+15（向下扎）
+            else:
+                # 回收阶段：缓慢缩回复位
+                t = (swing_progress - 0.5) / 0.5
+                weapon_thrust_offset = 24 * (1 - t)
+                weapon_swing_angle = 15 * (1 - t)
+            if weapon_swing_timer <= 0:
+                weapon_is_swinging = False
+                weapon_thrust_offset = 0
+                weapon_swing_angle = 0
+
+        # 更新玩家受伤计时器
+        if player_hit_timer > 0:
+            player_hit_timer -= 1 
+            if player_hit_timer == 0:
+                player_is_hit = False
     
-    # Draw game border
-    border_color = (50, 50, 50)
-    border_width = 5
-    pygame.draw.rect(window, border_color, 
-                     (-camera_x, -camera_y, GAME_WIDTH, GAME_HEIGHT), 
-                     border_width)
-
-    # 只渲染视野范围内的对象
-    for monster in monsters:
-        if is_in_view(monster.x, monster.y, camera_x, camera_y):
-            monster.draw(window, camera_x, camera_y)
+        # 更新粒子系统
+        particle_system.update()
+
+        # 更新玩家光源位置
+        if player_light_index is not None and player_light_index >= 0:
+            lighting_system.update_light(player_light_index, player_x, player_y)
+
+        # 检查玩家是否接近病毒并启动对话
+        for monster in world.monster_grid.query_radius(player_x, player_y, (player_size + MAX_MONSTER_RADIUS * 2) // 2):
+            if monster.check_collision(player_x, player_y, player_size):
+                if not player_monster_dialogue.is_active:
+                    player_monster_dialogue.start()
+        frame_profiler.mark('late_update')
+
+    # 绘制插值：上一tick与当前tick之间的比例，摄像机跟随插值后的玩家位置
+    interpolation = sim_clock.alpha
+    draw_player_x = prev_player_x + (player_x - prev_player_x) * interpolation
+    draw_player_y = prev_player_y + (player_y - prev_player_y) * interpolation
+    if camera_follow_player:
+        draw_camera_x = max(-WINDOW_WIDTH // 2, min(GAME_WIDTH - WINDOW_WIDTH // 2, draw_player_x - WINDOW_WIDTH // 2))
+        draw_camera_y = max(-WINDOW_HEIGHT // 2, min(GAME_HEIGHT - WINDOW_HEIGHT // 2, draw_player_y - WINDOW_HEIGHT // 2))
+    else:
+        draw_camera_x, draw_camera_y = camera_x, camera_y
+
+    # Drawing
+    # Draw background（迷宫以外的区域）
+    window.fill((30, 30, 30))
+
+    # 绘制迷宫（含游戏边框）
+    draw_maze(window, maze, draw_camera_x, draw_camera_y)
+    frame_profiler.mark('maze')
+
+    # 只渲染视野范围内的对象；开启迷雾时只画玩家看得见（视野圆内且没被墙挡住）的病毒
+    if field_of_view.update(draw_player_x, draw_player_y):
+        minimap.reveal(field_of_view.mask, field_of_view.origin_x, field_of_view.origin_y)
+        if FOG_OF_WAR_ENABLED:
+            fog_of_war.set_visibility(field_of_view.mask, field_of_view.origin_x, field_of_view.origin_y, CELL_SIZE)
+    # 病毒从空间索引里按画面矩形取（四周留出最大病毒半径）；开启迷雾时再和视野圆的外接方形取交集
+    view_left = draw_camera_x - MAX_MONSTER_RADIUS
+    view_top = draw_camera_y - MAX_MONSTER_RADIUS
+    view_right = draw_camera_x + WINDOW_WIDTH + MAX_MONSTER_RADIUS
+    view_bottom = draw_camera_y + WINDOW_HEIGHT + MAX_MONSTER_RADIUS
+    if FOG_OF_WAR_ENABLED:
+        reach = VISIBILITY_RADIUS + MAX_MONSTER_RADIUS
+        view_left = max(view_left, draw_player_x - reach)
+        view_top = max(view_top, draw_player_y - reach)
+        view_right = min(view_right, draw_player_x + reach)
+        view_bottom = min(view_bottom, draw_player_y + reach)
+    drawn_monsters = 0
+    for monster in world.monster_grid.query_rect(view_left, view_top,
+                                                 max(view_right - view_left, 0), max(view_bottom - view_top, 0)):
+        if FOG_OF_WAR_ENABLED and not field_of_view.is_visible(monster.x, monster.y, monster.size // 2):
+            continue
+        monster.draw(window, draw_camera_x, draw_camera_y, interpolation)
+        drawn_monsters += 1
+    if frame_profiler.enabled:
+        frame_profiler.set_counter('视野 绘制病毒/缓存格', "%d / %d" % (drawn_monsters, len(field_of_view.cache)))
+        frame_profiler.set_counter('病毒贴图 张数/KiB', "%d / %d" % (
+            len(monster_sprites.sprites), monster_sprites.memory_bytes() // 1024))
+    frame_profiler.mark('monster_draw')
 
     # 判断玩家朝向（四个方向：右、左、上、下）
     angle_deg = math.degrees(player_facing_angle)
@@ -2226,41 +1680,17 @@ while running:
                 display_player = pygame.transform.flip(player_image, True, False)
             else:
                 display_player = player_image
-            player_rect = display_player.get_rect(center=(player_x - camera_x, player_y - camera_y))
+            player_rect = display_player.get_rect(center=(draw_player_x - draw_camera_x, draw_player_y - draw_camera_y))
             window.blit(display_player, player_rect)
         else:
             # 备用：绘制玩家本体（黄色圆形）
             pygame.draw.circle(window, YELLOW,
-                             (player_x - camera_x, player_y - camera_y),
+                             (draw_player_x - draw_camera_x, draw_player_y - draw_camera_y),
                              player_size // 2)
 
     # 绘制武器（注射器突刺动画）
-    screen_player_x = player_x - camera_x
-    screen_player_y = player_y - camera_y
-
-    # 突刺动画更新：蓄力抬起 → 快速扎下 → 缩回
-    if weapon_is_swinging:
-        weapon_swing_timer -= 1
-        swing_progress = 1 - (weapon_swing_timer / WEAPON_SWING_DURATION)
-        if swing_progress < 0.2:
-            # 蓄力阶段：注射器向后抬起
-            t = swing_progress / 0.2
-            weapon_thrust_offset = -8 * t       # 向后缩
-            weapon_swing_angle = -30 * t         # 向上抬起30度
-        elif swing_progress < 0.5:
-            # 突刺阶段：快速向前扎出
-            t = (swing_progress - 0.2) / 0.3
-            weapon_thrust_offset = -8 + 32 * t   # 从-8冲到+24
-            weapon_swing_angle = -30 + 45 * t     # 从-30转到+15（向下扎）
-        else:
-            # 回收阶段：缓慢缩回复位
-            t = (swing_progress - 0.5) / 0.5
-            weapon_thrust_offset = 24 * (1 - t)
-            weapon_swing_angle = 15 * (1 - t)
-        if weapon_swing_timer <= 0:
-            weapon_is_swinging = False
-            weapon_thrust_offset = 0
-            weapon_swing_angle = 0
+    screen_player_x = draw_player_x - draw_camera_x
+    screen_player_y = draw_player_y - draw_camera_y
 
     # 判断朝左还是朝右
     facing_left = player_direction == "left" or player_direction == "up"
@@ -2322,61 +1752,41 @@ while running:
                          int(tip_y + extra * math.sin(jab_angle))), 1)
 
     # Draw health packs
-    for health_pack in health_packs:
-        health_pack.draw(window, camera_x, camera_y)
+    for health_pack in world.health_packs:
+        health_pack.draw(window, draw_camera_x, draw_camera_y)
     
-    # 绘制子弹
-    for bullet in player_bullets:
-        screen_x = bullet[0] - camera_x
-        screen_y = bullet[1] - camera_y
-        
-        # 绘制子弹主体
-        pygame.draw.circle(window, (255, 255, 0),  # 黄色子弹
-                          (int(screen_x), int(screen_y)), 4)
-        
-        # 添加子弹光晕效果
-        glow_surface = pygame.Surface((16, 16), pygame.SRCALPHA)
-        for radius in range(8, 0, -2):
-            alpha = int(100 * (radius / 8))
-            pygame.draw.circle(glow_surface, (255, 255, 100, alpha),
-                             (8, 8), radius)
-        window.blit(glow_surface, (int(screen_x) - 8, int(screen_y) - 8))
+    # 绘制子弹（预渲染贴图，屏幕内的子弹一次blits批量绘制）
+    player_bullets.draw(window, draw_camera_x, draw_camera_y, interpolation)
+    frame_profiler.mark('entity_draw')
 
     # 绘制战争迷雾效果（只在玩家周围光圈范围内显示内容）
     if FOG_OF_WAR_ENABLED:
-        # 创建一个全屏的黑色表面
-        fog_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        fog_surface.fill((0, 0, 0, 200))  # 半透明黑色
-        
-        # 在玩家视野范围内创建一个透明圆形区域
-        player_screen_x = player_x - camera_x
-        player_screen_y = player_y - camera_y
-        
-        # 创建视野圆形区域（透明）
-        pygame.draw.circle(fog_surface, (0, 0, 0, 0), 
-                          (int(player_screen_x), int(player_screen_y)), 
-                          VISIBILITY_RADIUS)
-        
-        # 将迷雾表面绘制到窗口上
-        window.blit(fog_surface, (0, 0))
+        fog_of_war.draw(window, draw_player_x - draw_camera_x, draw_player_y - draw_camera_y,
+                        draw_camera_x, draw_camera_y)
+    frame_profiler.mark('fog')
 
     # 更新相机位置
-    camera.update(camera_x, camera_y)
+    camera.update(draw_camera_x, draw_camera_y)
 
     # 绘制粒子效果
     particle_system.draw(window, camera)
+    frame_profiler.mark('particles')
 
     # 绘制光照效果（在UI之前绘制）
     lighting_system.draw(window, camera)
+    if frame_profiler.enabled:
+        frame_profiler.set_counter('光照渐变 命中/未命中/淘汰', "%d / %d / %d" % lighting_system.gradient_stats()[:3])
+        frame_profiler.set_counter('光源 总数/瓦片', "%d / %d" % (len(lighting_system.lights), len(lighting_system.tiles)))
+    frame_profiler.mark('lighting')
 
     # Draw game over message
     if game_over:
-        text = FONT_TITLE.render('游戏结束! 按R复活', True, RED)
+        text = text_cache.render(get_title_font(), '游戏结束! 按R复活', True, RED)
         text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
         window.blit(text, text_rect)
 
         pygame.display.flip()
-        clock.tick(60)
+        frame_seconds = clock.tick(RENDER_FPS_LIMIT) / 1000.0
         continue
 
     # 优化的UI显示系统
@@ -2385,7 +1795,7 @@ while running:
 
     # 生命值显示（添加颜色反馈）
     hp_color = GREEN if player_hp > player_max_hp * 0.6 else YELLOW if player_hp > player_max_hp * 0.3 else RED
-    hp_text = font.render(f'生命: {player_hp}/{player_max_hp}', True, hp_color)
+    hp_text = text_cache.render(font, f'生命: {player_hp}/{player_max_hp}', True, hp_color)
     window.blit(hp_text, (10, 8))
 
     # 生命值条
@@ -2399,7 +1809,7 @@ while running:
     level_offset = 48
 
     # 等级和免疫力显示
-    level_text = font_small.render(f'等级: {player_level}  免疫力: {player_exp}/{player_exp_to_next_level}', True, WHITE)
+    level_text = text_cache.render(font_small, f'等级: {player_level}  免疫力: {player_exp}/{player_exp_to_next_level}', True, WHITE)
     window.blit(level_text, (10, level_offset))
 
     # 免疫力条
@@ -2413,7 +1823,7 @@ while running:
 
     # 武器信息
     weapon_y = exp_bar_y + 14
-    weapon_text = font_small.render(f'武器: {player_weapon.name}  攻击: {player_attack}', True, YELLOW)
+    weapon_text = text_cache.render(font_small, f'武器: {player_weapon.name}  攻击: {player_attack}', True, YELLOW)
     window.blit(weapon_text, (10, weapon_y))
 
     # Draw skill effects
@@ -2438,15 +1848,15 @@ while running:
             pygame.draw.circle(effect_surface, color_with_alpha,
                              (effect["range"], effect["range"]), effect["range"])
             window.blit(effect_surface, 
-                       (effect["x"] - effect["range"] - camera_x,
-                        effect["y"] - effect["range"] - camera_y))
+                       (effect["x"] - effect["range"] - draw_camera_x,
+                        effect["y"] - effect["range"] - draw_camera_y))
         except ValueError:
             print(f"Invalid color value: {color_with_alpha}")
             continue
 
     # 优化的技能冷却显示
     y_offset = 100
-    skill_title = font_small.render('技能:', True, WHITE)
+    skill_title = text_cache.render(font_small, '技能:', True, WHITE)
     window.blit(skill_title, (10, y_offset))
     y_offset += 18
 
@@ -2492,20 +1902,20 @@ while running:
             status_color = GREEN
 
         # 第一行：按键、名称、等级、状态
-        line1 = FONT_TINY.render(f'[{key_name}] {skill_cn} Lv{skill_level}: {status_text}', True, status_color)
+        line1 = text_cache.render(FONT_TINY, f'[{key_name}] {skill_cn} Lv{skill_level}: {status_text}', True, status_color)
         window.blit(line1, (10, y_offset))
         y_offset += 14
 
         # 第二行：技能详情（较小字体，灰色）
-        line2 = FONT_TINY.render(f'    {skill_desc}', True, (180, 180, 180))
+        line2 = text_cache.render(FONT_TINY, f'    {skill_desc}', True, (180, 180, 180))
         window.blit(line2, (10, y_offset))
         y_offset += 16
 
     # 冲刺冷却显示
     if player_dash_cooldown > 0:
-        dash_text = FONT_TINY.render(f'[SHIFT] 冲刺: {player_dash_cooldown//60 + 1}秒', True, RED)
+        dash_text = text_cache.render(FONT_TINY, f'[SHIFT] 冲刺: {player_dash_cooldown//60 + 1}秒', True, RED)
     else:
-        dash_text = FONT_TINY.render('[SHIFT] 冲刺: 就绪', True, GREEN)
+        dash_text = text_cache.render(FONT_TINY, '[SHIFT] 冲刺: 就绪', True, GREEN)
     window.blit(dash_text, (10, y_offset))
     y_offset += 16
 
@@ -2518,64 +1928,26 @@ while running:
         {"key": "O", "name": "升级武器", "desc": "提升武器等级"},
         {"key": "K", "name": "降级武器", "desc": "降低武器等级"},
         {"key": "U", "name": "升级技能", "desc": f"消耗{SKILL_UPGRADE_COST}免疫力"},
+        {"key": "TAB", "name": "全图", "desc": f"已探索{minimap.explored_ratio():.0%}"},
     ]
 
     for skill in other_skills:
-        line = FONT_TINY.render(f"[{skill['key']}] {skill['name']}: {skill['desc']}", True, (200, 200, 200))
+        line = text_cache.render(FONT_TINY, f"[{skill['key']}] {skill['name']}: {skill['desc']}", True, (200, 200, 200))
         window.blit(line, (10, y_offset))
         y_offset += 15
 
-    # 小地图显示（右上角）- 显示玩家周围区域
-    minimap_size = 120
-    minimap_x = WINDOW_WIDTH - minimap_size - 10
-    minimap_y = 10
-    minimap_range = 800  # 小地图显示的实际游戏范围（像素）
-
-    # 创建小地图表面
-    minimap_surface = pygame.Surface((minimap_size, minimap_size), pygame.SRCALPHA)
-    minimap_surface.fill((20, 20, 30, 200))  # 半透明深色背景
-
-    # 计算小地图显示区域（以玩家为中心）
-    map_left = player_x - minimap_range // 2
-    map_top = player_y - minimap_range // 2
-    scale = minimap_size / minimap_range
-
-    # 绘制迷宫墙壁（简化显示）
-    wall_start_x = max(0, int(map_left // CELL_SIZE))
-    wall_end_x = min(MAZE_WIDTH, int((map_left + minimap_range) // CELL_SIZE) + 1)
-    wall_start_y = max(0, int(map_top // CELL_SIZE))
-    wall_end_y = min(MAZE_HEIGHT, int((map_top + minimap_range) // CELL_SIZE) + 1)
-
-    for y in range(wall_start_y, wall_end_y):
-        for x in range(wall_start_x, wall_end_x):
-            if maze[y][x] == 1:  # 墙壁
-                wall_screen_x = int((x * CELL_SIZE - map_left) * scale)
-                wall_screen_y = int((y * CELL_SIZE - map_top) * scale)
-                wall_size = max(2, int(CELL_SIZE * scale))
-                if 0 <= wall_screen_x < minimap_size and 0 <= wall_screen_y < minimap_size:
-                    pygame.draw.rect(minimap_surface, (60, 60, 80),
-                                   (wall_screen_x, wall_screen_y, wall_size, wall_size))
-
-    # 绘制怪物（显示范围内的所有怪物）
-    for monster in monsters:
-        if monster.is_alive:
-            mx = int((monster.x - map_left) * scale)
-            my = int((monster.y - map_top) * scale)
-            if 0 <= mx < minimap_size and 0 <= my < minimap_size:
-                color = (255, 100, 100) if monster.is_boss else (255, 80, 80)
-                size = 3 if monster.is_boss else 2
-                pygame.draw.circle(minimap_surface, color, (mx, my), size)
-
-    # 绘制玩家（始终在中心）
-    player_mx = minimap_size // 2
-    player_my = minimap_size // 2
-    pygame.draw.circle(minimap_surface, (100, 255, 100), (player_mx, player_my), 4)
-    pygame.draw.circle(minimap_surface, WHITE, (player_mx, player_my), 4, 1)
-
-    # 绘制小地图到窗口
-    window.blit(minimap_surface, (minimap_x, minimap_y))
-    pygame.draw.rect(window, (100, 100, 120), (minimap_x, minimap_y, minimap_size, minimap_size), 2)
+    frame_profiler.mark('hud')
 
+    # 小地图显示（右上角）- 显示玩家周围区域；全图模式下把整张迷宫画在屏幕中央
+    if minimap.overview:
+        minimap_dots = minimap.draw_overview(window, draw_player_x, draw_player_y, world.monster_grid,
+                                             draw_camera_x, draw_camera_y, WINDOW_WIDTH, WINDOW_HEIGHT)
+    else:
+        minimap_dots = minimap.draw(window, draw_player_x, draw_player_y, world.monster_grid,
+                                    WINDOW_WIDTH - minimap.size - 10, 10)
+    if frame_profiler.enabled:
+        frame_profiler.set_counter('小地图 病毒点/已探索', "%d / %.0f%%" % (minimap_dots, minimap.explored_ratio() * 100))
+    frame_profiler.mark('minimap')
 
     # 绘制对话
     player_monster_dialogue.draw(window)
@@ -2585,27 +1957,27 @@ while running:
 
     # 相机状态指示
     if mouse_dragging:
-        status_text = FONT_TINY.render("拖拽视角中... | 右键释放恢复跟随", True, GREEN)
+        status_text = text_cache.render(FONT_TINY, "拖拽视角中... | 右键释放恢复跟随", True, GREEN)
     elif camera_follow_player:
-        status_text = FONT_TINY.render("跟随模式 | 右键拖拽视角", True, WHITE)
+        status_text = text_cache.render(FONT_TINY, "跟随模式 | 右键拖拽视角", True, WHITE)
     else:
-        status_text = FONT_TINY.render("自由视角 | 右键恢复跟随", True, YELLOW)
+        status_text = text_cache.render(FONT_TINY, "自由视角 | 右键恢复跟随", True, YELLOW)
     window.blit(status_text, (10, status_y))
 
     # 攻击控制说明
-    attack_text = FONT_TINY.render("左键:近战 | M:加强", True, WHITE)
+    attack_text = text_cache.render(FONT_TINY, "左键:近战 | M:加强", True, WHITE)
     window.blit(attack_text, (10, status_y + 16))
 
     # 游戏统计信息
-    alive_monsters = len([m for m in monsters if m.is_alive])
-    stats_text = FONT_TINY.render(f"病毒: {alive_monsters}/{MAX_MONSTERS} | 关卡: {current_level_index}", True, GOLD)
+    alive_monsters = len([m for m in world.monsters if m.is_alive])
+    stats_text = text_cache.render(FONT_TINY, f"病毒: {alive_monsters}/{MAX_MONSTERS} | 关卡: {current_level_index}", True, GOLD)
     window.blit(stats_text, (10, status_y + 32))
 
     # ========== 右下角病毒统计面板 ==========
     # 统计各类病毒数量
     virus_counts = {}
     boss_counts = {}
-    for monster in monsters:
+    for monster in world.monsters:
         if monster.is_alive:
             if monster.is_boss:
                 boss_counts[monster.name] = boss_counts.get(monster.name, 0) + 1
@@ -2635,7 +2007,7 @@ while running:
     pygame.draw.rect(panel_surface, (40, 80, 120, 200), (0, 20, panel_width, 10))  # 补齐下方圆角
 
     # 标题文字
-    title_text = FONT_SMALL.render("病毒统计", True, (100, 220, 255))
+    title_text = text_cache.render(FONT_SMALL, "病毒统计", True, (100, 220, 255))
     title_x = (panel_width - title_text.get_width()) // 2
     panel_surface.blit(title_text, (title_x, 5))
 
@@ -2646,10 +2018,10 @@ while running:
     # 总计信息
     total_virus = sum(virus_counts.values())
     total_boss = sum(boss_counts.values())
-    total_text = FONT_TINY.render(f"存活: {total_virus + total_boss}", True, (255, 220, 100))
+    total_text = text_cache.render(FONT_TINY, f"存活: {total_virus + total_boss}", True, (255, 220, 100))
     panel_surface.blit(total_text, (10, content_y))
 
-    killed_text = FONT_TINY.render(f"已消灭: {player_exp // 10}", True, (100, 255, 150))
+    killed_text = text_cache.render(FONT_TINY, f"已消灭: {player_exp // 10}", True, (100, 255, 150))
     panel_surface.blit(killed_text, (100, content_y))
     content_y += line_height + 5
 
@@ -2684,11 +2056,11 @@ while running:
 
         # 病毒名称（截断显示）
         display_name = virus_name[:4] if len(virus_name) > 4 else virus_name
-        name_text = FONT_TINY.render(display_name, True, (220, 220, 220))
+        name_text = text_cache.render(FONT_TINY, display_name, True, (220, 220, 220))
         panel_surface.blit(name_text, (28, content_y))
 
         # 数量
-        count_text = FONT_TINY.render(f"x{count}", True, color)
+        count_text = text_cache.render(FONT_TINY, f"x{count}", True, color)
         panel_surface.blit(count_text, (panel_width - 40, content_y))
 
         content_y += line_height
@@ -2706,23 +2078,25 @@ while running:
             pygame.draw.circle(panel_surface, (255, 200, 100), (18, content_y + 6), 6, 1)
 
             display_name = boss_name[:4] if len(boss_name) > 4 else boss_name
-            boss_text = FONT_TINY.render(display_name, True, (255, 100, 100))
+            boss_text = text_cache.render(FONT_TINY, display_name, True, (255, 100, 100))
             panel_surface.blit(boss_text, (28, content_y))
 
-            count_text = FONT_TINY.render(f"x{count}", True, (255, 150, 100))
+            count_text = text_cache.render(FONT_TINY, f"x{count}", True, (255, 150, 100))
             panel_surface.blit(count_text, (panel_width - 40, content_y))
             content_y += line_height
 
     # 绘制面板到窗口
     window.blit(panel_surface, (panel_x, panel_y))
 
+    frame_profiler.mark('stats_panel')
+
     # ========== 右下角图鉴按钮 ==========
     mouse_x, mouse_y = pygame.mouse.get_pos()
     codex_hovered = virus_codex_button_rect.collidepoint(mouse_x, mouse_y)
     codex_btn_color = (55, 130, 185) if codex_hovered and not virus_codex_active else (40, 100, 155)
     pygame.draw.rect(window, codex_btn_color, virus_codex_button_rect, border_radius=8)
     pygame.draw.rect(window, (140, 220, 255), virus_codex_button_rect, 2, border_radius=8)
-    codex_btn_text = FONT_SMALL.render("图鉴", True, (240, 250, 255))
+    codex_btn_text = text_cache.render(FONT_SMALL, "图鉴", True, (240, 250, 255))
     codex_btn_rect = codex_btn_text.get_rect(center=virus_codex_button_rect.center)
     window.blit(codex_btn_text, codex_btn_rect)
 
@@ -2754,7 +2128,7 @@ while running:
         pygame.draw.rect(window, (100, 200, 255), (panel_px + 10, panel_py + 8, panel_w - 20, 3))
 
         # 标题："已消灭！"
-        defeat_text = FONT_LARGE.render(f"已消灭 {virus_info['title']}！", True, (255, 220, 100))
+        defeat_text = text_cache.render(FONT_LARGE, f"已消灭 {virus_info['title']}！", True, (255, 220, 100))
         defeat_rect = defeat_text.get_rect(centerx=WINDOW_WIDTH // 2, top=panel_py + 20)
         window.blit(defeat_text, defeat_rect)
 
@@ -2764,7 +2138,7 @@ while running:
                         (panel_px + panel_w - 20, panel_py + 55))
 
         # 危害介绍标签
-        label_text = FONT_SMALL.render("【危害介绍】", True, (255, 150, 100))
+        label_text = text_cache.render(FONT_SMALL, "【危害介绍】", True, (255, 150, 100))
         window.blit(label_text, (panel_px + 20, panel_py + 65))
 
         # 自动换行显示描述文本
@@ -2773,28 +2147,28 @@ while running:
         chars_per_line = 28  # 每行中文字符数
         for i in range(0, len(desc), chars_per_line):
             line_text = desc[i:i + chars_per_line]
-            rendered = FONT_SMALL.render(line_text, True, (220, 220, 220))
+            rendered = text_cache.render(FONT_SMALL, line_text, True, (220, 220, 220))
             window.blit(rendered, (panel_px + 25, line_y))
             line_y += 24
 
         # 预防方法标签
         line_y += 10
-        prev_label = FONT_SMALL.render("【预防方法】", True, (100, 255, 150))
+        prev_label = text_cache.render(FONT_SMALL, "【预防方法】", True, (100, 255, 150))
         window.blit(prev_label, (panel_px + 20, line_y))
         line_y += 26
 
         prev = virus_info["prevention"]
         for i in range(0, len(prev), chars_per_line):
             line_text = prev[i:i + chars_per_line]
-            rendered = FONT_SMALL.render(line_text, True, (180, 255, 200))
+            rendered = text_cache.render(FONT_SMALL, line_text, True, (180, 255, 200))
             window.blit(rendered, (panel_px + 25, line_y))
             line_y += 24
 
         # 底部提示（闪烁效果）
         if (virus_intro_timer // 30) % 2 == 0:
-            skip_text = FONT_SMALL.render("按 空格键 继续游戏", True, (200, 200, 200))
+            skip_text = text_cache.render(FONT_SMALL, "按 空格键 继续游戏", True, (200, 200, 200))
         else:
-            skip_text = FONT_SMALL.render("按 空格键 继续游戏", True, (255, 255, 100))
+            skip_text = text_cache.render(FONT_SMALL, "按 空格键 继续游戏", True, (255, 255, 100))
         skip_rect = skip_text.get_rect(centerx=WINDOW_WIDTH // 2, bottom=panel_py + panel_h - 15)
         window.blit(skip_text, skip_rect)
 
@@ -2815,9 +2189,9 @@ while running:
         pygame.draw.rect(window, (120, 210, 255), (codex_x, codex_y, codex_w, codex_h), 2, border_radius=10)
         pygame.draw.rect(window, (55, 140, 185), (codex_x + 4, codex_y + 4, codex_w - 8, codex_h - 8), 1, border_radius=8)
 
-        title_text = FONT_LARGE.render("病毒图鉴", True, (255, 225, 120))
+        title_text = text_cache.render(FONT_LARGE, "病毒图鉴", True, (255, 225, 120))
         window.blit(title_text, (codex_x + 24, codex_y + 18))
-        hint_text = FONT_TINY.render("鼠标滚轮可滚动查看全部介绍", True, (175, 215, 240))
+        hint_text = text_cache.render(FONT_TINY, "鼠标滚轮可滚动查看全部介绍", True, (175, 215, 240))
         window.blit(hint_text, (codex_x + 26, codex_y + 50))
 
         close_btn_w = 92
@@ -2827,7 +2201,7 @@ while running:
         close_color = (170, 70, 70) if close_hovered else (140, 55, 55)
         pygame.draw.rect(window, close_color, virus_codex_close_btn_rect, border_radius=7)
         pygame.draw.rect(window, (255, 180, 170), virus_codex_close_btn_rect, 1, border_radius=7)
-        close_text = FONT_SMALL.render("关闭", True, (255, 235, 235))
+        close_text = text_cache.render(FONT_SMALL, "关闭", True, (255, 235, 235))
         window.blit(close_text, close_text.get_rect(center=virus_codex_close_btn_rect.center))
 
         viewport_x = codex_x + 24
@@ -2836,7 +2210,7 @@ while running:
         viewport_h = codex_h - 110
 
         content_height = 18
-        for entry in VIRUS_CODEX_ENTRIES:
+        for entry in get_virus_codex_entries():
             text_height = 24 + len(entry["desc_lines"]) * 22 + 6 + 22 + len(entry["prevention_lines"]) * 22 + 8
             entry_height = max(82, text_height) + 10
             content_height += entry_height
@@ -2844,37 +2218,37 @@ while running:
 
         content_surface = pygame.Surface((viewport_w, max(viewport_h, content_height)), pygame.SRCALPHA)
         draw_y = 10
-        for index, entry in enumerate(VIRUS_CODEX_ENTRIES):
+        for index, entry in enumerate(get_virus_codex_entries()):
             entry_top = draw_y
 
             # 左侧病毒图片
             image_frame = pygame.Rect(10, entry_top + 4, 74, 74)
             pygame.draw.rect(content_surface, (55, 95, 128, 220), image_frame, border_radius=8)
             pygame.draw.rect(content_surface, (110, 165, 205, 220), image_frame, 1, border_radius=8)
-            codex_img = MONSTER_CODEX_IMAGES.get(entry["name"])
+            codex_img = get_codex_image(entry["name"])
             if codex_img:
                 img_rect = codex_img.get_rect(center=image_frame.center)
                 content_surface.blit(codex_img, img_rect)
             else:
                 pygame.draw.circle(content_surface, (140, 150, 160), image_frame.center, 18)
-                content_surface.blit(FONT_TINY.render("无图", True, (30, 40, 50)), (image_frame.x + 24, image_frame.y + 30))
+                content_surface.blit(text_cache.render(FONT_TINY, "无图", True, (30, 40, 50)), (image_frame.x + 24, image_frame.y + 30))
 
             # 右侧文字
             text_x = 96
             text_y = entry_top + 2
-            title_line = FONT_SMALL.render(f"{index + 1}. {entry['title']}", True, (255, 220, 120))
+            title_line = text_cache.render(FONT_SMALL, f"{index + 1}. {entry['title']}", True, (255, 220, 120))
             content_surface.blit(title_line, (text_x, text_y))
             text_y += 24
 
             for line in entry["desc_lines"]:
-                content_surface.blit(FONT_SMALL.render(line, True, (225, 228, 234)), (text_x, text_y))
+                content_surface.blit(text_cache.render(FONT_SMALL, line, True, (225, 228, 234)), (text_x, text_y))
                 text_y += 22
 
             text_y += 6
-            content_surface.blit(FONT_SMALL.render("预防：", True, (130, 240, 170)), (text_x, text_y))
+            content_surface.blit(text_cache.render(FONT_SMALL, "预防：", True, (130, 240, 170)), (text_x, text_y))
             text_y += 22
             for line in entry["prevention_lines"]:
-                content_surface.blit(FONT_SMALL.render(line, True, (188, 250, 210)), (text_x + 16, text_y))
+                content_surface.blit(text_cache.render(FONT_SMALL, line, True, (188, 250, 210)), (text_x + 16, text_y))
                 text_y += 22
 
             entry_bottom = max(entry_top + 82, text_y + 6)
@@ -2890,28 +2264,23 @@ while running:
         )
 
         pygame.draw.rect(window, (90, 140, 170), (viewport_x, viewport_y, viewport_w, viewport_h), 1)
+    frame_profiler.mark('popups')  # 图鉴按钮、病毒介绍弹窗和图鉴面板
 
-    pygame.display.flip()
-    clock.tick(60)
+    # 性能分析叠加层（F3切换）
+    frame_profiler.draw(window, FONT_TINY)
+    frame_profiler.mark('overlay')
 
-    # 更新玩家受伤计时器
-    if player_hit_timer > 0:
-        player_hit_timer -= 1 
-        if player_hit_timer == 0:
-            player_is_hit = False
-    
-    # 更新粒子系统
-    particle_system.update()
-
-    # 更新玩家光源位置
-    if player_light_index is not None and player_light_index >= 0:
-        lighting_system.update_light(player_light_index, player_x, player_y)
+    pygame.display.flip()
+    frame_profiler.mark('flip')
+    if first_frame_ms is None:
+        first_frame_ms = (time.perf_counter() - STARTUP_TIME) * 1000.0
+        print(f"首帧用时 {first_frame_ms:.0f} ms（图片：{assets.summary()}）")
+    if frame_profiler.enabled:
+        frame_profiler.set_counter('首帧 ms', "%.0f" % first_frame_ms)
+    frame_seconds = clock.tick(RENDER_FPS_LIMIT) / 1000.0
+    frame_profiler.skip()  # 帧率限制的等待时间不计入
 
-    # 检查玩家是否接近病毒并启动对话
-    for monster in monsters:
-        if monster.check_collision(player_x, player_y, player_size):
-            if not player_monster_dialogue.is_active:
-                player_monster_dialogue.start()
+    frame_profiler.end_frame()
 
 # 修复商店类
 class Shop:
@@ -2941,7 +2310,7 @@ class Shop:
         pygame.draw.rect(window, (50, 50, 50), (shop_x, shop_y, shop_width, shop_height))
         pygame.draw.rect(window, WHITE, (shop_x, shop_y, shop_width, shop_height), 3)
 
-        title_text = FONT_LARGE.render("商店 (按S关闭)", True, WHITE)
+        title_text = text_cache.render(FONT_LARGE, "商店 (按S关闭)", True, WHITE)
         window.blit(title_text, (shop_x + 10, shop_y + 10))
 
         y_offset = shop_y + 50
@@ -2951,8 +2320,8 @@ class Shop:
             desc_text = f"    {item_info['description']}"
 
             color = GREEN if player_exp >= item_info['cost'] else RED
-            item_surface = FONT_LARGE.render(item_text, True, color)
-            desc_surface = FONT_SMALL.render(desc_text, True, WHITE)
+            item_surface = text_cache.render(FONT_LARGE, item_text, True, color)
+            desc_surface = text_cache.render(FONT_SMALL, desc_text, True, WHITE)
 
             window.blit(item_surface, (shop_x + 10, y_offset))
             window.blit(desc_surface, (shop_x + 10, y_offset + 30))
@@ -3023,4 +2392,6 @@ while running:
     pygame.display.flip()
     clock.tick(60)
 
+# 等后台准备停下再关闭pygame（准备过程会创建Surface）
+level_preloader.shutdown()
 pygame.quit()
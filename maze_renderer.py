@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+import pygame
+
+# 迷宫分块渲染：把迷宫按固定格子数切成若干块，每块预先画好背景、墙壁和边框，
+# 绘制时只贴出与摄像机相交的几个块；块表为有上限的LRU缓存，迷宫再大内存也不会无限增长
+class MazeChunkRenderer:
+    def __init__(self, maze, cell_size, wall_texture, background_color=(30, 30, 30),
+                 border_color=(50, 50, 50), border_width=5, chunk_cells=16, max_chunks=16):
+        self.cell_size = cell_size
+        self.wall_texture = wall_texture
+        self.background_color = background_color
+        self.border_color = border_color
+        self.border_width = border_width
+        self.chunk_cells = chunk_cells
+        self.chunk_pixels = chunk_cells * cell_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (块x, 块y) -> 预渲染好的Surface
+        self.set_maze(maze)
+
+    def set_maze(self, maze):
+        """迷宫变化时调用，丢弃所有旧块"""
+        self.maze = maze
+        self.height = len(maze)
+        self.width = len(maze[0]) if self.height else 0
+        self.world_width = self.width * self.cell_size
+        self.world_height = self.height * self.cell_size
+        self.chunk_columns = -(-self.width // self.chunk_cells)
+        self.chunk_rows = -(-self.height // self.chunk_cells)
+        self.chunks.clear()
+
+    def invalidate_cell(self, cell_x, cell_y):
+        """单个格子被修改后调用，只丢弃它所在的块"""
+        self.chunks.pop((cell_x // self.chunk_cells, cell_y // self.chunk_cells), None)
+
+    def _bake_chunk(self, chunk_x, chunk_y):
+        """把一个块内的背景、墙壁和游戏边框画到一张Surface上"""
+        cell_size = self.cell_size
+        chunk_cells = self.chunk_cells
+        origin_x = chunk_x * self.chunk_pixels
+        origin_y = chunk_y * self.chunk_pixels
+        start_x = chunk_x * chunk_cells
+        start_y = chunk_y * chunk_cells
+        end_x = min(start_x + chunk_cells, self.width)
+        end_y = min(start_y + chunk_cells, self.height)
+
+        surface = pygame.Surface(((end_x - start_x) * cell_size, (end_y - start_y) * cell_size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(self.background_color)
+
+        maze = self.maze
+        wall_texture = self.wall_texture
+        walls = []
+        for y in range(start_y, end_y):
+            row = maze[y]
+            for x in range(start_x, end_x):
+                if row[x] == 1:
+                    walls.append((wall_texture, (x * cell_size - origin_x, y * cell_size - origin_y)))
+        surface.blits(walls, doreturn=False)
+
+        # 游戏边框按世界坐标画，落在块外的部分会被自动裁掉
+        pygame.draw.rect(surface, self.border_color,
+                         (-origin_x, -origin_y, self.world_width, self.world_height),
+                         self.border_width)
+        return surface
+
+    def _get_chunk(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        surface = self.chunks.get(key)
+        if surface is not None:
+            self.chunks.move_to_end(key)
+            return surface
+        surface = self._bake_chunk(chunk_x, chunk_y)
+        self.chunks[key] = surface
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return surface
+
+    def prebake(self, camera_x, camera_y, view_width, view_height):
+        """提前渲染摄像机附近的块（生成迷宫后调用，避免第一帧卡顿）"""
+        for chunk_x, chunk_y in self._visible_chunks(camera_x, camera_y, view_width, view_height):
+            self._get_chunk(chunk_x, chunk_y)
+
+    def _visible_chunks(self, camera_x, camera_y, view_width, view_height):
+        chunk_pixels = self.chunk_pixels
+        start_x = max(0, int(camera_x // chunk_pixels))
+        end_x = min(self.chunk_columns - 1, int((camera_x + view_width) // chunk_pixels))
+        start_y = max(0, int(camera_y // chunk_pixels))
+        end_y = min(self.chunk_rows - 1, int((camera_y + view_height) // chunk_pixels))
+        return [(chunk_x, chunk_y)
+                for chunk_y in range(start_y, end_y + 1)
+                for chunk_x in range(start_x, end_x + 1)]
+
+    def draw(self, window, camera_x, camera_y):
+        """贴出与摄像机相交的块（通常2~4个）"""
+        view_width, view_height = window.get_size()
+        chunk_pixels = self.chunk_pixels
+        window.blits([(self._get_chunk(chunk_x, chunk_y),
+                       (chunk_x * chunk_pixels - camera_x, chunk_y * chunk_pixels - camera_y))
+                      for chunk_x, chunk_y in self._visible_chunks(camera_x, camera_y,
+                                                                   view_width, view_height)],
+                     doreturn=False)
+
+
+def create_wall_texture(cell_size, wall_color=(20, 50, 50)):
+    """创建一次性预渲染的墙壁纹理"""
+    wall_surface = pygame.Surface((cell_size, cell_size))
+
+    # 绘制基础墙壁
+    wall_surface.fill(wall_color)
+
+    # 添加简化的纹理效果（减少随机元素）
+    texture_color = (30, 30, 120)
+    for i in range(0, cell_size, 8):  # 用固定模式替代随机
+        pygame.draw.line(wall_surface, texture_color, (i, 0), (i, cell_size), 1)
+        pygame.draw.line(wall_surface, texture_color, (0, i), (cell_size, i), 1)
+
+    # 添加边缘高光
+    pygame.draw.line(wall_surface, (70, 70, 170), (0, 0), (cell_size, 0), 2)
+    pygame.draw.line(wall_surface, (70, 70, 170), (0, 0), (0, cell_size), 2)
+
+    return wall_surface
@@ -0,0 +1,160 @@
+import numpy as np
+import pygame
+
+# 小地图：整张迷宫按小地图比例预先画成一张图层（只画一次），每帧只从图层上截取玩家周围一块贴上去；
+# 走过（进过视野）的格子记在按位存储的探索表里，玩家换格时增量地把新探索的格子补画到图层上
+# （已探索的墙更亮、地面有底色，没探索的墙暗显）。全图模式直接把同一张图层整张画在屏幕中央。
+# 病毒点按空间索引的桶批量收集，用blits()一次画完，不遍历整个病毒列表
+class Minimap:
+    BACKGROUND = (20, 20, 30, 200)  # 半透明深色背景
+    BORDER = (100, 100, 120)
+    WALL = (60, 60, 80)  # 已探索的墙
+    WALL_UNEXPLORED = (35, 35, 48)  # 没探索过的墙
+    FLOOR = (32, 32, 46)  # 已探索的地面
+    PLAYER = (100, 255, 100)
+
+    def __init__(self, walls, cell_size, size=120, view_range=800):
+        """
+        walls: 迷宫墙壁布尔表（行=y，列=x）
+        size: 右上角小地图边长（像素）；view_range: 小地图显示的实际游戏范围（像素）
+        """
+        self.walls = walls.tolist()
+        self.maze_height, self.maze_width = walls.shape
+        self.cell_size = cell_size
+        self.size = size
+        self.view_range = view_range
+        self.scale = size / view_range
+        self.cell_pixels = max(2, int(cell_size * self.scale))  # 每格在图层上的边长
+
+        # 探索表：每格1位
+        self.explored = bytearray((self.maze_width * self.maze_height + 7) // 8)
+        self.explored_count = 0
+
+        # 整张迷宫的图层（透明底，只画墙）
+        cell_pixels = self.cell_pixels
+        self.layer = pygame.Surface((self.maze_width * cell_pixels, self.maze_height * cell_pixels), pygame.SRCALPHA)
+        for y, row in enumerate(self.walls):
+            for x, wall in enumerate(row):
+                if wall:
+                    self.layer.fill(self.WALL_UNEXPLORED, (x * cell_pixels, y * cell_pixels, cell_pixels, cell_pixels))
+
+        # 每帧复用的小地图表面、全图表面和预先画好的病毒点
+        self.surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        layer_width, layer_height = self.layer.get_size()
+        self.overview_surface = pygame.Surface((layer_width + 8, layer_height + 8), pygame.SRCALPHA)
+        self.dots = {False: self._dot((255, 80, 80), 2), True: self._dot((255, 100, 100), 3)}  # 是否Boss -> 点
+        self.overview = False  # 是否显示全图
+
+    @staticmethod
+    def _dot(color, radius):
+        surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        return surface
+
+    # ---- 探索表 ----
+    def is_explored(self, cell_x, cell_y):
+        if not (0 <= cell_x < self.maze_width and 0 <= cell_y < self.maze_height):
+            return False
+        index = cell_y * self.maze_width + cell_x
+        return bool(self.explored[index >> 3] & (1 << (index & 7)))
+
+    def reveal(self, mask, origin_x, origin_y):
+        """把视野窗口里可见的格子记为已探索，并补画到图层上；返回新探索的格子数"""
+        explored = self.explored
+        maze_width = self.maze_width
+        maze_height = self.maze_height
+        cell_pixels = self.cell_pixels
+        layer = self.layer
+        walls = self.walls
+        revealed = 0
+        rows, cols = np.nonzero(mask)
+        for cell_y, cell_x in zip((rows + origin_y).tolist(), (cols + origin_x).tolist()):
+            if not (0 <= cell_x < maze_width and 0 <= cell_y < maze_height):
+                continue
+            index = cell_y * maze_width + cell_x
+            bit = 1 << (index & 7)
+            if explored[index >> 3] & bit:
+                continue
+            explored[index >> 3] |= bit
+            color = self.WALL if walls[cell_y][cell_x] else self.FLOOR
+            layer.fill(color, (cell_x * cell_pixels, cell_y * cell_pixels, cell_pixels, cell_pixels))
+            revealed += 1
+        self.explored_count += revealed
+        return revealed
+
+    def explored_ratio(self):
+        return self.explored_count / (self.maze_width * self.maze_height)
+
+    # ---- 病毒点 ----
+    def _monster_dots(self, grid, left, top, width, height, scale, margin=0, explored_only=False):
+        """
+        收集中心落在(left, top, width, height)内的存活病毒的点，返回blits()用的序列
+        margin: 图层在目标表面上的边距；explored_only: 只收集已探索格子里的病毒
+        """
+        dots = self.dots
+        cell_size = self.cell_size
+        grid_cell = grid.cell_size
+        right = left + width
+        bottom = top + height
+        start_x, start_y = int(left // grid_cell), int(top // grid_cell)
+        end_x, end_y = int(right // grid_cell), int(bottom // grid_cell)
+        buckets = grid.buckets
+        sequence = []
+        for cy in range(start_y, end_y + 1):
+            for cx in range(start_x, end_x + 1):
+                bucket = buckets.get((cx, cy))
+                if not bucket:
+                    continue
+                for monster in bucket:
+                    if not monster.is_alive or not (left <= monster.x < right and top <= monster.y < bottom):
+                        continue
+                    if explored_only and not self.is_explored(int(monster.x // cell_size), int(monster.y // cell_size)):
+                        continue
+                    dot = dots[monster.is_boss]
+                    radius = dot.get_width() // 2 - margin
+                    sequence.append((dot, (int((monster.x - left) * scale) - radius,
+                                           int((monster.y - top) * scale) - radius)))
+        return sequence
+
+    def _draw_player(self, surface, position):
+        pygame.draw.circle(surface, self.PLAYER, position, 4)
+        pygame.draw.circle(surface, (255, 255, 255), position, 4, 1)
+
+    # ---- 绘制 ----
+    def draw(self, screen, player_x, player_y, grid, x, y):
+        """右上角小地图：以玩家为中心、边长view_range的区域画在(x, y)；返回画出的病毒点数"""
+        size = self.size
+        scale = self.scale
+        map_left = player_x - self.view_range // 2
+        map_top = player_y - self.view_range // 2
+        surface = self.surface
+        surface.fill(self.BACKGROUND)
+        # 图层上与小地图重叠的那一块（超出迷宫的部分保持背景色；区域越过图层左上边时SDL会相应平移目标位置）
+        surface.blit(self.layer, (0, 0), (int(map_left * scale), int(map_top * scale), size, size))
+        sequence = self._monster_dots(grid, map_left, map_top, self.view_range, self.view_range, scale)
+        surface.blits(sequence, doreturn=False)
+        self._draw_player(surface, (size // 2, size // 2))
+        screen.blit(surface, (x, y))
+        pygame.draw.rect(screen, self.BORDER, (x, y, size, size), 2)
+        return len(sequence)
+
+    def draw_overview(self, screen, player_x, player_y, grid, camera_x, camera_y, view_width, view_height):
+        """全图模式：整张图层画在屏幕中央，标出玩家位置和当前画面范围，只显示已探索区域里的病毒；返回画出的病毒点数"""
+        surface = self.overview_surface
+        surface.fill(self.BACKGROUND)
+        surface.blit(self.layer, (4, 4))
+        scale = self.cell_pixels / self.cell_size
+        world_width = self.maze_width * self.cell_size
+        world_height = self.maze_height * self.cell_size
+        sequence = self._monster_dots(grid, 0, 0, world_width, world_height, scale, 4, explored_only=True)
+        surface.blits(sequence, doreturn=False)
+        # 当前画面范围
+        pygame.draw.rect(surface, self.BORDER, (int(camera_x * scale) + 4, int(camera_y * scale) + 4,
+                                                int(view_width * scale), int(view_height * scale)), 1)
+        self._draw_player(surface, (int(player_x * scale) + 4, int(player_y * scale) + 4))
+        width, height = surface.get_size()
+        x = (screen.get_width() - width) // 2
+        y = (screen.get_height() - height) // 2
+        screen.blit(surface, (x, y))
+        pygame.draw.rect(screen, self.BORDER, (x, y, width, height), 2)
+        return len(sequence)
@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+
+# 病毒模拟分级（LOD）：按与玩家的距离把病毒分成三档
+#   近（视野内及两格边距）：每帧更新，完整迷宫碰撞 + 避障兜底
+#   中（mid_range以内）：每隔k帧轮到一次，一次补上k帧的位移，目标点查可通行表
+#   远（其余）：每隔far_interval帧整批做一次统计推进（按步数累积转向概率的游荡）
+# 中档的间隔k根据每帧预算自适应：近档占用后剩余的预算不够时拉长间隔。
+# 中、远档按槽位号错开轮次，每帧只处理其中一部分
+class MonsterLOD:
+    def __init__(self, cell_size, mid_range, mid_interval=6, far_interval=30, tick_budget=400):
+        """
+        mid_range: 中档半径（像素）
+        mid_interval: 中档最短更新间隔（帧）
+        far_interval: 远档更新间隔（帧）
+        tick_budget: 每帧近档 + 中档最多更新的病毒数
+        """
+        self.view_margin = cell_size * 2
+        self.max_step = cell_size  # 单次推进不超过一格，不会越过整格的墙
+        self.mid_range = mid_range
+        self.mid_interval = mid_interval
+        self.far_interval = far_interval
+        self.tick_budget = tick_budget
+        self.mid_stride = mid_interval
+        self.tick = 0
+        # 各档病毒数量和本帧实际更新数量（供性能分析叠加层显示）
+        self.counts = {'near': 0, 'mid': 0, 'far': 0}
+        self.updated = {'near': 0, 'mid': 0, 'far': 0}
+
+    def _due(self, mask, stride):
+        """按槽位号错开：本帧轮到的槽位"""
+        slots = np.flatnonzero(mask)
+        return slots[(slots + self.tick) % stride == 0]
+
+    def update(self, pool, player_x, player_y, view_rect, walkability, flow_field=None):
+        """
+        推进一帧，返回本帧移动过的槽位（调用方据此同步空间索引）；
+        近档被墙挡住的槽位仍记录在pool.blocked_slots，由调用方逐个避障
+        view_rect: 视野矩形(left, top, right, bottom)
+        """
+        self.tick += 1
+        left, top, right, bottom = view_rect
+        margin = self.view_margin
+        near = pool.within_rect(left - margin, top - margin, right + margin, bottom + margin)
+        mid = pool.within_radius(player_x, player_y, self.mid_range) & ~near
+        far = pool.alive & ~near & ~mid
+        near_count = int(np.count_nonzero(near))
+        mid_count = int(np.count_nonzero(mid))
+        self.counts['near'] = near_count
+        self.counts['mid'] = mid_count
+        self.counts['far'] = int(np.count_nonzero(far))
+
+        # 近档：每帧完整更新
+        near_slots = pool.update_movement(player_x, player_y, near, None, walkability, flow_field)
+
+        # 中档：剩余预算决定间隔，间隔越长单次步长越大
+        remaining = max(self.tick_budget - near_count, 1)
+        self.mid_stride = min(max(self.mid_interval, math.ceil(mid_count / remaining)), self.far_interval)
+        mid_slots = pool.advance_coarse(self._due(mid, self.mid_stride), self.mid_stride,
+                                        player_x, player_y, walkability, flow_field, self.max_step)
+
+        # 远档：低频整批统计推进
+        far_slots = pool.advance_coarse(self._due(far, self.far_interval), self.far_interval,
+                                        player_x, player_y, walkability, None, self.max_step)
+
+        self.updated['near'] = int(near_slots.size)
+        self.updated['mid'] = int(mid_slots.size)
+        self.updated['far'] = int(far_slots.size)
+        return np.concatenate((near_slots, mid_slots, far_slots))
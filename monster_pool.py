@@ -0,0 +1,243 @@
+import numpy as np
+
+# 游荡时可选的8个方向
+WANDER_DIRECTIONS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1),
+                              (1, 1), (-1, -1), (1, -1), (-1, 1)], dtype=np.int8)
+
+# 病毒数据池：按“结构数组”存放所有病毒的运动/战斗数据，
+# 每帧的追踪、游荡、边界限制和冷却都以整批NumPy运算完成；
+# Monster对象只是指向某个槽位的轻量视图，供绘制、图鉴等逐个访问
+class MonsterPool:
+    FLOAT_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'speed', 'next_x', 'next_y')
+    INT_FIELDS = ('hp', 'max_hp', 'radius', 'move_cooldown', 'attack_cooldown')
+    SMALL_FIELDS = ('dir_x', 'dir_y')
+    BOOL_FIELDS = ('alive', 'chasing', 'following_flow')
+    MOVE_COOLDOWN = 2  # 每移动一步后等待的帧数（即每MOVE_COOLDOWN+1帧移动一步）
+
+    def __init__(self, cell_size, world_width, world_height, tracking_range, capacity=1024):
+        self.cell_size = cell_size
+        self.world_width = world_width
+        self.world_height = world_height
+        self.tracking_range_squared = tracking_range * tracking_range
+        self.rng = np.random.default_rng()
+        self.capacity = 0
+        self.views = []
+        self.free_slots = []
+        self.blocked_slots = np.empty(0, dtype=np.intp)
+        self._grow(capacity)
+
+    def _grow(self, new_capacity):
+        """扩容：所有数组按新容量重新分配并拷贝旧数据，槽位编号保持不变"""
+        old_capacity = self.capacity
+        specs = ([(name, np.float64) for name in self.FLOAT_FIELDS] +
+                 [(name, np.int32) for name in self.INT_FIELDS] +
+                 [(name, np.int8) for name in self.SMALL_FIELDS] +
+                 [(name, np.bool_) for name in self.BOOL_FIELDS] +
+                 [('type_id', np.int16)])
+        for name, dtype in specs:
+            new_array = np.zeros(new_capacity, dtype=dtype)
+            if old_capacity:
+                new_array[:old_capacity] = getattr(self, name)
+            setattr(self, name, new_array)
+        self.views.extend([None] * (new_capacity - old_capacity))
+        # 倒序压栈，保证优先分配小编号槽位
+        self.free_slots.extend(range(new_capacity - 1, old_capacity - 1, -1))
+        self.capacity = new_capacity
+
+    def allocate(self, view):
+        """为新病毒分配一个槽位"""
+        if not self.free_slots:
+            self._grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        self.views[slot] = view
+        self.alive[slot] = True
+        self.move_cooldown[slot] = 0
+        self.attack_cooldown[slot] = 0
+        return slot
+
+    def release(self, slot):
+        """病毒被移出游戏后归还槽位"""
+        if self.views[slot] is None:
+            return
+        self.views[slot] = None
+        self.alive[slot] = False
+        self.free_slots.append(slot)
+
+    def __len__(self):
+        return self.capacity - len(self.free_slots)
+
+    def snapshot_positions(self):
+        """把当前位置记为上一tick的位置（供跨格判断和绘制插值）"""
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+
+    def interpolated_position(self, slot, alpha):
+        """上一tick与当前tick位置之间的插值，alpha为0~1"""
+        prev_x = self.prev_x[slot]
+        prev_y = self.prev_y[slot]
+        return (prev_x + (self.x[slot] - prev_x) * alpha,
+                prev_y + (self.y[slot] - prev_y) * alpha)
+
+    def within_rect(self, left, top, right, bottom):
+        """返回中心点在矩形内的存活病毒掩码"""
+        return (self.alive & (self.x >= left) & (self.x <= right) &
+                (self.y >= top) & (self.y <= bottom))
+
+    def within_radius(self, x, y, radius):
+        """返回与(x, y)距离小于radius的存活病毒掩码"""
+        dx = self.x - x
+        dy = self.y - y
+        return self.alive & (dx * dx + dy * dy < radius * radius)
+
+    def positions_valid(self, xs, ys, radius, walkability):
+        """批量检测目标位置能否站立；walkability(半径)返回该体型的可通行表，按半径分组查表"""
+        radii = np.unique(radius)
+        if radii.size == 1:
+            return walkability(int(radii[0])).valid_many(xs, ys)
+        valid = np.empty(xs.shape, dtype=np.bool_)
+        for value in radii.tolist():
+            group = radius == value
+            valid[group] = walkability(value).valid_many(xs[group], ys[group])
+        return valid
+
+    def _steer(self, slots, x, y, speed, player_x, player_y, flow_field, turn_chance=0.05):
+        """
+        计算一步的位移：追踪范围内朝玩家（或流场下一格中心）走speed，范围外按游荡方向走0.6倍speed
+        返回(dx, dy, 是否追踪, 是否沿流场)
+        turn_chance: 游荡的病毒本步改变方向的概率
+        """
+        # 追踪：追踪范围内的病毒朝玩家（或流场给出的下一格中心）移动
+        dx_raw = player_x - x
+        dy_raw = player_y - y
+        chasing = dx_raw * dx_raw + dy_raw * dy_raw < self.tracking_range_squared
+        following = np.zeros(slots.size, dtype=np.bool_)
+        if flow_field is not None and chasing.any():
+            target_x, target_y, has_flow = flow_field.next_steps(x, y)
+            following = chasing & has_flow
+            dx_raw = np.where(following, target_x - x, dx_raw)
+            dy_raw = np.where(following, target_y - y, dy_raw)
+        distance = np.hypot(dx_raw, dy_raw)
+        # 沿流场走时不越过下一格中心，避免拐角处冲进墙里
+        step = np.where(following, np.minimum(speed, distance), speed)
+        scale = np.divide(step, distance, out=np.zeros_like(distance), where=distance > 0)
+        dx = dx_raw * scale
+        dy = dy_raw * scale
+
+        # 游荡：5%的概率改变方向，游荡时速度稍慢
+        wandering = ~chasing
+        if wandering.any():
+            change = wandering & (self.rng.random(slots.size) < turn_chance)
+            if change.any():
+                picks = WANDER_DIRECTIONS[self.rng.integers(0, len(WANDER_DIRECTIONS), int(change.sum()))]
+                self.dir_x[slots[change]] = picks[:, 0]
+                self.dir_y[slots[change]] = picks[:, 1]
+            dx = np.where(wandering, self.dir_x[slots] * speed * 0.6, dx)
+            dy = np.where(wandering, self.dir_y[slots] * speed * 0.6, dy)
+        return dx, dy, chasing, following
+
+    def update_movement(self, player_x, player_y, maze_mask, free_mask, walkability=None, flow_field=None):
+        """
+        批量移动一帧
+        maze_mask: 需要做迷宫碰撞的病毒；free_mask: 不做碰撞、直接移动的病毒（None为没有）
+        walkability: 按半径返回可通行表的函数（None为不做迷宫碰撞）
+        返回本帧尝试移动的槽位；被墙挡住的槽位记录在blocked_slots（目标点在next_x/next_y），
+        由调用方逐个执行避障兜底
+        """
+        self.snapshot_positions()
+
+        active = (maze_mask if free_mask is None else maze_mask | free_mask) & self.alive
+        cooling = active & (self.move_cooldown > 0)
+        self.move_cooldown[cooling] -= 1
+        slots = np.flatnonzero(active & ~cooling)
+        if slots.size == 0:
+            self.blocked_slots = slots
+            return slots
+
+        x = self.x[slots]
+        y = self.y[slots]
+        dx, dy, chasing, following = self._steer(slots, x, y, self.speed[slots], player_x, player_y, flow_field)
+
+        # 边界限制（留5像素缓冲区）
+        buffer = self.radius[slots] + 5
+        next_x = np.clip(x + dx, buffer, self.world_width - buffer)
+        next_y = np.clip(y + dy, buffer, self.world_height - buffer)
+
+        blocked = np.zeros(slots.size, dtype=np.bool_)
+        if walkability is not None:
+            check = maze_mask[slots]
+            if check.any():
+                blocked[check] = ~self.positions_valid(next_x[check], next_y[check],
+                                                       self.radius[slots[check]], walkability)
+
+        free = ~blocked
+        self.x[slots[free]] = next_x[free]
+        self.y[slots[free]] = next_y[free]
+
+        blocked_slots = slots[blocked]
+        self.next_x[blocked_slots] = next_x[blocked]
+        self.next_y[blocked_slots] = next_y[blocked]
+        self.chasing[blocked_slots] = chasing[blocked]
+        self.following_flow[blocked_slots] = following[blocked]
+        self.blocked_slots = blocked_slots
+
+        # 统一的冷却管理，防止卡墙
+        self.move_cooldown[slots] = self.MOVE_COOLDOWN
+        return slots
+
+    def advance_coarse(self, slots, ticks, player_x, player_y, walkability, flow_field=None, max_step=None):
+        """
+        低频批量推进：一次补上ticks帧的移动（按每MOVE_COOLDOWN+1帧一步折算成更大的步长），
+        游荡转向概率按步数累积；目标点查可通行表，被挡住时先尝试只走x或只走y，仍不行就原地换个游荡方向。
+        不经过避障兜底，blocked_slots不变
+        max_step: 单次推进的最大距离（不超过一格可避免越过整格的墙）
+        """
+        if slots.size == 0:
+            return slots
+        moves = ticks / (self.MOVE_COOLDOWN + 1)
+        speed = self.speed[slots] * moves
+        x = self.x[slots]
+        y = self.y[slots]
+        dx, dy, _, _ = self._steer(slots, x, y, speed, player_x, player_y, flow_field,
+                                   turn_chance=1.0 - 0.95 ** moves)
+        if max_step is not None:
+            length = np.hypot(dx, dy)
+            scale = np.divide(max_step, length, out=np.ones_like(length), where=length > max_step)
+            dx *= scale
+            dy *= scale
+
+        buffer = self.radius[slots] + 5
+        radius = self.radius[slots]
+        next_x = np.clip(x + dx, buffer, self.world_width - buffer)
+        next_y = np.clip(y + dy, buffer, self.world_height - buffer)
+        valid = self.positions_valid(next_x, next_y, radius, walkability)
+        # 沿墙滑动：只保留一个方向的位移
+        for slide_x, slide_y in ((next_x, y), (x, next_y)):
+            retry = ~valid
+            if not retry.any():
+                break
+            ok = self.positions_valid(slide_x[retry], slide_y[retry], radius[retry], walkability)
+            retry_index = np.flatnonzero(retry)[ok]
+            next_x[retry_index] = slide_x[retry_index]
+            next_y[retry_index] = slide_y[retry_index]
+            valid[retry_index] = True
+
+        self.x[slots[valid]] = next_x[valid]
+        self.y[slots[valid]] = next_y[valid]
+        stuck = slots[~valid]
+        if stuck.size:
+            picks = WANDER_DIRECTIONS[self.rng.integers(0, len(WANDER_DIRECTIONS), stuck.size)]
+            self.dir_x[stuck] = picks[:, 0]
+            self.dir_y[stuck] = picks[:, 1]
+        return slots
+
+    def cell_changed(self, slots):
+        """返回本帧跨越了格子边界的槽位（用于同步空间索引）"""
+        cell_size = self.cell_size
+        changed = ((np.floor_divide(self.prev_x[slots], cell_size) != np.floor_divide(self.x[slots], cell_size)) |
+                   (np.floor_divide(self.prev_y[slots], cell_size) != np.floor_divide(self.y[slots], cell_size)))
+        return slots[changed]
+
+    def update_attack_cooldowns(self):
+        """所有存活病毒的攻击冷却同时减1"""
+        cooling = self.alive & (self.attack_cooldown > 0)
+        self.attack_cooldown[cooling] -= 1
@@ -0,0 +1,130 @@
+from collections import deque
+
+import numpy as np
+
+# 流场寻路：以玩家所在格子为源点在迷宫上做BFS，
+# 每个可达格子记录到玩家的步数和“下一步往哪走”，病毒追踪时O(1)查表即可
+class FlowField:
+    def __init__(self, maze, cell_size, max_distance=40):
+        self.cell_size = cell_size
+        self.max_distance = max_distance  # BFS最大步数，超出范围的格子视为不可达
+        self.set_maze(maze)
+
+    def set_maze(self, maze):
+        """迷宫变化时调用，重新分配距离/方向表"""
+        self.maze = maze
+        self.height = len(maze)
+        self.width = len(maze[0]) if self.height else 0
+        size = self.width * self.height
+        self.distance = [0] * size
+        self.dir_x = [0] * size
+        self.dir_y = [0] * size
+        # 用“代数戳”标记本轮BFS访问过的格子，重算时无需整表清零
+        self.stamp = [0] * size
+        self.generation = 0
+        self.source_cell = None
+        self._array_generation = -1  # NumPy镜像表对应的BFS代数（按需懒构建）
+
+    def update(self, player_x, player_y):
+        """玩家跨越格子边界时才重新计算流场，返回是否发生了重算"""
+        cell = (int(player_x // self.cell_size), int(player_y // self.cell_size))
+        if cell == self.source_cell:
+            return False
+        self.source_cell = cell
+        self._rebuild(cell[0], cell[1])
+        return True
+
+    def _rebuild(self, source_x, source_y):
+        self.generation += 1
+        width = self.width
+        height = self.height
+        if not (0 <= source_x < width and 0 <= source_y < height):
+            return
+        maze = self.maze
+        if maze[source_y][source_x] == 1:
+            return  # 玩家在墙里（穿墙模式），本轮流场为空
+
+        generation = self.generation
+        stamp = self.stamp
+        distance = self.distance
+        dir_x = self.dir_x
+        dir_y = self.dir_y
+        max_distance = self.max_distance
+
+        source_index = source_y * width + source_x
+        stamp[source_index] = generation
+        distance[source_index] = 0
+        dir_x[source_index] = 0
+        dir_y[source_index] = 0
+
+        queue = deque([(source_x, source_y)])
+        while queue:
+            cx, cy = queue.popleft()
+            current_distance = distance[cy * width + cx]
+            if current_distance >= max_distance:
+                continue
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                nx = cx + dx
+                ny = cy + dy
+                if not (0 <= nx < width and 0 <= ny < height) or maze[ny][nx] == 1:
+                    continue
+                index = ny * width + nx
+                if stamp[index] == generation:
+                    continue
+                stamp[index] = generation
+                distance[index] = current_distance + 1
+                # 新格子的下一步就是走回发现它的格子
+                dir_x[index] = -dx
+                dir_y[index] = -dy
+                queue.append((nx, ny))
+
+    def _index_of(self, x, y):
+        cell_x = int(x // self.cell_size)
+        cell_y = int(y // self.cell_size)
+        if not (0 <= cell_x < self.width and 0 <= cell_y < self.height):
+            return -1
+        index = cell_y * self.width + cell_x
+        if self.stamp[index] != self.generation:
+            return -1
+        return index
+
+    def distance_at(self, x, y):
+        """返回(x, y)所在格子到玩家格子的步数，不可达返回-1"""
+        index = self._index_of(x, y)
+        if index < 0:
+            return -1
+        return self.distance[index]
+
+    def next_step(self, x, y):
+        """返回沿最短路径下一格的中心坐标，不可达返回None"""
+        index = self._index_of(x, y)
+        if index < 0:
+            return None
+        cell_size = self.cell_size
+        next_cell_x = index % self.width + self.dir_x[index]
+        next_cell_y = index // self.width + self.dir_y[index]
+        return (next_cell_x * cell_size + cell_size / 2,
+                next_cell_y * cell_size + cell_size / 2)
+
+    def _ensure_arrays(self):
+        """把本轮BFS结果转成NumPy表，供批量查询使用（每次重算后只转换一次）"""
+        if self._array_generation == self.generation:
+            return
+        visited = np.array(self.stamp, dtype=np.int64) == self.generation
+        self.distance_array = np.where(visited, np.array(self.distance, dtype=np.int32), -1)
+        self.dir_x_array = np.array(self.dir_x, dtype=np.int8)
+        self.dir_y_array = np.array(self.dir_y, dtype=np.int8)
+        self._array_generation = self.generation
+
+    def next_steps(self, xs, ys):
+        """next_step的批量版本：返回(目标x数组, 目标y数组, 是否沿流场的掩码)，与玩家同格或不可达时掩码为False"""
+        self._ensure_arrays()
+        cell_size = self.cell_size
+        cell_x = np.floor_divide(xs, cell_size).astype(np.intp)
+        cell_y = np.floor_divide(ys, cell_size).astype(np.intp)
+        inside = (cell_x >= 0) & (cell_x < self.width) & (cell_y >= 0) & (cell_y < self.height)
+        index = np.clip(cell_y, 0, self.height - 1) * self.width + np.clip(cell_x, 0, self.width - 1)
+        has_flow = inside & (self.distance_array[index] > 0)
+        target_x = (cell_x + self.dir_x_array[index]) * cell_size + cell_size / 2
+        target_y = (cell_y + self.dir_y_array[index]) * cell_size + cell_size / 2
+        return target_x, target_y, has_flow
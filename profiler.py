@@ -0,0 +1,135 @@
+import time
+
+import numpy as np
+import pygame
+
+# 各阶段在图表中的颜色（按顺序循环使用）
+PHASE_COLORS = [
+    (231, 76, 60), (230, 126, 34), (241, 196, 15), (46, 204, 113), (26, 188, 156),
+    (52, 152, 219), (155, 89, 182), (236, 240, 241), (149, 165, 166), (211, 84, 0),
+    (192, 57, 43), (39, 174, 96), (41, 128, 185), (142, 68, 173), (243, 156, 18),
+    (127, 140, 141),
+]
+
+# 分阶段帧耗时分析器：主循环在各阶段之间调用mark(阶段名)，
+# 两次mark之间的耗时记到后一个阶段名下；每个阶段的耗时存进环形缓冲区，
+# 叠加层显示滚动的分段柱状图和各阶段p50/p95/p99。
+# 关闭时mark/start_frame/end_frame只做一次属性判断就返回
+class FrameProfiler:
+    def __init__(self, phases, history=240, stats_interval=15):
+        self.phases = list(phases)
+        self.phase_index = {name: index for index, name in enumerate(self.phases)}
+        self.history = history
+        self.stats_interval = stats_interval  # 每隔多少帧重算一次分位数
+        self.samples = np.zeros((len(self.phases), history), dtype=np.float32)  # 毫秒
+        self.current = np.zeros(len(self.phases), dtype=np.float32)
+        self.write_index = 0
+        self.filled = 0
+        self.enabled = False
+        self.last_time = 0.0
+        self.frame_open = False
+        self.percentiles = np.zeros((len(self.phases), 3), dtype=np.float32)
+        self.chart_surface = None
+        self.frames_since_stats = 0
+        self.counters = {}  # 附加显示的计数（如各LOD档的病毒数量），名称 -> 文字
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_open = False
+        return self.enabled
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.current[:] = 0
+        self.frame_open = True
+        self.last_time = time.perf_counter()
+
+    def mark(self, phase):
+        """把距上一次mark（或帧开始）的耗时记到phase名下"""
+        if not self.enabled or not self.frame_open:
+            return
+        now = time.perf_counter()
+        self.current[self.phase_index[phase]] += (now - self.last_time) * 1000.0
+        self.last_time = now
+
+    def set_counter(self, name, value):
+        """记录一项附加计数，显示在各阶段耗时下方"""
+        if self.enabled:
+            self.counters[name] = value
+
+    def skip(self):
+        """丢弃距上一次mark的耗时（如clock.tick的等待时间）"""
+        if self.enabled:
+            self.last_time = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or not self.frame_open:
+            return
+        self.frame_open = False
+        self.samples[:, self.write_index] = self.current
+        self.write_index = (self.write_index + 1) % self.history
+        self.filled = min(self.filled + 1, self.history)
+        self.frames_since_stats += 1
+        if self.frames_since_stats >= self.stats_interval:
+            self.frames_since_stats = 0
+            self.percentiles = np.percentile(self.samples[:, :self.filled], (50, 95, 99), axis=1).T
+        self._push_chart_column()
+
+    def _push_chart_column(self):
+        """图表整体左移一列，只画最新一帧的分段柱"""
+        chart = self.chart_surface
+        if chart is None:
+            return
+        width, height = chart.get_size()
+        chart.scroll(-2, 0)
+        chart.fill((15, 15, 20), (width - 2, 0, 2, height))
+        scale = height / 33.3  # 图表高度对应两帧（30fps）的耗时
+        bottom = height
+        for index, value in enumerate(self.current.tolist()):
+            bar_height = int(value * scale + 0.5)
+            if bar_height <= 0:
+                continue
+            bottom -= bar_height
+            chart.fill(PHASE_COLORS[index % len(PHASE_COLORS)], (width - 2, bottom, 2, bar_height))
+            if bottom <= 0:
+                break
+
+    def draw(self, window, font, x=10, y=10):
+        """绘制叠加层：滚动柱状图 + 每个阶段的最新耗时和p50/p95/p99"""
+        if not self.enabled:
+            return
+        row_height = font.get_linesize()
+        chart_height = 80
+        width = 330
+        height = chart_height + 16 + row_height * (len(self.phases) + len(self.counters) + 1)
+        if self.chart_surface is None:
+            self.chart_surface = pygame.Surface((width - 12, chart_height))
+            self.chart_surface.fill((15, 15, 20))
+
+        panel = pygame.Rect(x, y, width, height)
+        pygame.draw.rect(window, (0, 0, 0), panel)
+        pygame.draw.rect(window, (90, 90, 110), panel, 1)
+        window.blit(self.chart_surface, (x + 6, y + 6))
+        # 16.7ms（60fps）参考线
+        line_y = y + 6 + chart_height // 2
+        pygame.draw.line(window, (200, 200, 200), (x + 6, line_y), (x + width - 7, line_y), 1)
+
+        # 数值每帧都在变，直接渲染，不进文字缓存（避免把HUD条目挤出去）
+        value_x = x + 150
+        text_y = y + chart_height + 10
+        window.blit(font.render("阶段 (ms)", True, (200, 200, 200)), (x + 6, text_y))
+        window.blit(font.render("当前   p50   p95   p99", True, (200, 200, 200)), (value_x, text_y))
+        newest = (self.write_index - 1) % self.history
+        for index, name in enumerate(self.phases):
+            text_y += row_height
+            color = PHASE_COLORS[index % len(PHASE_COLORS)]
+            pygame.draw.rect(window, color, (x + 6, text_y + row_height // 4, 8, row_height // 2))
+            p50, p95, p99 = self.percentiles[index].tolist()
+            window.blit(font.render(name, True, (230, 230, 230)), (x + 18, text_y))
+            values = "%5.1f %5.1f %5.1f %5.1f" % (self.samples[index, newest], p50, p95, p99)
+            window.blit(font.render(values, True, (230, 230, 230)), (value_x, text_y))
+        for name, value in self.counters.items():
+            text_y += row_height
+            window.blit(font.render(name, True, (200, 200, 200)), (x + 18, text_y))
+            window.blit(font.render(str(value), True, (230, 230, 230)), (value_x, text_y))
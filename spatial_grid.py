@@ -0,0 +1,104 @@
+# 空间哈希网格：把实体按所在格子分桶，范围查询只遍历附近的桶。
+# 桶用值为None的dict当作有序集合：遍历顺序就是实体进桶的顺序，不随对象哈希（id）变化，
+# 固定随机种子时查询结果的顺序（绘制先后、碰撞时先命中谁）也可复现
+class SpatialHashGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.buckets = {}  # (格子x, 格子y) -> 该格子内的实体（有序集合）
+        self.object_cells = {}  # 实体 -> 当前所在格子
+
+    def _cell_of(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, obj):
+        """把实体加入网格（已存在时等同于update）"""
+        if obj in self.object_cells:
+            self.update(obj)
+            return
+        cell = self._cell_of(obj.x, obj.y)
+        self.object_cells[obj] = cell
+        bucket = self.buckets.get(cell)
+        if bucket is None:
+            bucket = self.buckets[cell] = {}
+        bucket[obj] = None
+
+    def remove(self, obj):
+        """从网格中移除实体"""
+        cell = self.object_cells.pop(obj, None)
+        if cell is None:
+            return
+        bucket = self.buckets.get(cell)
+        if bucket is not None:
+            bucket.pop(obj, None)
+            if not bucket:
+                del self.buckets[cell]
+
+    def update(self, obj):
+        """实体移动后调用，只有跨越格子边界时才会换桶"""
+        old_cell = self.object_cells.get(obj)
+        if old_cell is None:
+            self.insert(obj)
+            return
+        new_cell = self._cell_of(obj.x, obj.y)
+        if new_cell == old_cell:
+            return
+        bucket = self.buckets.get(old_cell)
+        if bucket is not None:
+            bucket.pop(obj, None)
+            if not bucket:
+                del self.buckets[old_cell]
+        self.object_cells[obj] = new_cell
+        bucket = self.buckets.get(new_cell)
+        if bucket is None:
+            bucket = self.buckets[new_cell] = {}
+        bucket[obj] = None
+
+    def clear(self):
+        self.buckets.clear()
+        self.object_cells.clear()
+
+    def rebuild(self, objects):
+        """清空后重新插入全部实体（整批替换实体列表时使用）"""
+        self.clear()
+        for obj in objects:
+            self.insert(obj)
+
+    def query_rect(self, left, top, width, height):
+        """返回中心点落在矩形内的所有实体"""
+        right = left + width
+        bottom = top + height
+        start_x, start_y = self._cell_of(left, top)
+        end_x, end_y = self._cell_of(right, bottom)
+        result = []
+        buckets = self.buckets
+        for cy in range(start_y, end_y + 1):
+            for cx in range(start_x, end_x + 1):
+                bucket = buckets.get((cx, cy))
+                if not bucket:
+                    continue
+                for obj in bucket:
+                    if left <= obj.x <= right and top <= obj.y <= bottom:
+                        result.append(obj)
+        return result
+
+    def query_radius(self, x, y, radius):
+        """返回中心点到(x, y)距离不超过radius的所有实体（用平方距离比较，避免开方）"""
+        radius_sq = radius * radius
+        start_x, start_y = self._cell_of(x - radius, y - radius)
+        end_x, end_y = self._cell_of(x + radius, y + radius)
+        result = []
+        buckets = self.buckets
+        for cy in range(start_y, end_y + 1):
+            for cx in range(start_x, end_x + 1):
+                bucket = buckets.get((cx, cy))
+                if not bucket:
+                    continue
+                for obj in bucket:
+                    dx = obj.x - x
+                    dy = obj.y - y
+                    if dx * dx + dy * dy <= radius_sq:
+                        result.append(obj)
+        return result
+
+    def __len__(self):
+        return len(self.object_cells)
@@ -0,0 +1,144 @@
+import copy
+
+import numpy as np
+
+# 出生点分配：从“该体型能站立的格子”列表里随机取点，
+# 用网格加速的泊松盘采样保证任意两个出生点之间的最小间距（半径之和 + spacing）。
+# 候选点按随机顺序只扫描一遍，每个点只检查周围3x3个网格桶，总耗时近似线性；
+# 空间不够时逐步放宽间距，保证总是返回恰好N个位置
+class Spawner:
+    def __init__(self, walkability, maze_width, maze_height, cell_size, rng=None):
+        """
+        walkability: 按半径返回可通行表的函数（GameWorld.walkability）
+        rng: NumPy随机数生成器或种子（默认新建）
+        """
+        self.walkability = walkability
+        self.cell_size = cell_size
+        columns, rows = np.meshgrid(np.arange(maze_width), np.arange(maze_height))
+        self.cell_center_x = (columns.ravel() + 0.5) * cell_size
+        self.cell_center_y = (rows.ravel() + 0.5) * cell_size
+        self.free_cells_by_radius = {}  # 半径 -> (格子中心x数组, 格子中心y数组)
+        self.rng = np.random.default_rng(rng)
+
+    def free_cells(self, radius):
+        """该半径的实体以格子中心为出生点时能站立的所有格子（按半径缓存）"""
+        cells = self.free_cells_by_radius.get(radius)
+        if cells is None:
+            valid = self.walkability(radius).valid_many(self.cell_center_x, self.cell_center_y)
+            cells = (self.cell_center_x[valid], self.cell_center_y[valid])
+            self.free_cells_by_radius[radius] = cells
+        return cells
+
+    def snapshot(self, walkability, rng):
+        """复制一份给后台线程用：共用只读的格子坐标和已算好的候选格，缓存和随机数各自独立"""
+        clone = copy.copy(self)
+        clone.walkability = walkability
+        clone.free_cells_by_radius = dict(self.free_cells_by_radius)
+        clone.rng = rng
+        return clone
+
+    def clear(self):
+        """迷宫变化后调用"""
+        self.free_cells_by_radius.clear()
+
+    def _candidates(self, radius, rng):
+        """打乱顺序的候选点；体型小于半格时在格子内随机偏移（偏移后身体仍在该格内）"""
+        xs, ys = self.free_cells(radius)
+        order = rng.permutation(xs.size)
+        xs = xs[order]
+        ys = ys[order]
+        jitter = self.cell_size // 2 - radius
+        if jitter > 0:
+            xs = xs + rng.uniform(-jitter, jitter, xs.size)
+            ys = ys + rng.uniform(-jitter, jitter, ys.size)
+        return xs.tolist(), ys.tolist()
+
+    def place(self, radii, spacing=20, avoid=(), rng=None):
+        """
+        为每个半径分配一个出生点，返回与radii顺序一致的[(x, y), ...]
+        任意两点距离不小于两者半径之和 + spacing；avoid为已有实体[(x, y, 半径), ...]，同样保持间距。
+        候选点用完仍不够时先去掉spacing只要求不重叠，再不够则允许重叠，始终返回len(radii)个位置
+        rng: 随机数生成器（默认用self.rng）
+        """
+        if rng is None:
+            rng = self.rng
+        count = len(radii)
+        positions = [None] * count
+        if count == 0:
+            return positions
+        avoid = list(avoid)
+        max_radius = max(max(radii), max((entry[2] for entry in avoid), default=0))
+        bucket_size = float(max_radius * 2 + spacing) or 1.0
+        buckets = {}
+
+        def insert(x, y, radius):
+            key = (int(x // bucket_size), int(y // bucket_size))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [(x, y, radius)]
+            else:
+                bucket.append((x, y, radius))
+
+        def fits(x, y, radius, gap):
+            bucket_x = int(x // bucket_size)
+            bucket_y = int(y // bucket_size)
+            for offset_y in (-1, 0, 1):
+                for offset_x in (-1, 0, 1):
+                    bucket = buckets.get((bucket_x + offset_x, bucket_y + offset_y))
+                    if not bucket:
+                        continue
+                    for other_x, other_y, other_radius in bucket:
+                        limit = radius + other_radius + gap
+                        dx = x - other_x
+                        dy = y - other_y
+                        if dx * dx + dy * dy < limit * limit:
+                            return False
+            return True
+
+        for x, y, radius in avoid:
+            insert(x, y, radius)
+
+        # 大体型先放（能站的格子少），同半径的实体共用一份候选点
+        order = sorted(range(count), key=lambda index: -radii[index])
+        by_radius = {}
+        for index in order:
+            by_radius.setdefault(radii[index], []).append(index)
+
+        for radius, indices in by_radius.items():
+            xs, ys = self._candidates(radius, rng)
+            if not xs:
+                # 没有任何能站立的格子（迷宫全是墙），退回地图中心
+                for index in indices:
+                    positions[index] = (self.cell_center_x.mean(), self.cell_center_y.mean())
+                continue
+            pending = list(indices)
+            for gap in (spacing, 0):
+                if not pending:
+                    break
+                remaining = []
+                cursor = 0
+                for index in pending:
+                    while cursor < len(xs) and not fits(xs[cursor], ys[cursor], radius, gap):
+                        cursor += 1
+                    if cursor >= len(xs):
+                        remaining.append(index)
+                        continue
+                    positions[index] = (xs[cursor], ys[cursor])
+                    insert(xs[cursor], ys[cursor], radius)
+                    cursor += 1
+                pending = remaining
+                if pending:
+                    xs, ys = self._candidates(radius, rng)
+            # 仍然放不下：允许重叠，随机挑能站立的格子
+            for index in pending:
+                pick = int(rng.integers(len(xs)))
+                positions[index] = (xs[pick], ys[pick])
+        return positions
+
+    def nearest_free(self, x, y, radius):
+        """离(x, y)最近的、该半径能站立的格子中心"""
+        xs, ys = self.free_cells(radius)
+        if xs.size == 0:
+            return x, y
+        nearest = int(np.argmin((xs - x) ** 2 + (ys - y) ** 2))
+        return float(xs[nearest]), float(ys[nearest])
@@ -0,0 +1,82 @@
+import pygame
+
+# 病毒贴图享元：同一(病毒类型, 像素尺寸)的贴图和同一尺寸的阴影全局只生成一份，所有病毒共用；
+# 有图片时按尺寸缩放原图，没有图片时画渐变圆 + 高光。
+# 返回的Surface是共享的，调用方不要修改它（如set_alpha、fill）。
+# render()只由传入的原图生成新的Surface、不读写登记表，可以在后台线程里预先生成，再在主线程add()进来
+class SpriteRegistry:
+    def __init__(self, image_loader):
+        """image_loader(病毒名称) 返回病毒原图，没有图片时返回None"""
+        self.image_loader = image_loader
+        self.sprites = {}  # (病毒名称, 尺寸) -> Surface
+        self.shadows = {}  # 尺寸 -> Surface
+        self.built = 0  # 累计生成的贴图数（不含add进来的）
+
+    def __contains__(self, key):
+        return key in self.sprites
+
+    def add(self, name, size, surface):
+        """登记在别处生成好的贴图（启动时加载的缓存、后台准备关卡时缩放的贴图）"""
+        self.sprites[(name, size)] = surface
+
+    def build(self, name, size, color):
+        """生成一张贴图（不登记）"""
+        monster_img = self.image_loader(name)
+        surface = self.render(monster_img, size, color)
+        return surface.convert_alpha() if monster_img is not None else surface
+
+    @staticmethod
+    def render(monster_img, size, color):
+        """由病毒原图（None时画渐变圆）生成一张新的贴图，不做convert_alpha，可在后台线程调用"""
+        if monster_img is not None:
+            # 缩放图片直接作为表面
+            return pygame.transform.scale(monster_img, (size, size))
+
+        # 回退到默认的圆形渲染
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        # 创建渐变效果
+        color = [max(0, min(255, c)) for c in color]
+        for i in range(size // 2, 0, -2):
+            alpha = max(50, 255 - (size // 2 - i) * 8)
+            pygame.draw.circle(surface, (*color, alpha), (size // 2, size // 2), i)
+        # 高光效果
+        highlight_size = size // 4
+        highlight = pygame.Surface((highlight_size, highlight_size), pygame.SRCALPHA)
+        pygame.draw.circle(highlight, (255, 255, 255, 150),
+                           (highlight_size // 2, highlight_size // 2), highlight_size // 2)
+        surface.blit(highlight, (size // 4, size // 4))
+        return surface
+
+    def monster(self, name, size, color):
+        """取（必要时生成）某种病毒某个尺寸的贴图"""
+        key = (name, size)
+        surface = self.sprites.get(key)
+        if surface is None:
+            surface = self.sprites[key] = self.build(name, size, color)
+            self.built += 1
+        return surface
+
+    def shadow(self, size):
+        """病毒脚下的半透明椭圆阴影"""
+        surface = self.shadows.get(size)
+        if surface is None:
+            surface = pygame.Surface((size, size // 2), pygame.SRCALPHA)
+            pygame.draw.ellipse(surface, (0, 0, 0, 100), (0, 0, size, size // 2))
+            self.shadows[size] = surface
+        return surface
+
+    def prewarm(self, entries):
+        """关卡加载时预先生成，entries为[(病毒名称, 尺寸, 颜色), ...]；返回新生成的数量"""
+        before = self.built
+        for name, size, color in entries:
+            self.monster(name, size, color)
+            self.shadow(size)
+        return self.built - before
+
+    def memory_bytes(self):
+        """所有共享贴图占用的像素内存（按每像素4字节估算）"""
+        total = 0
+        for surface in list(self.sprites.values()) + list(self.shadows.values()):
+            width, height = surface.get_size()
+            total += width * height * 4
+        return total
@@ -0,0 +1,19 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# 模块都平铺在仓库根目录；pygame在无窗口环境下用dummy驱动
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from game_world import generate_maze  # noqa: E402
+
+
+@pytest.fixture
+def maze_walls():
+    """固定种子生成的31×31迷宫（墙壁布尔表，行=y，列=x）"""
+    return np.array(generate_maze(31, 31, random.Random(1)), dtype=bool)
@@ -0,0 +1,76 @@
+from game_world import GameWorld
+
+
+def make_world():
+    """小迷宫 + 几只病毒；预算为0时每次run()只执行一个任务，方便让任务顺延"""
+    world = GameWorld(15, 15, seed=3)
+    world.populate(num_monsters=4, num_health_packs=0)
+    world.ai_scheduler.budget_ms = 0
+    return world
+
+
+def submit_blocked(world, monster, dx, dy):
+    """按update_monsters的方式提交一只被挡住的病毒的避障任务"""
+    world.ai_scheduler.submit(monster, world._resolve_blocked_move, monster, float(monster.x), float(monster.y),
+                              dx, dy, world.player_x, world.player_y, False, False)
+
+
+def free_step(world, monster):
+    """病毒当前位置旁边一个能站立的x方向位移"""
+    walkability = world.walkability(monster.size // 2)
+    for dx in (3.0, -3.0):
+        if walkability.is_valid(monster.x + dx, monster.y):
+            return dx
+    raise AssertionError('病毒左右都走不动')
+
+
+def test_run_executes_one_job_when_out_of_budget():
+    world = make_world()
+    calls = []
+    for key in range(3):
+        world.ai_scheduler.submit(key, calls.append, key)
+    assert world.ai_scheduler.run() == 1
+    assert world.ai_scheduler.deferred == 2
+    world.ai_scheduler.run()
+    world.ai_scheduler.run()
+    assert calls == [0, 1, 2]
+    assert world.ai_scheduler.max_staleness == 2
+
+
+def test_deferred_job_resolves_from_the_current_position():
+    world = make_world()
+    monster = world.monsters[0]
+    start_x, start_y = float(monster.x), float(monster.y)
+    dx = free_step(world, monster)
+    world.ai_scheduler.submit('filler', lambda: None)
+    submit_blocked(world, monster, dx, 0.0)
+    world.ai_scheduler.run()  # 只执行了占位任务
+    assert (monster.x, monster.y) == (start_x, start_y)
+    world.ai_scheduler.run()
+    assert (monster.x, monster.y) == (start_x + dx, start_y)
+
+
+def test_deferred_job_does_not_teleport_a_monster_that_moved():
+    world = make_world()
+    monster = world.monsters[0]
+    dx = free_step(world, monster)
+    world.ai_scheduler.submit('filler', lambda: None)
+    submit_blocked(world, monster, dx, 0.0)
+    world.ai_scheduler.run()
+
+    # 任务顺延的这一帧里病毒已经移动过
+    monster.y = monster.y + 2
+    moved_x, moved_y = float(monster.x), float(monster.y)
+    world.ai_scheduler.run()
+    assert world.ai_scheduler.executed == 1
+    assert (monster.x, monster.y) == (moved_x, moved_y)
+
+
+def test_discarded_job_is_skipped():
+    world = make_world()
+    monster = world.monsters[0]
+    start_x, start_y = float(monster.x), float(monster.y)
+    submit_blocked(world, monster, free_step(world, monster), 0.0)
+    world.ai_scheduler.discard(monster)
+    assert world.ai_scheduler.run() == 0
+    assert (monster.x, monster.y) == (start_x, start_y)
@@ -0,0 +1,82 @@
+import numpy as np
+
+from bullet_pool import BulletPool
+from monster_pool import MonsterPool
+
+
+def spawn_tagged(pool, count):
+    """发射count颗子弹，用伤害值给每颗子弹编号，方便交换删除后核对"""
+    pool.spawn_batch(0.0, 0.0, np.zeros(count), np.zeros(count), 0, 100)
+    pool.damage[:count] = np.arange(count)
+    pool.x[:count] = np.arange(count) * 10.0
+    pool.y[:count] = np.arange(count) * 20.0
+
+
+def test_remove_keeps_survivors_packed_and_consistent():
+    pool = BulletPool(64)
+    spawn_tagged(pool, 20)
+    removed = [0, 3, 4, 17, 19]
+    pool.remove(removed)
+
+    assert pool.count == 15
+    tags = pool.damage[:pool.count]
+    assert sorted(tags.tolist()) == [tag for tag in range(20) if tag not in removed]
+    # 每颗子弹的各字段仍属于同一颗子弹
+    np.testing.assert_array_equal(pool.x[:pool.count], tags * 10.0)
+    np.testing.assert_array_equal(pool.y[:pool.count], tags * 20.0)
+
+
+def test_remove_ignores_duplicates_and_handles_tail_only():
+    pool = BulletPool(16)
+    spawn_tagged(pool, 6)
+    pool.remove([5, 5, 4])
+    assert pool.count == 4
+    assert pool.damage[:4].tolist() == [0, 1, 2, 3]
+    pool.remove([])
+    assert pool.count == 4
+
+
+def test_update_drops_expired_and_out_of_bounds():
+    pool = BulletPool(16)
+    pool.spawn_batch(50.0, 50.0, [1.0, 100.0, 0.0], [0.0, 0.0, 0.0], 5, 10)
+    pool.lifetime[2] = 1
+    pool.update(100, 100)
+    # 第二颗飞出边界，第三颗寿命耗尽
+    assert pool.count == 1
+    assert pool.x[0] == 51.0
+
+
+def test_spawn_batch_respects_capacity():
+    pool = BulletPool(4)
+    assert pool.spawn_batch(0.0, 0.0, np.ones(3), np.ones(3), 1, 10) == 3
+    assert pool.spawn_batch(0.0, 0.0, np.ones(3), np.ones(3), 1, 10) == 1
+    assert pool.count == 4
+
+
+def test_collide_reports_every_overlap_sorted_by_bullet_then_slot():
+    monsters = MonsterPool(40, 800, 800, 200, capacity=8)
+    for x, y, radius in ((100.0, 100.0, 20), (110.0, 100.0, 20), (400.0, 400.0, 25), (600.0, 600.0, 10)):
+        slot = monsters.allocate(object())
+        monsters.x[slot] = x
+        monsters.y[slot] = y
+        monsters.radius[slot] = radius
+    monsters.release(3)  # 死亡的病毒不参与碰撞
+
+    pool = BulletPool(16)
+    pool.spawn_batch(0.0, 0.0, np.zeros(4), np.zeros(4), 1, 10)
+    pool.x[:4] = [600.0, 105.0, 420.0, 300.0]
+    pool.y[:4] = [600.0, 100.0, 400.0, 300.0]
+
+    bullets, slots = pool.collide(monsters)
+    # 子弹1同时压在病毒0和1上，两对都要返回；子弹0只碰到已死亡的病毒3，子弹3什么都没碰到
+    assert list(zip(bullets.tolist(), slots.tolist())) == [(1, 0), (1, 1), (2, 2)]
+
+
+def test_collide_without_bullets_or_monsters_is_empty():
+    monsters = MonsterPool(40, 800, 800, 200, capacity=4)
+    pool = BulletPool(4)
+    bullets, slots = pool.collide(monsters)
+    assert bullets.size == 0 and slots.size == 0
+    pool.spawn_batch(10.0, 10.0, [0.0], [0.0], 1, 10)
+    bullets, slots = pool.collide(monsters)
+    assert bullets.size == 0 and slots.size == 0
@@ -0,0 +1,85 @@
+import numpy as np
+
+from field_of_view import FieldOfView
+
+CELL_SIZE = 40
+
+
+def open_room(size=21):
+    """四周一圈墙的空房间"""
+    walls = np.zeros((size, size), dtype=bool)
+    walls[0, :] = walls[-1, :] = walls[:, 0] = walls[:, -1] = True
+    return walls
+
+
+def visible(fov, mask, origin, cell_x, cell_y):
+    """窗口里某一格是否可见（窗口外算不可见）"""
+    column = cell_x - origin[0]
+    row = cell_y - origin[1]
+    if not (0 <= row < mask.shape[0] and 0 <= column < mask.shape[1]):
+        return False
+    return bool(mask[row, column])
+
+
+def compute(fov, cell_x, cell_y):
+    return fov.compute(cell_x, cell_y), (cell_x - fov.radius_cells, cell_y - fov.radius_cells)
+
+
+def test_open_room_sees_everything_within_radius():
+    fov = FieldOfView(open_room(), CELL_SIZE, 200)
+    mask, origin = compute(fov, 10, 10)
+    radius = fov.radius_cells
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            if dx * dx + dy * dy <= radius * radius:
+                assert visible(fov, mask, origin, 10 + dx, 10 + dy), (dx, dy)
+            else:
+                assert not visible(fov, mask, origin, 10 + dx, 10 + dy), (dx, dy)
+
+
+def test_walls_are_visible_and_hide_what_is_behind_them():
+    walls = open_room()
+    walls[10, 13] = True  # 玩家正右方3格的一根柱子
+    fov = FieldOfView(walls, CELL_SIZE, 280)
+    mask, origin = compute(fov, 10, 10)
+    assert visible(fov, mask, origin, 13, 10)  # 墙本身可见
+    for cell_x in (14, 15, 16):
+        assert not visible(fov, mask, origin, cell_x, 10)  # 墙后面被挡住
+    assert visible(fov, mask, origin, 12, 10)
+    assert visible(fov, mask, origin, 13, 8)  # 旁边不受影响
+
+
+def test_corridor_wall_blocks_the_next_room():
+    """一堵整墙把房间隔成两半：墙可见，墙另一边完全不可见"""
+    walls = open_room()
+    walls[:, 12] = True
+    fov = FieldOfView(walls, CELL_SIZE, 400)
+    mask, origin = compute(fov, 10, 10)
+    for cell_y in range(1, 20):
+        assert not visible(fov, mask, origin, 13, cell_y)
+    assert visible(fov, mask, origin, 12, 10)
+
+
+def test_compute_is_symmetric_in_open_room():
+    fov = FieldOfView(open_room(), CELL_SIZE, 200)
+    mask, _ = compute(fov, 10, 10)
+    np.testing.assert_array_equal(mask, mask[::-1, :])
+    np.testing.assert_array_equal(mask, mask[:, ::-1])
+    np.testing.assert_array_equal(mask, mask.T)
+
+
+def test_update_caches_by_cell_and_is_visible_uses_pixels():
+    walls = open_room()
+    walls[10, 13] = True
+    fov = FieldOfView(walls, CELL_SIZE, 280)
+    assert fov.update(10.5 * CELL_SIZE, 10.5 * CELL_SIZE)
+    assert not fov.update(10.1 * CELL_SIZE, 10.9 * CELL_SIZE)  # 同一格
+    assert fov.is_visible(12.5 * CELL_SIZE, 10.5 * CELL_SIZE)
+    assert not fov.is_visible(15.5 * CELL_SIZE, 10.5 * CELL_SIZE)
+    # 半边长覆盖到可见格子时算可见
+    assert fov.is_visible(15.5 * CELL_SIZE, 10.5 * CELL_SIZE, half_size=2 * CELL_SIZE)
+    assert not fov.is_visible(100 * CELL_SIZE, 100 * CELL_SIZE)  # 窗口外
+
+    fov.update(11.5 * CELL_SIZE, 10.5 * CELL_SIZE)
+    fov.update(10.5 * CELL_SIZE, 10.5 * CELL_SIZE)  # 回到走过的格子直接命中缓存
+    assert fov.misses == 2 and fov.hits == 1
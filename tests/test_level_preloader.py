@@ -0,0 +1,38 @@
+import threading
+import time
+
+from level_preloader import LevelPreloader
+
+
+def test_take_returns_prepared_result_with_snapshot():
+    preloader = LevelPreloader(lambda level, snapshot: (level, snapshot), lambda level: level * 10)
+    preloader.request(2)
+    assert preloader.take(2) == (2, 20)
+    assert preloader.take(3) == (3, 30)  # 没请求过的关卡当场准备
+    preloader.shutdown()
+
+
+def test_shutdown_stops_a_running_preparation_between_steps():
+    started = threading.Event()
+    steps = []
+    levels = []
+
+    def prepare(level, snapshot):
+        levels.append(level)
+        started.set()
+        for step in range(1000):
+            if preloader.stopping():
+                return None
+            steps.append(step)
+            time.sleep(0.001)
+        return level
+
+    preloader = LevelPreloader(prepare)
+    preloader.request(1)
+    preloader.request(2)  # 还没开始的任务直接丢弃
+    assert started.wait(1.0)
+    start = time.perf_counter()
+    preloader.shutdown()
+    assert time.perf_counter() - start < 0.5
+    assert len(steps) < 1000
+    assert levels == [1]
@@ -0,0 +1,89 @@
+import numpy as np
+import pygame
+
+from minimap import Minimap
+from spatial_grid import SpatialHashGrid
+
+CELL_SIZE = 40
+
+
+def make_minimap(width=12, height=9):
+    walls = np.zeros((height, width), dtype=bool)
+    walls[0, :] = True
+    walls[:, 0] = True
+    return Minimap(walls, CELL_SIZE)
+
+
+def test_reveal_sets_bits_for_visible_cells_only():
+    minimap = make_minimap()
+    mask = np.zeros((3, 3), dtype=bool)
+    mask[1, :] = True  # 窗口中间一行
+    assert minimap.reveal(mask, 4, 2) == 3
+
+    for cell_y in range(minimap.maze_height):
+        for cell_x in range(minimap.maze_width):
+            assert minimap.is_explored(cell_x, cell_y) == (cell_y == 3 and 4 <= cell_x <= 6)
+    assert minimap.explored_count == 3
+
+
+def test_reveal_is_incremental_and_clips_to_the_maze():
+    minimap = make_minimap()
+    mask = np.ones((5, 5), dtype=bool)
+    # 窗口左上角在迷宫外，只有落在迷宫里的3×3格有效
+    assert minimap.reveal(mask, -2, -2) == 9
+    assert minimap.reveal(mask, -2, -2) == 0  # 已探索的格子不再计数
+    assert minimap.reveal(mask, -1, -2) == 3  # 右移一列，只多出一列
+    assert minimap.explored_count == 12
+    assert minimap.explored_ratio() == 12 / (12 * 9)
+    assert not minimap.is_explored(-1, 0)
+    assert not minimap.is_explored(12, 0)
+
+
+def test_bitset_is_one_bit_per_cell():
+    minimap = make_minimap(75, 75)
+    assert len(minimap.explored) == (75 * 75 + 7) // 8
+    mask = np.ones((75, 75), dtype=bool)
+    minimap.reveal(mask, 0, 0)
+    assert minimap.explored_count == 75 * 75
+    assert all(minimap.is_explored(x, y) for x in range(75) for y in range(75))
+
+
+def test_reveal_repaints_the_cached_layer():
+    minimap = make_minimap()
+    pixels = minimap.cell_pixels
+    wall_point = (0 * pixels + pixels // 2, 0 * pixels + pixels // 2)
+    floor_point = (5 * pixels + pixels // 2, 4 * pixels + pixels // 2)
+    assert tuple(minimap.layer.get_at(wall_point))[:3] == Minimap.WALL_UNEXPLORED
+    assert minimap.layer.get_at(floor_point).a == 0
+
+    mask = np.ones((1, 1), dtype=bool)
+    minimap.reveal(mask, 0, 0)
+    minimap.reveal(mask, 5, 4)
+    assert tuple(minimap.layer.get_at(wall_point))[:3] == Minimap.WALL
+    assert tuple(minimap.layer.get_at(floor_point))[:3] == Minimap.FLOOR
+
+
+class Dot:
+    def __init__(self, x, y, is_alive=True, is_boss=False):
+        self.x = x
+        self.y = y
+        self.is_alive = is_alive
+        self.is_boss = is_boss
+
+
+def test_monster_dots_come_from_grid_buckets_in_range():
+    minimap = make_minimap(40, 40)
+    grid = SpatialHashGrid(CELL_SIZE)
+    near = Dot(250.0, 250.0)
+    boss = Dot(350.0, 300.0, is_boss=True)
+    dead = Dot(260.0, 260.0, is_alive=False)
+    far = Dot(1500.0, 1500.0)  # 小地图范围（玩家周围800像素）之外
+    for monster in (near, boss, dead, far):
+        grid.insert(monster)
+    screen = pygame.Surface((400, 300))
+    assert minimap.draw(screen, 200.0, 200.0, grid, 10, 10) == 2
+
+    # 全图模式只显示已探索格子里的病毒
+    assert minimap.draw_overview(screen, 200.0, 200.0, grid, 0, 0, 400, 300) == 0
+    minimap.reveal(np.ones((1, 1), dtype=bool), int(near.x // CELL_SIZE), int(near.y // CELL_SIZE))
+    assert minimap.draw_overview(screen, 200.0, 200.0, grid, 0, 0, 400, 300) == 1
@@ -0,0 +1,27 @@
+import numpy as np
+
+from graphics_enhancement import ParticleSystem
+
+
+def test_slot_is_reclaimed_in_the_update_where_life_runs_out():
+    particles = ParticleSystem()
+    particles.add_particle(10, 10, (255, 0, 0), lifetime=2)
+    particles.update()
+    assert len(particles) == 1
+    particles.update()
+    # 寿命降到0的这次更新就回收，不会以透明度0再画一帧
+    assert len(particles) == 0
+    assert not particles.alive.any()
+    assert particles.free_count == particles.max_particles
+
+
+def test_freed_slots_are_reused_and_capacity_is_respected():
+    particles = ParticleSystem()
+    particles.add_burst(particles.max_particles + 50, 0, 0, (0, 255, 0), lifetime=1)
+    assert len(particles) == particles.max_particles
+    particles.update()
+    assert len(particles) == 0
+    particles.add_burst(5, 0, 0, (0, 0, 255), lifetime=10)
+    assert len(particles) == 5
+    assert np.count_nonzero(particles.alive) == 5
+    assert particles.free_count == particles.max_particles - 5
@@ -0,0 +1,75 @@
+from collections import deque
+
+import numpy as np
+
+from pathfinding import FlowField
+
+CELL_SIZE = 40
+
+
+def reference_distances(maze, source_x, source_y, max_distance):
+    """独立实现的四邻接BFS：{(格x, 格y): 步数}"""
+    height = len(maze)
+    width = len(maze[0])
+    distances = {(source_x, source_y): 0}
+    queue = deque([(source_x, source_y)])
+    while queue:
+        cx, cy = queue.popleft()
+        if distances[(cx, cy)] >= max_distance:
+            continue
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == 0 and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(cx, cy)] + 1
+                queue.append((nx, ny))
+    return distances
+
+
+def center(cell_x, cell_y):
+    return (cell_x + 0.5) * CELL_SIZE, (cell_y + 0.5) * CELL_SIZE
+
+
+def test_distances_match_reference_bfs(maze_walls):
+    maze = maze_walls.astype(int).tolist()
+    field = FlowField(maze, CELL_SIZE, max_distance=25)
+    assert field.update(*center(1, 1))
+    expected = reference_distances(maze, 1, 1, 25)
+    for cell_y in range(len(maze)):
+        for cell_x in range(len(maze[0])):
+            assert field.distance_at(*center(cell_x, cell_y)) == expected.get((cell_x, cell_y), -1)
+
+
+def test_next_step_walks_one_cell_closer(maze_walls):
+    maze = maze_walls.astype(int).tolist()
+    field = FlowField(maze, CELL_SIZE)
+    field.update(*center(1, 1))
+    for (cell_x, cell_y), distance in reference_distances(maze, 1, 1, field.max_distance).items():
+        if distance == 0:
+            continue
+        step_x, step_y = field.next_step(*center(cell_x, cell_y))
+        next_cell = (int(step_x // CELL_SIZE), int(step_y // CELL_SIZE))
+        assert abs(next_cell[0] - cell_x) + abs(next_cell[1] - cell_y) == 1
+        assert field.distance_at(step_x, step_y) == distance - 1
+
+
+def test_batch_lookup_agrees_with_scalar(maze_walls):
+    maze = maze_walls.astype(int).tolist()
+    field = FlowField(maze, CELL_SIZE)
+    field.update(*center(15, 15))
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(0, 31 * CELL_SIZE, 500)
+    ys = rng.uniform(0, 31 * CELL_SIZE, 500)
+    target_x, target_y, following = field.next_steps(xs, ys)
+    for index, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        step = field.next_step(x, y)
+        if following[index]:
+            assert step == (target_x[index], target_y[index])
+        else:
+            assert step is None or field.distance_at(x, y) == 0
+
+
+def test_update_only_rebuilds_on_cell_change(maze_walls):
+    field = FlowField(maze_walls.astype(int).tolist(), CELL_SIZE)
+    assert field.update(*center(1, 1))
+    assert not field.update(1.2 * CELL_SIZE, 1.9 * CELL_SIZE)
+    assert field.update(*center(2, 1))
@@ -0,0 +1,56 @@
+import random
+
+from game_world import GameWorld
+from spatial_grid import SpatialHashGrid
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def test_queries_match_brute_force():
+    rng = random.Random(5)
+    grid = SpatialHashGrid(40)
+    points = [Point(rng.uniform(0, 800), rng.uniform(0, 800)) for _ in range(300)]
+    grid.rebuild(points)
+    for point in points[::3]:
+        point.x = rng.uniform(0, 800)
+        point.y = rng.uniform(0, 800)
+        grid.update(point)
+    grid.remove(points[1])
+
+    remaining = [point for point in points if point is not points[1]]
+    rect = grid.query_rect(100, 150, 300, 200)
+    assert set(rect) == {point for point in remaining if 100 <= point.x <= 400 and 150 <= point.y <= 350}
+    near = grid.query_radius(400, 400, 130)
+    assert set(near) == {point for point in remaining if (point.x - 400) ** 2 + (point.y - 400) ** 2 <= 130 ** 2}
+    assert len(grid) == len(remaining)
+
+
+def test_bucket_order_is_insertion_order():
+    grid = SpatialHashGrid(100)
+    points = [Point(10 + index, 10) for index in range(20)]
+    grid.rebuild(points)
+    assert grid.query_rect(0, 0, 99, 99) == points
+    # 离开再回到同一格的实体排到桶尾
+    points[3].x = 150
+    grid.update(points[3])
+    points[3].x = 13
+    grid.update(points[3])
+    assert grid.query_radius(10, 10, 50) == points[:3] + points[4:] + [points[3]]
+
+
+def test_query_order_is_reproducible_for_a_seed():
+    def slot_order(seed):
+        world = GameWorld(21, 21, seed=seed)
+        world.populate(num_monsters=40, num_health_packs=0)
+        for _ in range(30):
+            world.update_monsters(world.player_x, world.player_y, 0, 0)
+        monsters = world.monster_grid.query_rect(0, 0, world.width, world.height)
+        return [monster.slot for monster in monsters]
+
+    first = slot_order(11)
+    assert len(first) == 40
+    assert slot_order(11) == first
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from spawner import Spawner
+from walkability import WalkabilityGrid
+
+CELL_SIZE = 40
+
+
+def make_spawner(walls, seed=0):
+    grids = {}
+
+    def walkability(radius, outside_blocked=True):
+        key = (radius, outside_blocked)
+        if key not in grids:
+            grids[key] = WalkabilityGrid(walls, CELL_SIZE, radius, outside_blocked)
+        return grids[key]
+
+    height, width = walls.shape
+    return Spawner(walkability, width, height, CELL_SIZE, seed), walkability
+
+
+def min_gap(positions, radii, avoid=()):
+    """所有点对中 距离 - 半径之和 的最小值"""
+    entries = [(x, y, radius) for (x, y), radius in zip(positions, radii)] + list(avoid)
+    gap = math.inf
+    for i in range(len(entries)):
+        for j in range(i + 1, len(entries)):
+            x1, y1, r1 = entries[i]
+            x2, y2, r2 = entries[j]
+            gap = min(gap, math.hypot(x1 - x2, y1 - y2) - r1 - r2)
+    return gap
+
+
+def test_place_returns_exactly_n_spaced_standable_points(maze_walls):
+    spawner, walkability = make_spawner(maze_walls)
+    radii = [15] * 60
+    positions = spawner.place(radii, spacing=20)
+
+    assert len(positions) == len(radii)
+    assert all(position is not None for position in positions)
+    assert min_gap(positions, radii) >= 20 - 1e-9
+    for (x, y), radius in zip(positions, radii):
+        assert walkability(radius).is_valid(x, y)
+
+
+def test_place_mixed_sizes_in_open_room():
+    """大小体型混放：大体型先放，彼此之间同样保持间距"""
+    walls = np.zeros((20, 20), dtype=bool)
+    walls[0, :] = walls[-1, :] = walls[:, 0] = walls[:, -1] = True
+    spawner, walkability = make_spawner(walls, seed=1)
+    radii = [15] * 40 + [27] * 5 + [45]
+    positions = spawner.place(radii, spacing=20)
+
+    assert len(positions) == len(radii)
+    assert all(position is not None for position in positions)
+    assert min_gap(positions, radii) >= 20 - 1e-9
+    for (x, y), radius in zip(positions, radii):
+        assert walkability(radius).is_valid(x, y)
+
+
+def test_place_keeps_spacing_from_existing_entities(maze_walls):
+    spawner, _ = make_spawner(maze_walls, seed=3)
+    avoid = [(x, y, 15) for x, y in spawner.place([15] * 30, spacing=20)]
+    positions = spawner.place([15] * 30, spacing=20, avoid=avoid)
+    assert len(positions) == 30
+    # 新点之间、新点与已有实体之间都保持间距
+    assert min_gap(positions, [15] * 30, avoid) >= 20 - 1e-9
+
+
+def test_place_always_returns_n_when_space_runs_out(maze_walls):
+    spawner, _ = make_spawner(maze_walls, seed=5)
+    free_cells = spawner.free_cells(15)[0].size
+    positions = spawner.place([15] * (free_cells * 2), spacing=20)
+    assert len(positions) == free_cells * 2
+    assert all(position is not None for position in positions)
+
+
+def test_place_is_reproducible_for_a_seed(maze_walls):
+    first, _ = make_spawner(maze_walls, seed=7)
+    second, _ = make_spawner(maze_walls, seed=7)
+    assert first.place([15] * 20) == second.place([15] * 20)
@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+import pytest
+
+from walkability import WalkabilityGrid
+
+CELL_SIZE = 40
+
+
+def brute_force_valid(walls, x, y, radius, outside_blocked):
+    """逐格检查边长2r的方形覆盖的所有格子"""
+    height, width = walls.shape
+    first_x = math.floor((x - radius) / CELL_SIZE)
+    last_x = math.floor((x + radius) / CELL_SIZE)
+    first_y = math.floor((y - radius) / CELL_SIZE)
+    last_y = math.floor((y + radius) / CELL_SIZE)
+    for cell_y in range(first_y, last_y + 1):
+        for cell_x in range(first_x, last_x + 1):
+            if 0 <= cell_x < width and 0 <= cell_y < height:
+                if walls[cell_y, cell_x]:
+                    return False
+            elif outside_blocked:
+                return False
+    return True
+
+
+@pytest.mark.parametrize('radius', [5, 15, 27, 45])
+@pytest.mark.parametrize('outside_blocked', [True, False])
+def test_box_queries_match_brute_force(maze_walls, radius, outside_blocked):
+    grid = WalkabilityGrid(maze_walls, CELL_SIZE, radius, outside_blocked)
+    rng = np.random.default_rng(radius)
+    height, width = maze_walls.shape
+    # 覆盖迷宫外的一圈，外面的坐标会被钳制
+    xs = rng.uniform(-2 * CELL_SIZE, (width + 2) * CELL_SIZE, 3000)
+    ys = rng.uniform(-2 * CELL_SIZE, (height + 2) * CELL_SIZE, 3000)
+    xs[:1000] = np.floor(xs[:1000])  # 一部分取整数像素
+    ys[:1000] = np.floor(ys[:1000])
+
+    expected = [brute_force_valid(maze_walls, math.floor(x), math.floor(y), radius, outside_blocked)
+                for x, y in zip(xs.tolist(), ys.tolist())]
+    assert grid.valid_many(xs, ys).tolist() == expected
+    assert [grid.is_valid(x, y) for x, y in zip(xs.tolist(), ys.tolist())] == expected
+
+
+def test_wall_inside_large_box_is_detected():
+    """跨多格的实体：方形四角都在空地上，中间的墙也要挡住"""
+    walls = np.zeros((5, 5), dtype=bool)
+    walls[2, 2] = True
+    grid = WalkabilityGrid(walls, CELL_SIZE, 45)
+    assert not grid.is_valid(2.5 * CELL_SIZE, 2.5 * CELL_SIZE)
+    walls[2, 2] = False
+    assert WalkabilityGrid(walls, CELL_SIZE, 45).is_valid(2.5 * CELL_SIZE, 2.5 * CELL_SIZE)
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+
+import pygame
+
+# 文字渲染缓存：同一字体、文字、颜色只渲染一次，之后直接复用Surface；
+# 按最近最少使用（LRU）淘汰，并统计命中/未命中次数。
+# 注意：返回的Surface是共享的，调用方不要修改它（如set_alpha、fill）
+class TextCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (字体, 文字, 颜色, 抗锯齿[, 背景参数]) -> Surface
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return surface
+
+    def _store(self, key, surface):
+        self.misses += 1
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def render(self, font, text, antialias, color):
+        """与font.render(text, antialias, color)等价，但命中缓存时不再重新渲染"""
+        key = (font, text, tuple(color), antialias)
+        surface = self._lookup(key)
+        if surface is None:
+            surface = self._store(key, font.render(text, antialias, color))
+        return surface
+
+    def render_label(self, font, text, antialias, color, background_color, padding_x=3, padding_y=1):
+        """渲染带半透明背景板的文字标签（背景和文字合成在同一张Surface上）"""
+        key = (font, text, tuple(color), antialias, tuple(background_color), padding_x, padding_y)
+        surface = self._lookup(key)
+        if surface is None:
+            text_surface = self.render(font, text, antialias, color)
+            width, height = text_surface.get_size()
+            surface = pygame.Surface((width + padding_x * 2, height + padding_y * 2), pygame.SRCALPHA)
+            surface.fill(background_color)
+            surface.blit(text_surface, (padding_x, padding_y))
+            surface = self._store(key, surface)
+        return surface
+
+    def clear(self):
+        self.entries.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """返回(命中次数, 未命中次数, 当前缓存条数)"""
+        return self.hits, self.misses, len(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
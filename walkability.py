@@ -0,0 +1,70 @@
+import numpy as np
+
+# 配置空间可通行表：半径为r的实体（按边长2r的方形处理）在(x, y)可以站立，
+# 当且仅当方形覆盖的所有格子都不是墙。
+# 方形在x方向覆盖的格子区间[(x-r)//C, (x+r)//C]只取决于整数像素x，整张迷宫上不同的区间不超过2×格子数个，
+# 所以预先把每个像素坐标映射到区间编号，再用二维前缀和算出（y区间 × x区间）的可通行表；
+# 查询时两次下标换算 + 一次表查询即可，Boss这类跨多个格子的实体，方形中间的墙也会被检测到
+class WalkabilityGrid:
+    def __init__(self, walls, cell_size, radius, outside_blocked=True):
+        """
+        walls: 迷宫墙壁布尔表（行=y，列=x）
+        radius: 实体半径（整数像素，即size // 2）
+        outside_blocked: 迷宫外是否视为不可通行（病毒为True；玩家、生成检测沿用旧逻辑为False）
+        """
+        self.cell_size = cell_size
+        self.radius = int(radius)
+        self.outside_blocked = outside_blocked
+        # 两侧各留“半径+一格”的边距，更远的坐标钳制到边缘后结果不变（方形已完全在迷宫外）
+        self.margin = self.radius + cell_size
+        height, width = walls.shape
+
+        self.x_span, x_first, x_last = self._spans(width)
+        self.y_span, y_first, y_last = self._spans(height)
+        self.x_limit = self.x_span.size - 1
+        self.y_limit = self.y_span.size - 1
+
+        # 二维前缀和：任意矩形区域内的墙数 O(1) 求出
+        prefix = np.zeros((height + 1, width + 1), dtype=np.int32)
+        prefix[1:, 1:] = walls.astype(np.int32).cumsum(axis=0).cumsum(axis=1)
+        left = np.clip(x_first, 0, width)[None, :]
+        right = np.clip(x_last + 1, 0, width)[None, :]
+        top = np.clip(y_first, 0, height)[:, None]
+        bottom = np.clip(y_last + 1, 0, height)[:, None]
+        wall_count = prefix[bottom, right] - prefix[top, right] - prefix[bottom, left] + prefix[top, left]
+        table = wall_count == 0
+        if outside_blocked:
+            inside_x = (x_first >= 0) & (x_last < width)
+            inside_y = (y_first >= 0) & (y_last < height)
+            table &= inside_y[:, None] & inside_x[None, :]
+        self.table = table
+
+    def _spans(self, cells):
+        """像素坐标（含两侧边距）-> 覆盖格子区间编号；返回(编号表, 各区间首格, 各区间末格)"""
+        pixels = np.arange(-self.margin, cells * self.cell_size + self.margin + 1)
+        first = np.floor_divide(pixels - self.radius, self.cell_size)
+        last = np.floor_divide(pixels + self.radius, self.cell_size)
+        changes = np.ones(pixels.size, dtype=np.bool_)
+        changes[1:] = (first[1:] != first[:-1]) | (last[1:] != last[:-1])
+        span_index = (np.cumsum(changes) - 1).astype(np.int32)
+        return span_index, first[changes], last[changes]
+
+    def is_valid(self, x, y):
+        """单点查询：(x, y)处能否站立"""
+        index_x = x + self.margin
+        if index_x <= 0:
+            index_x = 0
+        elif index_x >= self.x_limit:
+            index_x = self.x_limit
+        index_y = y + self.margin
+        if index_y <= 0:
+            index_y = 0
+        elif index_y >= self.y_limit:
+            index_y = self.y_limit
+        return bool(self.table[self.y_span[int(index_y)], self.x_span[int(index_x)]])
+
+    def valid_many(self, xs, ys):
+        """批量查询，返回布尔数组"""
+        index_x = np.clip(np.floor(xs + self.margin), 0, self.x_limit).astype(np.intp)
+        index_y = np.clip(np.floor(ys + self.margin), 0, self.y_limit).astype(np.intp)
+        return self.table[self.y_span[index_y], self.x_span[index_x]]